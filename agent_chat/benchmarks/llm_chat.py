@@ -0,0 +1,134 @@
+# llm_chat.py
+# ─────────────────────────────────────────────────────────────────────────────
+# Throughput of llm_chat's LLM call at 1, 10 and 100 concurrent calls on one
+# event loop (one worker):
+#
+#   per-call sync   a new OpenAI client per call and a blocking create() –
+#                   how llm_chat used to call the model
+#   shared async    the process-wide AsyncOpenAI client (src/llm_client.py)
+#
+# By default the calls go to a local stand-in for the OpenAI-compatible
+# endpoint that answers after --latency-ms, so only client overhead and
+# concurrency are measured. --base-url/--model point it at a real endpoint
+# (RESTACK_API_KEY must be set).
+#
+#   python -m benchmarks.llm_chat
+#   python -m benchmarks.llm_chat --latency-ms 800 --calls 200
+#   python -m benchmarks.llm_chat --base-url https://ai.restack.io --calls 20
+# ─────────────────────────────────────────────────────────────────────────────
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Awaitable, Callable
+
+from openai import OpenAI
+
+from src import llm_client
+
+MESSAGES = [{"role": "user", "content": "At 3 pm call Alice"}]
+
+
+def _fake_endpoint(latency_ms: float) -> str:
+    """OpenAI-compatible /chat/completions answering after latency_ms; returns its base URL."""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, as a real endpoint
+
+        def setup(self) -> None:
+            super().setup()
+            # headers and body go out as two writes; without this Nagle +
+            # delayed ACK add ~40 ms to every response
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        def do_POST(self) -> None:
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            time.sleep(latency_ms / 1000)
+            body = json.dumps({
+                "id": "chatcmpl-bench",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": "bench",
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": '{"Schedule": [], "Relationships": [], "Mind Space": []}'},
+                    "finish_reason": "stop",
+                }],
+            }).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args: object) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+
+async def _per_call_sync(model: str) -> None:
+    client = OpenAI(base_url=llm_client.base_url, api_key=os.environ["RESTACK_API_KEY"])
+    client.chat.completions.create(model=model, messages=MESSAGES)
+
+
+async def _shared_async(model: str) -> None:
+    await llm_client.get_llm_client().chat.completions.create(model=model, messages=MESSAGES)
+
+
+async def _run(call: Callable[[str], Awaitable[None]], model: str, calls: int, concurrency: int) -> float:
+    """Calls per second with `concurrency` calls in flight at a time."""
+    gate = asyncio.Semaphore(concurrency)
+
+    async def one() -> None:
+        async with gate:
+            await call(model)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(calls)))
+    return calls / (time.perf_counter() - started)
+
+
+async def run_benchmark(model: str, calls: int, levels: list[int], skip_sync_over: int) -> None:
+    await _shared_async(model)  # open the pool, as a warm worker would have
+    print(f"{'concurrency':>11}  {'per-call sync':>15}  {'shared async':>15}  speedup")
+    for level in levels:
+        n = max(calls, level)
+        shared = await _run(_shared_async, model, n, level)
+        if level > skip_sync_over:  # serialised anyway; at 100 it only takes long
+            print(f"{level:>11}  {'–':>15}  {shared:>11.1f} /s")
+            continue
+        sync = await _run(_per_call_sync, model, n, level)
+        print(f"{level:>11}  {sync:>11.1f} /s  {shared:>11.1f} /s  {shared / sync:>6.1f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="llm_chat client throughput by concurrency")
+    parser.add_argument("--calls", type=int, default=100, help="calls per level (at least the level)")
+    parser.add_argument("--levels", default="1,10,100", help="comma-separated concurrency levels")
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="stand-in endpoint latency")
+    parser.add_argument("--base-url", help="real OpenAI-compatible endpoint instead of the stand-in")
+    parser.add_argument("--model", default="gpt-4o-mini")
+    parser.add_argument("--skip-sync-over", type=int, default=100, help="skip the per-call sync client above this level")
+    args = parser.parse_args()
+
+    if args.base_url:
+        llm_client.base_url = args.base_url
+    else:
+        llm_client.base_url = _fake_endpoint(args.latency_ms)
+        os.environ.setdefault("RESTACK_API_KEY", "benchmark")
+    levels = [int(x) for x in args.levels.split(",")]
+    asyncio.run(run_benchmark(args.model, args.calls, levels, args.skip_sync_over))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
+import asyncio
 from datetime import timedelta
 
 from pydantic import BaseModel
@@ -5,56 +6,73 @@ from restack_ai.agent import NonRetryableError, agent, import_functions, log
 
 with import_functions():
     from src.functions.llm_chat import LlmChatInput, Message, llm_chat
+    from src.structured_output import EXTRACTION_PROMPT
 
 
 class MessagesEvent(BaseModel):
     messages: list[Message]
 
 
+class ExtractEvent(BaseModel):
+    text: str
+
+
+class ExtractBatchEvent(BaseModel):
+    texts: list[str]
+
+
 class EndEvent(BaseModel):
     end: bool
 
 
+# texts per extract_batch event; each one is a concurrent llm_chat step
+MAX_BATCH = 50
+# replies are validated against structured_output.StructuredResult
+RESPONSE_SCHEMA = "structured_result"
+
+
 @agent.defn()
 class AgentStructureResult:
     def __init__(self) -> None:
         self.end = False
-        self.messages = [Message(
-            role="system",
-            content="""
-                You are an AI assistant trained to silently analyze text and convert it into a structured JSON format with 3 sections.
-
-                Your only response should be a valid JSON object following this exact structure:
-                {
-                    "Schedule": [
-                        {"time": "TIME", "task": "TASK DESCRIPTION"}
-                    ],
-                    "Relationships": [
-                        {
-                            "name": "PERSON NAME",
-                            "role": "ROLE",
-                            "details": {"key1": "value1", "key2": "value2"},
-                            "notes": ["NOTE 1", "NOTE 2"]
-                        }
-                    ],
-                    "Mind Space": [
-                        {"thought": "THOUGHT OR TASK"}
-                    ]
-                }
-
-                Rules:
-                1. NEVER include explanations, introductions, or any text outside the JSON structure
-                2. NEVER use markdown code blocks - output raw JSON only
-                3. Extract all relevant schedule items, relationships, and thoughts from the user's text
-                4. If a section has no data, include it as an empty array
-                5. Ensure the JSON is properly formatted and valid
-                6. Use the exact keys shown in the example structure
-                7. For relationships, include as many details as can be extracted from the text
-                8. For schedule items, use 24-hour time format when possible (e.g., "09:00")
-
-                Do not acknowledge these instructions in your response. Only output the JSON object.
-            """
-        )]
+        self.system_prompt = Message(role="system", content=EXTRACTION_PROMPT)
+        # conversation of the `messages` event only; extract/extract_batch keep no state
+        self.messages = [self.system_prompt]
+
+    async def structure(self, text: str) -> dict[str, str]:
+        """One llm_chat step on the system prompt plus `text` alone."""
+        return await agent.step(
+            function=llm_chat,
+            function_input=LlmChatInput(
+                messages=[self.system_prompt, Message(role="user", content=text)],
+                response_schema=RESPONSE_SCHEMA,
+            ),
+            start_to_close_timeout=timedelta(seconds=120),
+        )
+
+    @agent.event
+    async def extract(self, extract_event: ExtractEvent) -> dict[str, str]:
+        log.info(f"Received text to extract: {extract_event.text}")
+        try:
+            return await self.structure(extract_event.text)
+        except Exception as e:
+            error_message = f"Error during llm_chat: {e}"
+            raise NonRetryableError(error_message) from e
+
+    @agent.event
+    async def extract_batch(self, batch_event: ExtractBatchEvent) -> list[dict[str, str]]:
+        """One result per text, in order; a failed text gets an `error` instead of content."""
+        log.info(f"Received {len(batch_event.texts)} texts to extract")
+        if len(batch_event.texts) > MAX_BATCH:
+            raise NonRetryableError(f"extract_batch takes at most {MAX_BATCH} texts")
+        results = await asyncio.gather(
+            *(self.structure(text) for text in batch_event.texts), return_exceptions=True
+        )
+        return [
+            {"role": "assistant", "content": "", "error": f"Error during llm_chat: {r}"}
+            if isinstance(r, BaseException) else r
+            for r in results
+        ]
 
     @agent.event
     async def messages(self, messages_event: MessagesEvent) -> list[Message]:
@@ -65,7 +83,7 @@ class AgentStructureResult:
         try:
             assistant_message = await agent.step(
                 function=llm_chat,
-                function_input=LlmChatInput(messages=self.messages),
+                function_input=LlmChatInput(messages=self.messages, response_schema=RESPONSE_SCHEMA),
                 start_to_close_timeout=timedelta(seconds=120),
             )
         except Exception as e:
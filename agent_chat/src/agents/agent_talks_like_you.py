@@ -3,12 +3,16 @@ from datetime import timedelta
 from pydantic import BaseModel
 from restack_ai.agent import NonRetryableError, agent, import_functions, log
 
+from src.memory import ConversationMemory
+
 with import_functions():
     from src.functions.llm_chat import LlmChatInput, Message, llm_chat
 
 
 class MessagesEvent(BaseModel):
     messages: list[Message]
+    # stream the reply's tokens to this run's websocket while it is generated
+    stream: bool = False
 
 
 class EndEvent(BaseModel):
@@ -19,7 +23,7 @@ class EndEvent(BaseModel):
 class AgentTalksLikeYou:
     def __init__(self) -> None:
         self.end = False
-        self.messages = [Message(
+        self.memory = ConversationMemory(system=Message(
             role="system",
             content="""
                     You are an AI assistant trained to talk exactly like the user would.
@@ -36,26 +40,37 @@ class AgentTalksLikeYou:
 
                     Ready? Let's keep it 100. 🔥
                     """
-        )]
+        ))
 
     @agent.event
     async def messages(self, messages_event: MessagesEvent) -> list[Message]:
         log.info(f"Received messages: {messages_event.messages}")
-        self.messages.extend(messages_event.messages)
+        self.memory.add(messages_event.messages)
 
-        log.info(f"Calling llm_chat with messages: {self.messages}")
         try:
+            # older turns are folded into a summary once over the token budget
+            await self.memory.fit(self.summarize)
+            log.info("llm_chat prompt tokens", **self.memory.usage())
+            log.info(f"Calling llm_chat with messages: {self.memory.prompt()}")
             assistant_message = await agent.step(
                 function=llm_chat,
-                function_input=LlmChatInput(messages=self.messages),
+                function_input=LlmChatInput(messages=self.memory.prompt(), stream=messages_event.stream),
                 start_to_close_timeout=timedelta(seconds=120),
             )
         except Exception as e:
             error_message = f"Error during llm_chat: {e}"
             raise NonRetryableError(error_message) from e
         else:
-            self.messages.append(assistant_message)
-            return self.messages
+            self.memory.add([assistant_message])
+            return self.memory.prompt()
+
+    async def summarize(self, messages: list[dict[str, str]]) -> str:
+        summary = await agent.step(
+            function=llm_chat,
+            function_input=LlmChatInput(messages=messages),
+            start_to_close_timeout=timedelta(seconds=120),
+        )
+        return summary["content"]
 
     @agent.event
     async def end(self, end: EndEvent) -> EndEvent:
@@ -66,4 +81,6 @@ class AgentTalksLikeYou:
     @agent.run
     async def run(self, function_input: dict) -> None:
         log.info("AgentTalksLikeMe function_input", function_input=function_input)
+        if "token_budget" in function_input:
+            self.memory.token_budget = int(function_input["token_budget"])
         await agent.condition(lambda: self.end)
\ No newline at end of file
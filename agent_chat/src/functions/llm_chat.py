@@ -2,9 +2,11 @@ import os
 from typing import Literal
 
 from dotenv import load_dotenv
-from openai import OpenAI
 from pydantic import BaseModel
-from restack_ai.function import NonRetryableError, function, log
+from restack_ai.function import NonRetryableError, function, log, stream_to_websocket
+
+from src.llm_client import get_llm_client
+from src.structured_output import MAX_REASKS, SchemaOutput
 
 load_dotenv()
 
@@ -18,6 +20,12 @@ class LlmChatInput(BaseModel):
     system_content: str | None = None
     model: str | None = None
     messages: list[Message] | None = None
+    # name of a model in structured_output.RESPONSE_SCHEMAS: the reply is
+    # streamed, validated against it and returned as its JSON
+    response_schema: str | None = None
+    # forward token deltas to the run's websocket as they arrive; the
+    # complete reply is still returned
+    stream: bool = False
 
 
 def raise_exception(message: str) -> None:
@@ -25,6 +33,70 @@ def raise_exception(message: str) -> None:
     raise NonRetryableError(message)
 
 
+async def schema_chat(client, model: str, messages: list, schema_name: str) -> dict[str, str]:
+    """Completion constrained to a response model.
+
+    Sections are parsed and validated as the reply streams in; sections that
+    are invalid, or cut off by a truncated reply, are repaired or asked for
+    again on their own instead of retrying the whole completion.
+    """
+    output = SchemaOutput(schema_name)
+    response_format = output.response_format()
+    stream = await client.chat.completions.create(
+        model=model,
+        messages=messages,
+        stream=True,
+        **({"response_format": response_format} if response_format else {}),
+    )
+    reply = []
+    async for chunk in stream:
+        delta = chunk.choices[0].delta.content if chunk.choices else None
+        if delta:
+            reply.append(delta)
+            for section in output.feed(delta):
+                log.info("llm_chat section parsed", section=section, valid=section in output.sections)
+
+    for _ in range(MAX_REASKS):
+        problems = output.problems()
+        if not problems:
+            break
+        log.warning("llm_chat re-asking for sections", problems=problems)
+        response_format = output.response_format(list(problems))
+        answer = await client.chat.completions.create(
+            model=model,
+            messages=[*messages, {"role": "assistant", "content": "".join(reply)}, output.reask_message(problems)],
+            **({"response_format": response_format} if response_format else {}),
+        )
+        output.absorb(answer.choices[0].message.content or "")
+
+    if problems := output.problems():
+        raise_exception(f"Invalid {schema_name} sections after {MAX_REASKS} re-asks: {problems}")
+    return {"role": "assistant", "content": output.to_json()}
+
+
+def streamed_text(result: dict) -> str:
+    """The reply text of a stream_to_websocket result: its forwarded chunks' deltas joined."""
+    parts = []
+    for event in result.get("events") or []:
+        for choice in event.get("choices") or []:
+            parts.append((choice.get("delta") or {}).get("content") or "")
+    return "".join(parts)
+
+
+async def stream_chat(client, model: str, messages: list) -> dict[str, str]:
+    """Completion whose token deltas go to the agent run's websocket as they arrive.
+
+    stream_to_websocket iterates the AsyncStream with `async for` from
+    restack-ai 0.0.121 on (the pinned minimum); earlier releases need a
+    sync iterator.
+    """
+    response = await client.chat.completions.create(model=model, messages=messages, stream=True)
+    result = await stream_to_websocket(
+        api_address=os.environ.get("RESTACK_ENGINE_API_ADDRESS"), data=response
+    )
+    return {"role": "assistant", "content": streamed_text(result)}
+
+
 @function.defn()
 async def llm_chat(agent_input: LlmChatInput) -> dict[str, str]:
     try:
@@ -34,32 +106,39 @@ async def llm_chat(agent_input: LlmChatInput) -> dict[str, str]:
             error_message = "RESTACK_API_KEY is not set"
             raise_exception(error_message)
 
-        client = OpenAI(
-            base_url="https://ai.restack.io", api_key=os.environ.get("RESTACK_API_KEY")
-        )
+        # shared async client: pooled keep-alive connections, and the event
+        # loop stays free for other steps while the completion is pending
+        client = get_llm_client()
 
         if agent_input.system_content:
             agent_input.messages.append(
                 {"role": "system", "content": agent_input.system_content}
             )
 
-        assistant_raw_response = client.chat.completions.create(
-            model=agent_input.model or "gpt-4o-mini",
-            messages=agent_input.messages,
-        )
+        model = agent_input.model or "gpt-4o-mini"
+        if agent_input.response_schema:
+            assistant_response = await schema_chat(
+                client, model, agent_input.messages, agent_input.response_schema
+            )
+        elif agent_input.stream:
+            assistant_response = await stream_chat(client, model, agent_input.messages)
+        else:
+            assistant_raw_response = await client.chat.completions.create(
+                model=model,
+                messages=agent_input.messages,
+            )
+            log.info(
+                "llm_chat function completed", assistant_raw_response=assistant_raw_response
+            )
+
+            assistant_response = {
+                "role": assistant_raw_response.choices[0].message.role,
+                "content": assistant_raw_response.choices[0].message.content,
+            }
     except Exception as e:
         error_message = f"LLM chat failed: {e}"
         raise NonRetryableError(error_message) from e
     else:
-        log.info(
-            "llm_chat function completed", assistant_raw_response=assistant_raw_response
-        )
-
-        assistant_response = {
-            "role": assistant_raw_response.choices[0].message.role,
-            "content": assistant_raw_response.choices[0].message.content,
-        }
-
         log.info("assistant_response", assistant_response=assistant_response)
 
         return assistant_response
@@ -0,0 +1,56 @@
+import asyncio
+import os
+
+import httpx
+from dotenv import load_dotenv
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+# Load environment variables from a .env file
+load_dotenv()
+
+
+base_url = os.getenv("LLM_BASE_URL", "https://ai.restack.io")
+
+# Connection pool shared by every llm_chat call on this worker. Keep
+# max_connections at or above the number of llm_chat steps the worker runs
+# at once, otherwise calls queue for a connection (up to pool_timeout).
+max_connections = int(os.getenv("LLM_MAX_CONNECTIONS", "100"))
+max_keepalive_connections = int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "20"))
+keepalive_expiry = float(os.getenv("LLM_KEEPALIVE_EXPIRY_S", "30"))
+
+connect_timeout = float(os.getenv("LLM_CONNECT_TIMEOUT_S", "5"))
+read_timeout = float(os.getenv("LLM_READ_TIMEOUT_S", "110"))  # below the step's 120 s start_to_close
+pool_timeout = float(os.getenv("LLM_POOL_TIMEOUT_S", "30"))
+max_retries = int(os.getenv("LLM_MAX_RETRIES", "2"))
+
+_clients: dict[asyncio.AbstractEventLoop, AsyncOpenAI] = {}
+
+
+def get_llm_client() -> AsyncOpenAI:
+    """Process-wide AsyncOpenAI client for the running event loop.
+
+    An httpx connection pool belongs to the loop that opened it, so each
+    loop gets its own client; a worker runs one loop and so reuses one
+    client, with its open keep-alive connections, across all calls.
+    """
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        http_client = DefaultAsyncHttpxClient(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout, pool=pool_timeout),
+        )
+        client = AsyncOpenAI(
+            base_url=base_url,
+            api_key=os.environ.get("RESTACK_API_KEY"),
+            http_client=http_client,
+            max_retries=max_retries,
+        )
+        for closed in [lp for lp in _clients if lp.is_closed()]:
+            del _clients[closed]
+        _clients[loop] = client
+    return client
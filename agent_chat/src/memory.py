@@ -0,0 +1,158 @@
+import math
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+# Token counts are estimated (about 4 characters per token, plus a few tokens
+# of per-message overhead) so they stay deterministic inside agent code,
+# which cannot load a tokenizer. The estimate errs slightly high for English.
+CHARS_PER_TOKEN = 4
+MESSAGE_OVERHEAD_TOKENS = 4
+
+DEFAULT_TOKEN_BUDGET = 3000
+DEFAULT_KEEP_RECENT = 6  # at most this many messages stay verbatim after a fold
+LOW_WATER = 0.75  # fold down to this share of the budget, not just below it
+SUMMARY_SHARE = 0.25  # of the budget the summary message may take
+SUMMARY_PREFIX = "Summary of the earlier conversation:\n"
+
+SUMMARY_INSTRUCTIONS = """
+    You maintain a running summary of a conversation between a user and an AI assistant.
+    You get the current summary (possibly empty) and the next messages of the conversation.
+    Return the updated summary only: keep every fact, name, date, decision and open question
+    the assistant may need later, drop small talk, write in the third person, and stay under
+    {max_words} words.
+"""
+
+Summarize = Callable[[list[dict[str, str]]], Awaitable[str]]
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _role(message: Any) -> str:
+    return message["role"] if isinstance(message, dict) else message.role
+
+
+def _content(message: Any) -> str:
+    return (message["content"] if isinstance(message, dict) else message.content) or ""
+
+
+def message_tokens(message: Any) -> int:
+    return estimate_tokens(_content(message)) + MESSAGE_OVERHEAD_TOKENS
+
+
+class ConversationMemory:
+    """Chat history that stays within a token budget.
+
+    The system prompt and the most recent messages are kept verbatim; older
+    turns are folded into a running summary, updated incrementally by
+    `fit()` whenever the budget is exceeded. A fold keeps at most
+    `keep_recent` messages verbatim, and fewer when they alone are over
+    budget: everything before the newest user message can be folded. The
+    summary is held to a quarter of the budget. `prompt()` is what to send
+    to llm_chat, `usage()` the token counts of the current turn.
+    """
+
+    def __init__(
+        self,
+        system: Any,
+        token_budget: int = DEFAULT_TOKEN_BUDGET,
+        keep_recent: int = DEFAULT_KEEP_RECENT,
+    ) -> None:
+        self.system = system
+        self.token_budget = token_budget
+        self.keep_recent = keep_recent
+        self.summary = ""
+        self.recent: list[Any] = []
+        self.turn = 0
+        self.folded = 0  # messages folded into the summary so far
+
+    def add(self, messages: list[Any]) -> None:
+        self.recent.extend(messages)
+
+    def summary_message(self) -> dict[str, str] | None:
+        if not self.summary:
+            return None
+        return {"role": "system", "content": f"{SUMMARY_PREFIX}{self.summary}"}
+
+    def prompt(self) -> list[Any]:
+        summary = self.summary_message()
+        return [self.system, *([summary] if summary else []), *self.recent]
+
+    def tokens(self) -> int:
+        return sum(message_tokens(m) for m in self.prompt())
+
+    def summary_limit(self) -> int:
+        """Tokens the summary message may take."""
+        return int(self.token_budget * SUMMARY_SHARE)
+
+    def summary_request(self, messages: list[Any], summary: str | None = None) -> list[dict[str, str]]:
+        """llm_chat messages asking for `summary` (default: the current one) updated with `messages`."""
+        max_words = max(20, (self.summary_limit() - MESSAGE_OVERHEAD_TOKENS) * 3 // 4)  # ~4/3 tokens a word
+        summary = self.summary if summary is None else summary
+        transcript = "\n".join(f"{_role(m)}: {_content(m)}" for m in messages) or "(none)"
+        return [
+            {"role": "system", "content": SUMMARY_INSTRUCTIONS.format(max_words=max_words)},
+            {"role": "user", "content": f"Current summary:\n{summary or '(none)'}\n\nNext messages:\n{transcript}"},
+        ]
+
+    def _summary_tokens(self, summary: str) -> int:
+        return estimate_tokens(SUMMARY_PREFIX + summary) + MESSAGE_OVERHEAD_TOKENS
+
+    def _truncate(self, summary: str) -> str:
+        limit = self.summary_limit()
+        if self._summary_tokens(summary) <= limit:
+            return summary
+        chars = max(0, (limit - MESSAGE_OVERHEAD_TOKENS) * CHARS_PER_TOKEN - len(SUMMARY_PREFIX) - 1)
+        return summary[:chars].rsplit(" ", 1)[0].rstrip() + "…"
+
+    async def _summarize(self, summarize: Summarize, messages: list[Any]) -> str:
+        summary = (await summarize(self.summary_request(messages))).strip()
+        if self._summary_tokens(summary) > self.summary_limit():
+            # the length is only asked for; condense once, then cut
+            summary = (await summarize(self.summary_request([], summary))).strip()
+        return self._truncate(summary)
+
+    def _foldable(self) -> int:
+        """Messages before the newest user message, which always stays verbatim."""
+        for i in range(len(self.recent) - 1, -1, -1):
+            if _role(self.recent[i]) == "user":
+                return i
+        return len(self.recent)
+
+    async def fit(self, summarize: Summarize) -> int:
+        """Fold the oldest messages into the summary until within budget; returns how many."""
+        self.turn += 1
+        target = int(self.token_budget * LOW_WATER)  # room for the next few turns
+        total = 0
+        while self.tokens() > self.token_budget:
+            foldable = self._foldable()
+            if foldable == 0:
+                break  # system prompt, summary and newest message alone are over; usage() reports it
+            n = min(foldable, max(0, len(self.recent) - self.keep_recent))
+            excess = self.tokens() - target - sum(message_tokens(m) for m in self.recent[:n])
+            while n < foldable and (excess > 0 or n == 0):
+                excess -= message_tokens(self.recent[n])
+                n += 1
+            self.summary = await self._summarize(summarize, self.recent[:n])
+            del self.recent[:n]
+            self.folded += n
+            total += n
+        return total
+
+    def usage(self) -> dict[str, Any]:
+        system = message_tokens(self.system)
+        summary_message = self.summary_message()
+        summary = message_tokens(summary_message) if summary_message else 0
+        recent = sum(message_tokens(m) for m in self.recent)
+        return {
+            "turn": self.turn,
+            "prompt_tokens": system + summary + recent,
+            "system_tokens": system,
+            "summary_tokens": summary,
+            "recent_tokens": recent,
+            "recent_messages": len(self.recent),
+            "folded_messages": self.folded,
+            "token_budget": self.token_budget,
+            "within_budget": system + summary + recent <= self.token_budget,
+        }
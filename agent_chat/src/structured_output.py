@@ -0,0 +1,309 @@
+import json
+import os
+from typing import Any
+
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, ValidationError, field_validator
+
+# How llm_chat asks the endpoint for JSON in schema mode: "json_schema" (the
+# model's JSON schema), "json_object" (any JSON object) or "none" (prompt
+# only, for endpoints without response_format support). The reply is
+# validated against the model either way.
+RESPONSE_FORMAT = os.getenv("LLM_RESPONSE_FORMAT", "json_schema")
+MAX_REASKS = int(os.getenv("LLM_SCHEMA_REASKS", "1"))  # targeted re-asks for invalid sections
+
+
+class ScheduleItem(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    time: str | None = None
+    task: str
+
+
+class Relationship(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    name: str
+    role: str = ""
+    details: dict[str, Any] = Field(default_factory=dict)
+    notes: list[str] = Field(default_factory=list)
+
+    @field_validator("notes", mode="before")
+    @classmethod
+    def _one_note(cls, value: Any) -> Any:
+        return [value] if isinstance(value, str) else value
+
+
+class MindSpaceItem(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    thought: str
+
+
+class StructuredResult(BaseModel):
+    """What AgentStructureResult extracts from a journal entry."""
+
+    model_config = ConfigDict(populate_by_name=True)
+
+    schedule: list[ScheduleItem] = Field(default_factory=list, alias="Schedule")
+    relationships: list[Relationship] = Field(default_factory=list, alias="Relationships")
+    mind_space: list[MindSpaceItem] = Field(default_factory=list, alias="Mind Space")
+
+
+# Models llm_chat can constrain its reply to, by LlmChatInput.response_schema
+RESPONSE_SCHEMAS: dict[str, type[BaseModel]] = {
+    "structured_result": StructuredResult,
+}
+
+# AgentStructureResult's system prompt; its replies are StructuredResult.
+EXTRACTION_PROMPT = """
+You are an AI assistant trained to silently analyze text and convert it into a structured JSON format with 3 sections.
+
+Your only response should be a valid JSON object following this exact structure:
+{
+    "Schedule": [
+        {"time": "TIME", "task": "TASK DESCRIPTION"}
+    ],
+    "Relationships": [
+        {
+            "name": "PERSON NAME",
+            "role": "ROLE",
+            "details": {"key1": "value1", "key2": "value2"},
+            "notes": ["NOTE 1", "NOTE 2"]
+        }
+    ],
+    "Mind Space": [
+        {"thought": "THOUGHT OR TASK"}
+    ]
+}
+
+Rules:
+1. NEVER include explanations, introductions, or any text outside the JSON structure
+2. NEVER use markdown code blocks - output raw JSON only
+3. Extract all relevant schedule items, relationships, and thoughts from the user's text
+4. If a section has no data, include it as an empty array
+5. Ensure the JSON is properly formatted and valid
+6. Use the exact keys shown in the example structure
+7. For relationships, include as many details as can be extracted from the text
+8. For schedule items, use 24-hour time format when possible (e.g., "09:00")
+
+Do not acknowledge these instructions in your response. Only output the JSON object.
+"""
+
+# Version of the extraction contract, EXTRACTION_PROMPT plus StructuredResult.
+# The app's extraction cache keys on it (EXTRACTION_CACHE_VERSION in
+# streamlit_app/extraction_cache.py), so bump both with any change to either;
+# tests/test_structured_output.py fails until then.
+EXTRACTION_VERSION = "2"
+
+
+class SectionParser:
+    """Incremental parser for one top-level JSON object, fed as tokens arrive.
+
+    Each top-level member is parsed the moment its value closes, so finished
+    sections are known before the reply ends and survive a truncated one.
+    Text around the object (a markdown fence, a preamble) is skipped.
+    """
+
+    def __init__(self) -> None:
+        self.buffer = ""
+        self.raw: dict[str, str] = {}  # section -> its JSON text
+        self.closed = False  # the object's closing brace was seen
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._expect = "key"  # at depth 1: key, colon, value, scalar or comma
+        self._key = ""
+        self._start = 0
+
+    def feed(self, chunk: str) -> list[str]:
+        """Add text; returns the sections it completed."""
+        self.buffer += chunk
+        done: list[str] = []
+        buf = self.buffer
+        for i in range(self._pos, len(buf)):
+            if self.closed:
+                break
+            c = buf[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._expect == "key":
+                        self._key = json.loads(buf[self._start:i + 1])
+                        self._expect = "colon"
+                    elif self._depth == 1:
+                        done.append(self._finish(buf[self._start:i + 1]))
+                continue
+            if c.isspace():
+                continue
+            if self._depth == 0:
+                if c == "{":
+                    self._depth = 1
+                continue
+            if self._depth > 1:
+                if c == '"':
+                    self._in_string = True
+                elif c in "[{":
+                    self._depth += 1
+                elif c in "]}":
+                    self._depth -= 1
+                    if self._depth == 1:
+                        done.append(self._finish(buf[self._start:i + 1]))
+                continue
+            if self._expect == "scalar" and c in ",}":
+                done.append(self._finish(buf[self._start:i].strip()))
+            if self._expect == "key" and c == '"':
+                self._start, self._in_string = i, True
+            elif self._expect == "colon" and c == ":":
+                self._expect = "value"
+            elif self._expect == "value":
+                self._start = i
+                if c in "[{":
+                    self._depth = 2
+                elif c == '"':
+                    self._in_string = True
+                else:
+                    self._expect = "scalar"
+            elif c == "," and self._expect == "comma":
+                self._expect = "key"
+            elif c == "}" and self._expect in ("key", "comma"):
+                self.closed = True
+        self._pos = len(buf)
+        return done
+
+    def _finish(self, text: str) -> str:
+        self.raw[self._key] = text
+        self._expect = "comma"
+        return self._key
+
+
+def repair(text: str) -> str:
+    """Cheap fix-up of one section's JSON: drops trailing commas, which models often emit."""
+    out: list[str] = []
+    in_string = escape = False
+    for c in text:
+        if in_string:
+            if escape:
+                escape = False
+            elif c == "\\":
+                escape = True
+            elif c == '"':
+                in_string = False
+        elif c == '"':
+            in_string = True
+        elif c in "]}":
+            while out and out[-1].isspace():
+                out.pop()
+            if out and out[-1] == ",":
+                out.pop()
+        out.append(c)
+    return "".join(out)
+
+
+class SchemaOutput:
+    """A reply checked against a response model section by section, as it streams in.
+
+    `feed()` takes the streamed text; `problems()` lists the sections that are
+    invalid, or missing from a reply that ended early, so only those need
+    asking for again (`reask_message()`, then `absorb()` the answer).
+    """
+
+    def __init__(self, schema_name: str) -> None:
+        self.name = schema_name
+        self.model = RESPONSE_SCHEMAS[schema_name]
+        self.adapters = {
+            field.alias or name: TypeAdapter(field.annotation) for name, field in self.model.model_fields.items()
+        }
+        # what a `null` section stands for: its default, where it has one
+        self.defaults = {
+            field.alias or name: field.get_default(call_default_factory=True)
+            for name, field in self.model.model_fields.items()
+            if not field.is_required()
+        }
+        self.parser = SectionParser()
+        self.sections: dict[str, Any] = {}
+        self.errors: dict[str, str] = {}
+
+    def feed(self, chunk: str) -> list[str]:
+        """Validate the sections `chunk` completed; returns their names."""
+        done = self.parser.feed(chunk)
+        for key in done:
+            self._check(key, self.parser.raw[key])
+        return done
+
+    def absorb(self, text: str) -> None:
+        """Take the sections of a re-ask reply that were still needed."""
+        parser = SectionParser()
+        parser.feed(text)
+        for key, raw in parser.raw.items():
+            if key not in self.sections:
+                self._check(key, raw)
+
+    def _check(self, key: str, raw: str) -> None:
+        adapter = self.adapters.get(key)
+        if adapter is None:
+            return  # not part of the schema
+        error = ""
+        for candidate in dict.fromkeys((raw, repair(raw))):
+            try:
+                data = json.loads(candidate)
+                if data is None and key in self.defaults:
+                    data = self.defaults[key]
+                value = adapter.validate_python(data)
+            except ValidationError as e:
+                error = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()[:5])
+                continue
+            except ValueError as e:
+                error = f"not valid JSON ({e})"
+                continue
+            self.sections[key] = adapter.dump_python(value, mode="json", by_alias=True)
+            self.errors.pop(key, None)
+            return
+        self.errors[key] = error
+
+    def problems(self) -> dict[str, str]:
+        problems = dict(self.errors)
+        if not self.parser.closed:
+            for key in self.adapters:
+                if key not in self.sections and key not in problems:
+                    problems[key] = "missing, the reply ended before it"
+        return problems
+
+    def response_format(self, keys: list[str] | None = None) -> dict[str, Any] | None:
+        """response_format for the model, or for just `keys` of it."""
+        if RESPONSE_FORMAT == "none":
+            return None
+        if RESPONSE_FORMAT == "json_object":
+            return {"type": "json_object"}
+        schema = self.model.model_json_schema(by_alias=True)
+        if keys is not None:
+            schema = {
+                **schema,
+                "properties": {k: v for k, v in schema["properties"].items() if k in keys},
+                "required": list(keys),
+            }
+        return {"type": "json_schema", "json_schema": {"name": self.name, "schema": schema, "strict": False}}
+
+    def reask_message(self, problems: dict[str, str]) -> dict[str, str]:
+        listed = "\n".join(f'- "{key}": {error}' for key, error in problems.items())
+        keys = ", ".join(f'"{key}"' for key in problems)
+        return {
+            "role": "user",
+            "content": (
+                f"These sections of your JSON were invalid or missing:\n{listed}\n"
+                f"Reply with a JSON object containing only the keys {keys}, "
+                "in the same structure as before. Output raw JSON only."
+            ),
+        }
+
+    def to_json(self) -> str:
+        """The validated reply; sections the reply left out get their defaults."""
+        out = {}
+        for name, field in self.model.model_fields.items():
+            key = field.alias or name
+            out[key] = self.sections.get(key, field.get_default(call_default_factory=True))
+        return json.dumps(out)
@@ -0,0 +1,73 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("restack_ai")
+
+from src.functions import llm_chat  # noqa: E402
+
+
+class FakeClient:
+    """chat.completions.create that streams `reply`, then answers re-asks from `answers`."""
+
+    def __init__(self, reply: str, answers: list[str], chunk: int = 5) -> None:
+        self.reply = reply
+        self.answers = list(answers)
+        self.chunk = chunk
+        self.calls: list[dict] = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, **kwargs):
+        self.calls.append(kwargs)
+        if kwargs.get("stream"):
+            return self._stream()
+        content = self.answers.pop(0)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+    async def _stream(self):
+        for i in range(0, len(self.reply), self.chunk):
+            delta = SimpleNamespace(content=self.reply[i:i + self.chunk])
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+
+
+def _chat(client: FakeClient) -> dict:
+    messages = [{"role": "user", "content": "text"}]
+    return asyncio.run(llm_chat.schema_chat(client, "model", messages, "structured_result"))
+
+
+def test_valid_reply_needs_no_reask():
+    client = FakeClient('{"Schedule": [{"task": "a"}], "Relationships": [], "Mind Space": []}', [])
+    result = _chat(client)
+    assert len(client.calls) == 1
+    assert json.loads(result["content"])["Schedule"] == [{"time": None, "task": "a"}]
+
+
+def test_reask_sends_only_the_invalid_keys(monkeypatch):
+    monkeypatch.setattr(llm_chat, "MAX_REASKS", 1)
+    reply = '{"Schedule": [{"task": "a"}], "Relationships": [{"role": "no name"}], "Mind'  # invalid, then cut off
+    client = FakeClient(reply, ['{"Relationships": [{"name": "Ann"}], "Mind Space": [{"thought": "t"}]}'])
+    result = _chat(client)
+
+    assert len(client.calls) == 2
+    reask = client.calls[1]
+    assert "stream" not in reask
+    assert reask["messages"][-2] == {"role": "assistant", "content": reply}
+    asked = reask["messages"][-1]["content"]
+    assert '"Relationships"' in asked and '"Mind Space"' in asked and '"Schedule"' not in asked
+    schema = reask["response_format"]["json_schema"]["schema"]
+    assert set(schema["properties"]) == {"Relationships", "Mind Space"}
+    assert json.loads(result["content"]) == {
+        "Schedule": [{"time": None, "task": "a"}],
+        "Relationships": [{"name": "Ann", "role": "", "details": {}, "notes": []}],
+        "Mind Space": [{"thought": "t"}],
+    }
+
+
+def test_still_invalid_after_reasks_fails(monkeypatch):
+    monkeypatch.setattr(llm_chat, "MAX_REASKS", 1)
+    client = FakeClient('{"Schedule": [{"time": "09:00"}], "Relationships": [], "Mind Space": []}', ['{"Schedule": 3}'])
+    with pytest.raises(llm_chat.NonRetryableError, match="Schedule"):
+        _chat(client)
+    assert len(client.calls) == 2
@@ -0,0 +1,59 @@
+import asyncio
+
+import pytest
+
+from src.memory import ConversationMemory, message_tokens
+
+
+def _turn(i: int, role: str, tokens: int) -> dict[str, str]:
+    return {"role": role, "content": f"{role} {i} " + "word " * (tokens * 4 // 5)}
+
+
+def _summarizer(words: int):
+    calls = []
+
+    async def summarize(request: list[dict[str, str]]) -> str:
+        calls.append(request)
+        return "fact " * words  # ignores the requested length, as a model may
+
+    return summarize, calls
+
+
+@pytest.mark.parametrize("summary_words", [30, 2000])
+def test_budget_holds_for_long_turns(summary_words):
+    memory = ConversationMemory({"role": "system", "content": "You are helpful."}, token_budget=800)
+    summarize, _ = _summarizer(summary_words)
+
+    for i in range(60):
+        memory.add([_turn(i, "user", 250)])
+        asyncio.run(memory.fit(summarize))
+        usage = memory.usage()
+        assert usage["within_budget"], usage
+        assert memory.recent[-1]["content"].startswith(f"user {i} ")  # the question is never folded
+        assert usage["summary_tokens"] <= memory.summary_limit()
+        memory.add([_turn(i, "assistant", 250)])
+
+    assert memory.folded > 0
+
+
+def test_under_budget_keeps_history_verbatim():
+    memory = ConversationMemory({"role": "system", "content": "You are helpful."}, token_budget=3000)
+    summarize, calls = _summarizer(10)
+
+    for i in range(3):
+        memory.add([_turn(i, "user", 50), _turn(i, "assistant", 50)])
+        assert asyncio.run(memory.fit(summarize)) == 0
+
+    assert calls == [] and memory.summary == "" and len(memory.recent) == 6
+
+
+def test_fold_keeps_at_most_keep_recent():
+    memory = ConversationMemory({"role": "system", "content": "s"}, token_budget=600, keep_recent=2)
+    summarize, _ = _summarizer(10)
+    for i in range(5):
+        memory.add([_turn(i, "user", 60), _turn(i, "assistant", 60)])
+    memory.add([_turn(5, "user", 60)])
+
+    assert asyncio.run(memory.fit(summarize)) == 9
+    assert len(memory.recent) == 2
+    assert sum(message_tokens(m) for m in memory.prompt()) <= 600
@@ -0,0 +1,116 @@
+import hashlib
+import json
+from typing import get_args
+
+import pytest
+from pydantic import BaseModel
+
+from src.structured_output import (
+    EXTRACTION_PROMPT,
+    EXTRACTION_VERSION,
+    SchemaOutput,
+    SectionParser,
+    StructuredResult,
+    repair,
+)
+
+# EXTRACTION_VERSION -> fingerprint of the contract it was given to. Add a
+# line when bumping the version.
+FINGERPRINTS = {
+    "2": "db64a2caf9efc4c6",
+}
+
+
+def _shape(model: type[BaseModel]) -> dict:
+    """Fields of `model` and the models nested in it; unlike the JSON schema, the same across pydantic releases."""
+    shape = {"extra": model.model_config.get("extra")}
+    for name, field in model.model_fields.items():
+        nested = [arg for arg in get_args(field.annotation) if isinstance(arg, type) and issubclass(arg, BaseModel)]
+        shape[field.alias or name] = [repr(field.annotation), field.is_required(), [_shape(m) for m in nested]]
+    return shape
+
+
+def _fingerprint() -> str:
+    shape = json.dumps(_shape(StructuredResult), sort_keys=True)
+    return hashlib.sha256(f"{EXTRACTION_PROMPT}\0{shape}".encode()).hexdigest()[:16]
+
+
+def test_extraction_version_follows_the_contract():
+    assert FINGERPRINTS.get(EXTRACTION_VERSION) == _fingerprint(), (
+        "EXTRACTION_PROMPT or StructuredResult changed: bump EXTRACTION_VERSION "
+        "and streamlit_app's EXTRACTION_CACHE_VERSION, and record the new fingerprint"
+    )
+
+
+def _chunks(text: str, size: int) -> list[str]:
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+@pytest.mark.parametrize("size", [1, 3, 7, 1000])
+def test_sections_parse_as_they_close(size):
+    reply = (
+        'Here you go:\n```json\n{"Schedule": [{"time": "09:00", "task": "Fix {brace} \\"quoted\\" [x]"}], '
+        '"Relationships": [{"name": "Ann", "details": {"met": "at \\"the\\" café {2020}"}}],\n'
+        '"Mind Space": []}\n```'
+    )
+    output = SchemaOutput("structured_result")
+    done = [key for chunk in _chunks(reply, size) for key in output.feed(chunk)]
+    assert done == ["Schedule", "Relationships", "Mind Space"]
+    assert output.problems() == {}
+    assert output.sections["Schedule"][0]["task"] == 'Fix {brace} "quoted" [x]'
+    assert output.sections["Relationships"][0]["details"] == {"met": 'at "the" café {2020}'}
+
+
+def test_sections_complete_before_the_reply_ends():
+    parser = SectionParser()
+    assert parser.feed('{"Schedule": [{"task": "a"}], "Relations') == ["Schedule"]
+    assert parser.raw == {"Schedule": '[{"task": "a"}]'} and not parser.closed
+
+
+def test_truncated_reply_reports_missing_sections():
+    output = SchemaOutput("structured_result")
+    output.feed('{"Schedule": [{"task": "a"}], "Relationships": [{"name": "B')
+    assert set(output.problems()) == {"Relationships", "Mind Space"}
+    assert all(p.startswith("missing") for p in output.problems().values())
+
+
+def test_trailing_commas_are_repaired():
+    assert repair('[{"task": "a, b",}, ]') == '[{"task": "a, b"}]'
+    output = SchemaOutput("structured_result")
+    output.feed('{"Schedule": [{"task": "a",},], "Relationships": [], "Mind Space": [],}')
+    assert output.problems() == {}
+    assert output.sections["Schedule"] == [{"time": None, "task": "a"}]
+
+
+def test_null_sections_take_their_default():
+    output = SchemaOutput("structured_result")
+    output.feed('{"Schedule": null, "Relationships": [], "Mind Space": null}')
+    assert output.problems() == {}
+    assert json.loads(output.to_json()) == {"Schedule": [], "Relationships": [], "Mind Space": []}
+
+
+def test_invalid_section_is_a_problem():
+    output = SchemaOutput("structured_result")
+    output.feed('{"Schedule": [{"time": "09:00"}], "Relationships": [], "Mind Space": []}')
+    assert list(output.problems()) == ["Schedule"]
+    assert "task" in output.problems()["Schedule"]
+
+
+def test_absorb_fills_only_missing_sections():
+    output = SchemaOutput("structured_result")
+    output.feed('{"Schedule": [{"task": "kept"}], "Relationships": [{"role": "no name"}], "Mind')
+    assert set(output.problems()) == {"Relationships", "Mind Space"}
+    output.absorb(
+        '{"Schedule": [{"task": "overwritten"}], "Relationships": [{"name": "Ann"}], "Mind Space": [{"thought": "t"}]}'
+    )
+    assert output.problems() == {}
+    assert output.sections["Schedule"] == [{"time": None, "task": "kept"}]
+    assert output.sections["Relationships"][0]["name"] == "Ann"
+
+
+def test_reask_asks_for_the_problem_keys_only():
+    output = SchemaOutput("structured_result")
+    message = output.reask_message({"Relationships": "missing"})
+    assert '"Relationships"' in message["content"] and '"Schedule"' not in message["content"]
+    schema = output.response_format(["Relationships"])["json_schema"]["schema"]
+    assert list(schema["properties"]) == ["Relationships"] and schema["required"] == ["Relationships"]
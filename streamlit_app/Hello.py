@@ -1,24 +1,14 @@
 import streamlit as st
-import base64
-from pathlib import Path
 
-st.set_page_config(page_title="Landing Page", layout="wide")
-
-# Path to your local background image and logo
-img_path = Path(__file__).parent / "resources/Landing.jpeg"
-logo_path = Path(__file__).parent / "resources/Melogo.png"  # Assuming logo is in the resources folder
-icon_path = Path(__file__).parent / "resources/Restack.png"  # Add path to the new image (next to the text)
+import assets
 
-# Encode the image as base64
-def get_base64(file_path):
-    with open(file_path, "rb") as f:
-        data = f.read()
-    return base64.b64encode(data).decode()
+st.set_page_config(page_title="Landing Page", layout="wide")
 
-# Get base64 encoded versions of the background, logo, and new icon images
-img_base64 = get_base64(img_path)
-logo_base64 = get_base64(logo_path)
-icon_base64 = get_base64(icon_path)  # Get the base64 for the new image
+# Images are resized / WebP-encoded once per process and served statically
+# (or inlined) by the asset layer – see assets.py
+background_css = assets.background_css(".stApp", "Landing.jpeg")
+logo_html = assets.img_tag("Melogo.png", 500)
+icon_html = assets.img_tag("Restack.png", 120, alt="Icon")
 
 # Sidebar Custom Styling
 st.markdown("""
@@ -65,7 +55,6 @@ st.markdown(
 
     /* Set body background */
     .stApp {{
-        background-image: url("data:image/jpg;base64,{img_base64}");
         background-size: cover;
         background-position: center;
         background-repeat: no-repeat;
@@ -73,6 +62,7 @@ st.markdown(
         width: 100vw;
         font-family: 'General Sans', sans-serif;  /* Apply General Sans to the body */
     }}
+    {background_css}
 
     /* Center the content (text and button) */
     .center-div {{
@@ -174,7 +164,7 @@ st.markdown(
     f"""
     <div class="center-div">
         <!-- Add Logo Above the Heading -->
-        <img src="data:image/png;base64,{logo_base64}" width="500vh" />
+        {logo_html}
     <p style="font-size:2em; color: grey; max-width: 700px; margin: 20px auto; line-height: 1.6;">
         TRACK YOUR <span style="color: white;">THOUGHTS 🧠</span>, <span style="color: white;">DAILY ACTIVITIES 🗓️</span>, AND <span style="color: white;">RELATIONSHIPS ❤️</span>. 
     </p>        
@@ -189,7 +179,7 @@ st.markdown(
     f"""
     <div class="powered-div">
         <h1>Powered by</h1>
-        <img src="data:image/png;base64,{icon_base64}" alt="Icon" />
+        {icon_html}
     </div>
     """,
     unsafe_allow_html=True
@@ -0,0 +1,97 @@
+# agent.py
+# ─────────────────────────────────────────────────────────────────────────────
+# Prompt → structured result, shared by the journal page and the importer.
+#
+#   lookup()   answers without the network: fast-path parser, then the
+#              extraction cache
+#   extract()  lookup() or one AgentStructureResult call (cached after)
+#
+# Calls use the agent's stateless extract / extract_batch events, never its
+# conversational `messages` event, which resends the whole history.
+# ─────────────────────────────────────────────────────────────────────────────
+from __future__ import annotations
+
+import datetime as _dt
+import json
+import os
+from typing import List
+
+from extraction_cache import ExtractionCache
+from fastpath import extract as fastpath_extract
+from tracing import span, traced
+from transport import get_transport
+
+# ─── Restack agent config ───────────────────────────────────────────────────
+BASE_URL = os.getenv("RESTACK_BASE_URL", "https://res2tsut.clj5khk.gcp.restack.it").rstrip("/")
+AGENT_ID = os.getenv("RESTACK_AGENT_ID", "d7e08832-AgentStructureResult")
+RUN_ID = os.getenv("RESTACK_RUN_ID", "01967657-63b9-7272-9413-c01c93a13c6e")
+RESTACK_ENDPOINT = f"{BASE_URL}/api/agents/AgentStructureResult/{AGENT_ID}/{RUN_ID}"
+
+
+def _send(event: str, event_input: dict) -> object:
+    payload = {"eventName": event, "eventInput": event_input}
+    # pooled keep-alive session with retry + circuit breaker (transport.py);
+    # extract/extract_batch keep no state on the agent, so a repeat after a
+    # gateway error or read timeout costs a model call, not a wrong answer
+    return get_transport().put(RESTACK_ENDPOINT, json=payload, endpoint="AgentStructureResult", idempotent=True).json()
+
+
+def _structured(msg: dict) -> dict:
+    if msg.get("error"):
+        raise RuntimeError(msg["error"])
+    content = msg["content"]
+    try:
+        return json.loads(content)
+    except ValueError:
+        # the agent validates its replies against a schema; this only covers
+        # an older worker answering with fenced or wrapped JSON
+        start, end = content.find("{"), content.rfind("}")
+        if start < 0 or end < start:
+            raise
+        return json.loads(content[start:end + 1])
+
+
+@traced("agent.call")
+def call_agent(prompt_text: str) -> dict:
+    """
+    Structure one prompt. The agent's `extract` event is stateless – the
+    model sees its system prompt and this text only – so the request costs
+    the same on day 300 as on day 1 and is safe to retry.
+    """
+    return _structured(_send("extract", {"text": prompt_text}))
+
+
+@traced("agent.call_batch")
+def call_agent_batch(prompt_texts: List[str]) -> List[dict | Exception]:
+    """
+    Structure independent prompts in one request (run concurrently by the
+    agent); one result per prompt, in order, an exception where it failed.
+    """
+    results: List[dict | Exception] = []
+    for msg in _send("extract_batch", {"texts": list(prompt_texts)}):
+        try:
+            results.append(_structured(msg))
+        except (RuntimeError, ValueError, KeyError, TypeError) as exc:
+            results.append(exc)
+    return results
+
+
+def lookup(prompt_text: str, cache: ExtractionCache, today: _dt.date | None = None) -> dict | None:
+    """Result available without an agent call, else None. Relative dates count from `today`."""
+    with span("agent.lookup") as s:
+        fast = fastpath_extract(prompt_text, today)
+        if fast.confident:  # simple schedule command – parsed locally
+            s.set("source", "fastpath")
+            return fast.structured
+        structured = cache.get(prompt_text)  # seen before
+        s.set("source", "cache" if structured is not None else "miss")
+        return structured
+
+
+def extract(prompt_text: str, cache: ExtractionCache) -> dict:
+    """lookup(), falling back to the agent; agent results are remembered."""
+    structured = lookup(prompt_text, cache)
+    if structured is None:
+        structured = call_agent(prompt_text)
+        cache.put(prompt_text, structured)
+    return structured
@@ -0,0 +1,139 @@
+# assets.py
+# ─────────────────────────────────────────────────────────────────────────────
+# Images and CSS for the pages, prepared once per process.
+#
+# • images are resized to a few viewport widths and re-encoded as WebP
+#   where that makes them smaller (needs Pillow; without it, and at full
+#   width, the original file is used as is)
+# • with server.enableStaticServing (see .streamlit/config.toml) variants
+#   are written to static/ and referenced by a content-versioned URL,
+#   which Streamlit serves with long-lived cache headers; otherwise they
+#   are inlined as data URIs, encoded once per process
+# • style.css is read once per process; Streamlit serves static .css as
+#   text/plain, so it cannot be linked as a stylesheet and stays inline
+# ─────────────────────────────────────────────────────────────────────────────
+from __future__ import annotations
+
+import base64
+import hashlib
+import io
+import mimetypes
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Tuple
+
+try:
+    from PIL import Image
+except ImportError:  # optional – variants fall back to the original file
+    Image = None
+
+APP_DIR = Path(__file__).resolve().parent
+RESOURCES_DIR = APP_DIR / "resources"
+STATIC_DIR = APP_DIR / "static"  # served at app/static/ by Streamlit
+
+ASSET_WIDTHS = tuple(int(w) for w in os.getenv("ASSET_WIDTHS", "640,1280,1920").split(","))
+ASSET_WEBP_QUALITY = int(os.getenv("ASSET_WEBP_QUALITY", "80"))
+
+
+def _static_serving() -> bool:
+    import streamlit as st
+
+    try:
+        return bool(st.get_option("server.enableStaticServing"))
+    except Exception:
+        return False
+
+
+@lru_cache(maxsize=None)
+def _variant(name: str, width: int | None) -> Tuple[bytes, str, int]:
+    """(bytes, mime type, pixel width) of `name` at most `width` px wide."""
+    path = RESOURCES_DIR / name
+    data = path.read_bytes()
+    mime = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+    if Image is None:
+        return data, mime, 0
+    with Image.open(io.BytesIO(data)) as img:
+        full = img.width
+        if not width or width >= full:  # nothing to shrink
+            return data, mime, full
+        out = io.BytesIO()
+        img.resize((width, round(img.height * width / full)), Image.LANCZOS).save(out, "WEBP", quality=ASSET_WEBP_QUALITY)
+    webp = out.getvalue()
+    # keep the original if the smaller image does not come out smaller
+    return (webp, "image/webp", width) if len(webp) < len(data) else (data, mime, full)
+
+
+@lru_cache(maxsize=None)
+def _url(name: str, width: int | None, static: bool) -> str:
+    data, mime, _ = _variant(name, width)
+    if not static:
+        return f"data:{mime};base64,{base64.b64encode(data).decode()}"
+    digest = hashlib.sha256(data).hexdigest()[:12]
+    ext = mimetypes.guess_extension(mime) or Path(name).suffix
+    target = STATIC_DIR / f"{Path(name).stem}-{width or 'full'}-{digest}{ext}"
+    if not target.exists():
+        STATIC_DIR.mkdir(exist_ok=True)
+        tmp = target.with_suffix(".tmp")
+        tmp.write_bytes(data)
+        tmp.replace(target)
+    # the ?v= argument makes the static handler send a far-future Cache-Control
+    return f"app/static/{target.name}?v={digest}"
+
+
+def _widths(name: str) -> List[int]:
+    """Configured widths below the image's own width, plus that width."""
+    full = _variant(name, None)[2]
+    if not full:
+        return []
+    return sorted({w for w in ASSET_WIDTHS if w < full} | {full})
+
+
+def _pick(widths: List[int], px: int) -> int | None:
+    """Smallest variant at least `px` wide (the largest if none is)."""
+    if not widths:
+        return None
+    return next((w for w in widths if w >= px), widths[-1])
+
+
+def image_url(name: str, width: int | None = None) -> str:
+    """URL (static or data URI) of resources/`name`, at most `width` px wide."""
+    return _url(name, width, _static_serving())
+
+
+def img_tag(name: str, display_px: int, alt: str = "", style: str = "") -> str:
+    """
+    <img> shown `display_px` CSS pixels wide. Statically served images get
+    a srcset of every variant; inlined ones embed only the variant sharp on
+    2x screens, since every data URI in a srcset would be sent.
+    """
+    static = _static_serving()
+    widths = _widths(name)
+    src = _url(name, _pick(widths, 2 * display_px), static)
+    srcset = ""
+    if static and len(widths) > 1:
+        variants = ", ".join(f"{_url(name, w, static)} {w}w" for w in widths)
+        srcset = f" srcset='{variants}' sizes='{display_px}px'"
+    return f"<img src='{src}'{srcset} alt='{alt}' style='width:{display_px}px;{style}'>"
+
+
+def background_css(selector: str, name: str) -> str:
+    """
+    CSS giving `selector` the image as a full-viewport background: one
+    variant per viewport width when served statically, else the one
+    variant for the widest configured viewport.
+    """
+    widths = _widths(name)
+    if not _static_serving():
+        return f"{selector} {{ background-image: url('{image_url(name, _pick(widths, max(ASSET_WIDTHS)))}'); }}"
+    rules = [f"{selector} {{ background-image: url('{image_url(name, widths[-1] if widths else None)}'); }}"]
+    for w in reversed(widths[:-1]):
+        rules.append(f"@media (max-width: {w}px) {{ {selector} {{ background-image: url('{image_url(name, w)}'); }} }}")
+    return "\n".join(rules)
+
+
+@lru_cache(maxsize=None)
+def css(name: str = "style.css") -> str:
+    """Contents of a stylesheet next to the app, '' if it is missing."""
+    path = APP_DIR / name
+    return path.read_text() if path.exists() else ""
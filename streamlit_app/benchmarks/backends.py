@@ -0,0 +1,103 @@
+# backends.py
+# ─────────────────────────────────────────────────────────────────────────────
+# Timings shared by every storage backend, so an embedded engine can stand
+# in for Atlas in load tests. The conformance checks are the pytest suite in
+# tests/test_backends.py. Needs no network for SQLite; point MONGODB_URI at a
+# local mongod to include MongoDB (a scratch database is created and dropped).
+#
+#   python -m benchmarks.backends                  # sqlite only
+#   python -m benchmarks.backends sqlite mongo     # both
+#   python -m benchmarks.backends sqlite --entries 20000
+# ─────────────────────────────────────────────────────────────────────────────
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Callable, Dict, Iterator
+
+from storage import JournalStore, make_store
+
+DAY = date(2025, 1, 15)
+
+
+# ─── fixtures ───────────────────────────────────────────────────────────────
+@contextmanager
+def _scratch_store(backend: str) -> Iterator[JournalStore]:
+    if backend == "sqlite":
+        with tempfile.TemporaryDirectory() as tmp:
+            yield make_store("sqlite", path=str(Path(tmp) / "journal.sqlite3"))
+    elif backend == "mongo":
+        store = make_store("mongo", db_name="me_journal_benchmark")
+        store.client.drop_database(store.db_name)
+        try:
+            yield store
+        finally:
+            store.client.drop_database(store.db_name)
+    else:
+        raise SystemExit(f"unknown backend {backend!r}")
+
+
+def _structured(i: int, day: date) -> Dict:
+    return {
+        "Schedule": [
+            {"time": f"{8 + i % 12:02d}:00", "task": f"Task {i % 50}", "event_date": (day + timedelta(days=i % 30)).isoformat()},
+        ],
+        "Relationships": [
+            {"name": f"Person {i % 40}", "role": "friend", "details": {}, "notes": [f"note {i}"]},
+        ],
+        "Mind Space": [{"thought": f"thinking about topic{i % 25}"}],
+    }
+
+
+# ─── performance ────────────────────────────────────────────────────────────
+def _timed(fn: Callable[[], object], repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+
+def run_performance(store: JournalStore, n_entries: int, repeat: int = 20) -> Dict[str, float]:
+    """Load `n_entries` synthetic entries and time each helper (median ms)."""
+    store.ensure_indexes()
+    rng = random.Random(7)
+    t0 = time.perf_counter()
+    for i in range(n_entries):
+        store.add_entry(f"entry {i} about topic{i % 25}", _structured(i, DAY), DAY + timedelta(days=rng.randrange(365)))
+    timings = {"add_entry (per entry)": (time.perf_counter() - t0) * 1000 / max(n_entries, 1)}
+    timings["day_view (60 days ahead)"] = _timed(lambda: store.day_view(DAY, 60), repeat)
+    timings["entries_by_date"] = _timed(lambda: store.entries_by_date(DAY + timedelta(days=100)), repeat)
+    timings["entries_with_future_events"] = _timed(lambda: store.entries_with_future_events(DAY, 60), repeat)
+    timings["events_between"] = _timed(lambda: store.events_between(DAY, DAY + timedelta(days=60)), repeat)
+    timings["search_entries"] = _timed(lambda: store.search_entries("topic7"), repeat)
+    timings["latest_entry"] = _timed(store.latest_entry, repeat)
+    timings["all_entries"] = _timed(store.all_entries, min(repeat, 5))
+    timings["iter_entries (prompt only)"] = _timed(lambda: sum(1 for _ in store.iter_entries(["prompt"])), min(repeat, 5))
+    counter = iter(range(10**9))
+    timings["purge_schedule_task"] = _timed(lambda: store.purge_schedule_task(f"task {next(counter) % 50}"), min(repeat, 10))
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Storage backend timings")
+    parser.add_argument("backends", nargs="*", default=["sqlite"])
+    parser.add_argument("--entries", type=int, default=5000, help="entries to load for the timing run")
+    args = parser.parse_args()
+
+    for backend in args.backends:
+        print(f"[{backend}] performance, {args.entries} entries (median ms)")
+        with _scratch_store(backend) as store:
+            for name, ms in run_performance(store, args.entries).items():
+                print(f"  {name:28} {ms:9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# fastpath.py
+# ─────────────────────────────────────────────────────────────────────────────
+# How many prompts the rule-based fast path answers without the LLM, and
+# what that saves.
+#
+# Prompts come from a built-in sample of typical inputs, a text file (one
+# prompt per line) or the configured journal itself. The LLM cost per prompt
+# is taken from --llm-ms; pass --live to measure it against the agent
+# instead (one real call per fallback prompt).
+#
+#   python -m benchmarks.fastpath
+#   python -m benchmarks.fastpath --prompts prompts.txt --llm-ms 1800
+#   python -m benchmarks.fastpath --journal --live
+# ─────────────────────────────────────────────────────────────────────────────
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+from collections import Counter
+from datetime import date
+from pathlib import Path
+from typing import List
+
+from fastpath import extract
+
+SAMPLE = [
+    "At 3 pm call Alice",
+    "dentist tomorrow 10:00",
+    "meet Bob on Friday at noon",
+    "Gym 18:30",
+    "lunch with Sarah 12:30 on 5 March",
+    "Team standup at 9:15 next monday",
+    "pay rent 1/11 at 9am",
+    "Dinner with Tom 7 pm",
+    "call mum tonight 8pm",
+    "Pick up Emma from school at 15:45",
+    "Haircut saturday 11:00",
+    "Flight to Berlin 2025-06-02 06:40",
+    "I felt tired today, call mum at 5pm and then gym at 7pm",
+    "Reflect on how the week went",
+    "Had a great chat with Jonas about his new job, he seems happier",
+    "Need to think about whether to move apartments",
+    "Remember to buy milk",
+    "Call the plumber at 8am?",
+    "Morning run, then groceries at 10 and lunch with Anna at 1pm",
+    "Anna is my sister, she lives in Munich and loves climbing",
+]
+
+
+def _journal_prompts() -> List[str]:
+    from database import iter_entries
+
+    return [e["prompt"] for e in iter_entries(["prompt"]) if e.get("prompt")]
+
+
+def _agent_ms(prompt: str) -> float:
+    from agent import call_agent
+
+    t0 = time.perf_counter()
+    call_agent(prompt)
+    return (time.perf_counter() - t0) * 1000
+
+
+def run_benchmark(prompts: List[str], llm_ms: float, live: bool = False) -> None:
+    today = date.today()
+    fast_us, fallback, reasons = [], [], Counter()
+    for prompt in prompts:
+        t0 = time.perf_counter()
+        result = extract(prompt, today)
+        fast_us.append((time.perf_counter() - t0) * 1e6)
+        if not result.confident:
+            fallback.append(prompt)
+            reasons.update(result.reasons or ["low confidence"])
+
+    if live and fallback:
+        llm_ms = statistics.median(_agent_ms(p) for p in fallback)
+
+    n, hits = len(prompts), len(prompts) - len(fallback)
+    print(f"prompts              {n}")
+    print(f"fast path            {hits} ({hits / n:.0%})  – no LLM call")
+    print(f"agent fallback       {len(fallback)} ({len(fallback) / n:.0%})")
+    print(f"fast path latency    median {statistics.median(fast_us):.0f} µs   max {max(fast_us):.0f} µs")
+    print(f"LLM latency          {llm_ms:.0f} ms per call{' (measured)' if live and fallback else ''}")
+    print(f"saved                {hits * llm_ms / 1000:.1f} s total, {hits * llm_ms / n:.0f} ms per prompt on average")
+    if reasons:
+        print("fallback reasons     " + ", ".join(f"{r} ×{c}" for r, c in reasons.most_common()))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fast-path parser coverage + latency saved")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--prompts", type=Path, help="text file, one prompt per line")
+    source.add_argument("--journal", action="store_true", help="use every prompt stored in the journal")
+    parser.add_argument("--llm-ms", type=float, default=1500.0, help="assumed agent round trip per prompt")
+    parser.add_argument("--live", action="store_true", help="measure the agent round trip on the fallback prompts")
+    args = parser.parse_args()
+
+    if args.prompts:
+        prompts = [line.strip() for line in args.prompts.read_text().splitlines() if line.strip()]
+    elif args.journal:
+        prompts = _journal_prompts()
+    else:
+        prompts = SAMPLE
+    if not prompts:
+        raise SystemExit("no prompts")
+    run_benchmark(prompts, args.llm_ms, args.live)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+# startup.py
+# ─────────────────────────────────────────────────────────────────────────────
+# Import-time benchmark for database.py.
+#
+# Each sample runs in a fresh interpreter so nothing is cached:
+#   • import        – `import database` as Home.py does (no network I/O now)
+#   • import+ping   – import followed by one ping, i.e. what every process
+#                     start used to pay when the client pinged at import
+#
+#   python benchmarks/startup.py [runs]
+# ─────────────────────────────────────────────────────────────────────────────
+from __future__ import annotations
+
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parent.parent
+
+SCENARIOS = {
+    "import": "import database",
+    "import+ping": "import database; database.ping()",
+}
+
+TIMER = """
+import time
+t0 = time.perf_counter()
+{stmt}
+print(time.perf_counter() - t0)
+"""
+
+
+def _sample(stmt: str) -> float:
+    out = subprocess.run(
+        [sys.executable, "-c", TIMER.format(stmt=stmt)],
+        cwd=APP_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return float(out.stdout.strip().splitlines()[-1]) * 1000
+
+
+def run_benchmark(runs: int = 5) -> None:
+    for name, stmt in SCENARIOS.items():
+        samples = [_sample(stmt) for _ in range(runs)]
+        print(
+            f"{name:12} median {statistics.median(samples):8.1f} ms"
+            f"   min {min(samples):8.1f} ms   max {max(samples):8.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
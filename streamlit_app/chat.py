@@ -0,0 +1,203 @@
+# chat.py
+# ─────────────────────────────────────────────────────────────────────────────
+# Conversations with the chat agents (AgentAsk, AgentTalksLikeYou), with the
+# reply shown token by token.
+#
+# A `messages` event sent with stream=true makes the agent's llm_chat step
+# forward every token delta to the run's websocket on the Restack engine
+# (/stream/ws/agent?agentId=…&runId=…). stream_reply() subscribes to that
+# socket, sends the event on a worker thread and yields the deltas as they
+# arrive, so the user waits for the first token instead of the whole
+# completion. The event's response stays authoritative: anything the socket
+# missed is yielded from it at the end. Without the optional websockets
+# package, or when the socket cannot be opened, the reply arrives in one
+# piece.
+#
+# Deltas carry no request id and the agent keeps one conversation per run,
+# so every conversation needs its own agent run: ChatAgent.start_run()
+# schedules one (POST /api/agents/<name>) and the page keeps it in the
+# session. A run pinned through the environment is shared by every session;
+# a per-run lock lets only one reply stream on a run at a time, so deltas
+# never interleave.
+# ─────────────────────────────────────────────────────────────────────────────
+from __future__ import annotations
+
+import contextvars
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterator, List
+
+from agent import BASE_URL
+from tracing import span
+from transport import RESTACK_CONNECT_TIMEOUT_S, RESTACK_READ_TIMEOUT_S, get_transport
+
+try:
+    from websockets.exceptions import ConnectionClosed, WebSocketException
+    from websockets.sync.client import connect as ws_connect
+except ImportError:  # optional – replies then arrive in one piece
+    ws_connect = None
+
+# https://host → wss://host, http://host → ws://host
+STREAM_BASE_URL = os.getenv("RESTACK_STREAM_BASE_URL", "").rstrip("/") or "ws" + BASE_URL.removeprefix("http")
+STREAM_POLL_S = 0.25  # how often a silent socket checks whether the event already returned
+CHAT_WORKERS = int(os.getenv("CHAT_WORKERS", "8"))  # events in flight across sessions
+
+
+@dataclass(frozen=True)
+class AgentRun:
+    """One run of a chat agent: the conversation its events belong to."""
+
+    name: str
+    agent_id: str
+    run_id: str
+
+    @property
+    def endpoint(self) -> str:
+        return f"{BASE_URL}/api/agents/{self.name}/{self.agent_id}/{self.run_id}"
+
+    @property
+    def stream_url(self) -> str:
+        return f"{STREAM_BASE_URL}/stream/ws/agent?agentId={self.agent_id}&runId={self.run_id}"
+
+
+@dataclass(frozen=True)
+class ChatAgent:
+    label: str
+    name: str
+    agent_id: str = ""  # a run pinned through the environment, shared by every session
+    run_id: str = ""
+
+    @property
+    def pinned(self) -> bool:
+        return bool(self.agent_id and self.run_id)
+
+    def start_run(self) -> AgentRun:
+        """The pinned run, or a new run of the agent for one conversation."""
+        if self.pinned:
+            return AgentRun(self.name, self.agent_id, self.run_id)
+        resp = get_transport().post(f"{BASE_URL}/api/agents/{self.name}", json={}, endpoint=f"{self.name} start")
+        ids = resp.json()
+        return AgentRun(self.name, ids["agentId"], ids["runId"])
+
+
+CHAT_AGENTS: List[ChatAgent] = [
+    ChatAgent("Ask my journal", "AgentAsk", os.getenv("RESTACK_ASK_AGENT_ID", ""), os.getenv("RESTACK_ASK_RUN_ID", "")),
+    ChatAgent(
+        "Talk like me", "AgentTalksLikeYou", os.getenv("RESTACK_TALK_AGENT_ID", ""), os.getenv("RESTACK_TALK_RUN_ID", "")
+    ),
+]
+
+_executor = ThreadPoolExecutor(max_workers=CHAT_WORKERS, thread_name_prefix="chat")
+_run_locks: Dict[str, threading.Lock] = {}
+_run_locks_guard = threading.Lock()
+
+
+def _run_lock(run: AgentRun) -> threading.Lock:
+    with _run_locks_guard:
+        return _run_locks.setdefault(run.run_id, threading.Lock())
+
+
+def _delta(message: str | bytes) -> str:
+    """Text of one forwarded chat.completion.chunk ("" for anything else)."""
+    try:
+        chunk = json.loads(message)
+        return chunk["choices"][0]["delta"].get("content") or ""
+    except (ValueError, KeyError, IndexError, TypeError, AttributeError):
+        return ""
+
+
+class ReplyStream:
+    """
+    Iterable of one reply's text deltas (for st.write_stream). Once consumed,
+    `content` is the complete reply and `first_token_ms` / `total_ms` its
+    timings; iterating raises if the agent call failed.
+    """
+
+    def __init__(self, run: AgentRun, text: str) -> None:
+        self.run = run
+        self.text = text
+        self.content = ""
+        self.streamed = False  # deltas came over the socket
+        self.first_token_ms: float | None = None
+        self.total_ms: float | None = None
+        self._started = 0.0
+
+    def __iter__(self) -> Iterator[str]:
+        self._started = time.perf_counter()
+        lock = _run_lock(self.run)
+        if not lock.acquire(timeout=RESTACK_READ_TIMEOUT_S):
+            raise RuntimeError("the agent run is still answering another message")
+        try:
+            yield from self._reply()
+        finally:
+            lock.release()
+
+    def _reply(self) -> Iterator[str]:
+        with span("chat.reply", agent=self.run.name) as s:
+            ws = self._subscribe()
+            ctx = contextvars.copy_context()  # keeps the transport's spans in this trace
+            result = _executor.submit(ctx.run, self._send, ws is not None)
+            try:
+                if ws is not None:
+                    yield from self._relay(ws, result)
+            finally:
+                if ws is not None:
+                    ws.close()
+            final = result.result()
+            if final.startswith(self.content) and len(final) > len(self.content):
+                yield self._take(final[len(self.content):])
+            self.content = final
+            self.total_ms = (time.perf_counter() - self._started) * 1000
+            s.set("streamed", self.streamed)
+            s.set("first_token_ms", round(self.first_token_ms or self.total_ms, 1))
+
+    def _take(self, delta: str) -> str:
+        if self.first_token_ms is None:
+            self.first_token_ms = (time.perf_counter() - self._started) * 1000
+        self.content += delta
+        return delta
+
+    def _subscribe(self):
+        if ws_connect is None:
+            return None
+        try:
+            return ws_connect(self.run.stream_url, open_timeout=RESTACK_CONNECT_TIMEOUT_S)
+        except (OSError, TimeoutError, WebSocketException):
+            return None  # no live tokens; the reply still comes with the event
+
+    def _relay(self, ws, result: Future) -> Iterator[str]:
+        deadline = time.monotonic() + RESTACK_READ_TIMEOUT_S
+        while time.monotonic() < deadline:
+            try:
+                message = ws.recv(timeout=STREAM_POLL_S)
+            except TimeoutError:
+                if result.done():
+                    return  # answered without (further) deltas
+                continue
+            except ConnectionClosed:
+                return
+            if message == "[DONE]":
+                return
+            if delta := _delta(message):
+                self.streamed = True
+                yield self._take(delta)
+
+    def _send(self, stream: bool) -> str:
+        payload = {
+            "eventName": "messages",
+            "eventInput": {"messages": [{"role": "user", "content": self.text}], "stream": stream},
+        }
+        resp = get_transport().put(self.run.endpoint, json=payload, endpoint=self.run.name, idempotent=False)
+        for msg in reversed(resp.json()):
+            if msg.get("role") == "assistant":
+                return msg.get("content") or ""
+        raise RuntimeError("No assistant message returned")
+
+
+def stream_reply(run: AgentRun, text: str) -> ReplyStream:
+    """Send `text` to the agent run; iterate the result for the reply as it is generated."""
+    return ReplyStream(run, text)
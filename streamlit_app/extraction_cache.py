@@ -0,0 +1,137 @@
+# extraction_cache.py
+# ─────────────────────────────────────────────────────────────────────────────
+# Content-addressed cache of AgentStructureResult extractions.
+#
+# Key   sha256(normalized prompt, extraction version, response schema, model)
+#       – changing the agent's instructions or output schema (and bumping
+#       EXTRACTION_CACHE_VERSION with it) or switching models never serves
+#       old results
+# Tiers in-memory LRU of JSON text  →  SQLite file with TTL + size eviction
+#
+# Values are kept as JSON text and decoded on every hit, so callers get a
+# fresh dict they are free to mutate.
+# ─────────────────────────────────────────────────────────────────────────────
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict
+
+APP_DIR = Path(__file__).resolve().parent
+EXTRACTION_CACHE_PATH = os.getenv("EXTRACTION_CACHE_PATH", str(APP_DIR / "extraction_cache.sqlite3"))
+EXTRACTION_CACHE_TTL_S = float(os.getenv("EXTRACTION_CACHE_TTL_S", str(30 * 24 * 3600)))
+EXTRACTION_CACHE_MAX_BYTES = int(os.getenv("EXTRACTION_CACHE_MAX_BYTES", str(50 * 1024 * 1024)))
+EXTRACTION_CACHE_MEMORY_ITEMS = int(os.getenv("EXTRACTION_CACHE_MEMORY_ITEMS", "512"))
+EXTRACTION_MODEL = os.getenv("EXTRACTION_MODEL", "gpt-4o-mini")  # llm_chat's default
+# agent_chat's structured_output.EXTRACTION_VERSION (system prompt + schema)
+# and the agent's RESPONSE_SCHEMA; keep them in step with the agent's code.
+EXTRACTION_CACHE_VERSION = os.getenv("EXTRACTION_CACHE_VERSION", "2")
+EXTRACTION_SCHEMA = os.getenv("EXTRACTION_SCHEMA", "structured_result")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS extractions (
+    key         TEXT PRIMARY KEY,
+    value       TEXT NOT NULL,
+    size        INTEGER NOT NULL,
+    created_at  REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS extractions_accessed_at ON extractions(accessed_at);
+"""
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Unicode-normalized, case-folded, whitespace-collapsed prompt text."""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFKC", prompt)).strip().casefold()
+
+
+class ExtractionCache:
+    """Two-tier (memory LRU → SQLite) cache of structured extraction results."""
+
+    def __init__(
+        self,
+        path: str = EXTRACTION_CACHE_PATH,
+        ttl_s: float = EXTRACTION_CACHE_TTL_S,
+        max_bytes: int = EXTRACTION_CACHE_MAX_BYTES,
+        memory_items: int = EXTRACTION_CACHE_MEMORY_ITEMS,
+        model: str = EXTRACTION_MODEL,
+        version: str = EXTRACTION_CACHE_VERSION,
+        schema: str = EXTRACTION_SCHEMA,
+    ) -> None:
+        self.ttl_s = ttl_s
+        self.max_bytes = max_bytes
+        self.memory_items = memory_items
+        self._salt = hashlib.sha256(f"{version}\0{schema}\0{model}".encode()).hexdigest()
+        self._memory: "OrderedDict[str, tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode = WAL")
+            self._conn.executescript(_SCHEMA)
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+
+    def key(self, prompt: str) -> str:
+        return hashlib.sha256(f"{self._salt}\0{normalize_prompt(prompt)}".encode()).hexdigest()
+
+    def get(self, prompt: str) -> Dict[str, Any] | None:
+        key, now = self.key(prompt), time.time()
+        with self._lock:
+            hit = self._memory.get(key)
+            if hit is not None and now - hit[1] < self.ttl_s:
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return json.loads(hit[0])
+            row = self._conn.execute("SELECT value, created_at FROM extractions WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row[1] >= self.ttl_s:
+                self.stats["misses"] += 1
+                return None
+            with self._conn:
+                self._conn.execute("UPDATE extractions SET accessed_at = ? WHERE key = ?", (now, key))
+            self._remember(key, row[0], row[1])
+            self.stats["disk_hits"] += 1
+            return json.loads(row[0])
+
+    def put(self, prompt: str, result: Dict[str, Any]) -> None:
+        key, value, now = self.key(prompt), json.dumps(result), time.time()
+        with self._lock:
+            self._remember(key, value, now)
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO extractions(key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                    (key, value, len(value), now, now),
+                )
+                self._evict(now)
+
+    def _remember(self, key: str, value: str, created_at: float) -> None:
+        self._memory[key] = (value, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def _evict(self, now: float) -> None:
+        """Drop expired rows, then least recently used ones until under max_bytes."""
+        cur = self._conn.execute("DELETE FROM extractions WHERE created_at <= ?", (now - self.ttl_s,))
+        self.stats["evictions"] += cur.rowcount
+        (total,) = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM extractions").fetchone()
+        if total <= self.max_bytes:
+            return
+        for key, size in self._conn.execute("SELECT key, size FROM extractions ORDER BY accessed_at").fetchall():
+            self._conn.execute("DELETE FROM extractions WHERE key = ?", (key,))
+            self._memory.pop(key, None)
+            self.stats["evictions"] += 1
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            (rows, size) = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM extractions").fetchone()
+            return {**self.stats, "memory_items": len(self._memory), "disk_items": rows, "disk_bytes": size}
@@ -0,0 +1,171 @@
+# fastpath.py
+# ─────────────────────────────────────────────────────────────────────────────
+# Rule-based extractor for short schedule commands – "At 3 pm call Alice",
+# "dentist tomorrow 10:00", "meet Bob on Friday at noon".
+#
+# It returns the same {"Schedule", "Relationships", "Mind Space"} structure
+# as AgentStructureResult plus a confidence score. Anything it is not sure
+# about (several times, several clauses, long free text, questions, time
+# words it did not parse, a task cut off mid-phrase, a capitalized word
+# that may or may not be a person, a negated or cancelled command) scores
+# low and goes to the agent as before. Without an explicit date the item
+# has no event_date, so the page asks for one as it does for the agent's.
+# ─────────────────────────────────────────────────────────────────────────────
+from __future__ import annotations
+
+import datetime as _dt
+import os
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Tuple
+
+from storage.dates import parse_date, parse_time
+
+FASTPATH_MIN_CONFIDENCE = float(os.getenv("FASTPATH_MIN_CONFIDENCE", "0.8"))
+FASTPATH_MAX_WORDS = int(os.getenv("FASTPATH_MAX_WORDS", "12"))
+
+_WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+_MONTHS = r"jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|jun(?:e)?|jul(?:y)?|aug(?:ust)?|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?"
+
+_TIME = re.compile(
+    r"\b(?:(?P<hm>[01]?\d|2[0-3])[:.](?P<min>[0-5]\d)\s*(?P<ap1>[ap]\.?m\.?)?"
+    r"|(?P<h>1[0-2]|0?[1-9])\s*(?P<ap2>[ap]\.?m\.?)"
+    r"|(?P<word>noon|midday|midnight))\b",
+    re.I,
+)
+_DATE = re.compile(
+    rf"\b(?:(?P<rel>day after tomorrow|today|tonight|tomorrow)"
+    rf"|(?:(?P<next>next|this)\s+)?(?P<wd>{'|'.join(_WEEKDAYS)})"
+    rf"|(?P<iso>\d{{4}}-\d{{2}}-\d{{2}})"
+    rf"|(?P<dm>\d{{1,2}}(?:st|nd|rd|th)?\s+(?:{_MONTHS})|(?:{_MONTHS})\s+\d{{1,2}}(?:st|nd|rd|th)?)"
+    rf"|(?P<num>\d{{1,2}}[/.]\d{{1,2}}(?:[/.]\d{{2,4}})?))\b",
+    re.I,
+)
+# Connectives left dangling once the time/date tokens are cut out.
+_FILLER = re.compile(r"^(?:(?:at|on|by|for|around|from|this|the)\s+)+|(?:\s+(?:at|on|by|for|around|from|this|the))+$", re.I)
+# Verbs whose object is a person. After the weak ones a capitalized word
+# may as well be a place ("visit Paris"), so the agent decides.
+_PERSON = re.compile(
+    r"\b(?P<verb>(?i:call|ring|phone|text|email|e-mail|message|meet|pick up|drop off|visit|see|with))\s+"
+    r"(?P<name>[A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)"
+)
+_WEAK_PERSON_VERBS = frozenset({"visit", "see", "with"})
+# Time words left in the task: a date or recurrence the rules did not parse.
+_TEMPORAL = re.compile(
+    rf"\b(?:every|each|ago|from now|daily|weekly|monthly|yearly|weekends?|weeks?|months?|years?"
+    rf"|(?:in|within)\s+(?:a|an|\d+|few|couple)\b"
+    rf"|(?:{'|'.join(_WEEKDAYS)})s?|{_MONTHS})\b",
+    re.I,
+)
+# A task ending like this lost its object to a cut time/date ("moved dentist to 4pm").
+_DANGLING = re.compile(r"\b(?:to|in|at|on|by|for|from|with|until|till|before|after|of|into|about|between)$", re.I)
+# "Don't call Alice", "cancel dentist": not a new event, whatever the agent makes of it.
+_NEGATION = re.compile(r"\b(?:not|never|no longer|cancel\w*|skip\w*|call off|calling off)\b|n['’]t\b", re.I)
+# Signs of a reflective or compound prompt the rules cannot do justice to.
+_COMPLEX = re.compile(r"[?!;]|\.\s+\S|\b(?:and|then|but|because|also|feel|felt|think|thought|remember)\b", re.I)
+
+
+@dataclass
+class FastPathResult:
+    structured: Dict[str, List[Dict[str, Any]]]
+    confidence: float
+    reasons: List[str]
+
+    @property
+    def confident(self) -> bool:
+        return self.confidence >= FASTPATH_MIN_CONFIDENCE
+
+
+def _time_of(m: re.Match) -> _dt.time | None:
+    word = (m.group("word") or "").lower()
+    if word:
+        return _dt.time(0) if word == "midnight" else _dt.time(12)
+    meridiem = (m.group("ap1") or m.group("ap2") or "").replace(".", "")
+    clock = f"{m.group('hm')}:{m.group('min')}" if m.group("hm") else m.group("h")
+    return parse_time(f"{clock} {meridiem}".strip())
+
+
+def _date_of(m: re.Match, today: _dt.date) -> _dt.date | None:
+    rel = (m.group("rel") or "").lower()
+    if rel:
+        return today + _dt.timedelta(days={"tomorrow": 1, "day after tomorrow": 2}.get(rel, 0))
+    if m.group("wd"):
+        ahead = (_WEEKDAYS.index(m.group("wd").lower()) - today.weekday()) % 7
+        if m.group("next") and m.group("next").lower() == "next" and ahead == 0:
+            ahead = 7
+        return today + _dt.timedelta(days=ahead)
+    d = parse_date(m.group(0).replace(".", "/"))
+    if d and not re.search(r"\d{4}", m.group(0)) and d < today:
+        d = d.replace(year=d.year + 1)  # "5 March" after March 5th means next year's
+    return d
+
+
+def _cut(text: str, spans: List[Tuple[int, int]]) -> str:
+    for start, end in sorted(spans, reverse=True):
+        text = text[:start] + " " + text[end:]
+    text = re.sub(r"\s+", " ", text).strip(" ,.-")
+    return _FILLER.sub("", text).strip(" ,.-")
+
+
+def extract(prompt: str, today: _dt.date | None = None) -> FastPathResult:
+    """
+    Best-effort structured result for `prompt`. Relative dates count from
+    `today`; without an explicit date the item's event_date is left empty.
+    """
+    today = today or _dt.date.today()
+    text = prompt.strip()
+    empty = {"Schedule": [], "Relationships": [], "Mind Space": []}
+    reasons: List[str] = []
+
+    times = list(_TIME.finditer(text))
+    if len(times) != 1:
+        return FastPathResult(empty, 0.0, ["no time" if not times else "several times"])
+    at = _time_of(times[0])
+    if at is None:
+        return FastPathResult(empty, 0.0, ["unparseable time"])
+
+    # Date tokens inside the time match (e.g. "10.30") are not dates.
+    dates = [m for m in _DATE.finditer(text) if not (times[0].start() <= m.start() < times[0].end())]
+    if len(dates) > 1:
+        return FastPathResult(empty, 0.0, ["several dates"])
+    day = _date_of(dates[0], today) if dates else None
+    if dates and day is None:
+        return FastPathResult(empty, 0.0, ["unparseable date"])
+
+    confidence = 1.0
+    if not dates:
+        confidence -= 0.15
+        reasons.append("no explicit date")
+    if _NEGATION.search(text):
+        confidence -= 0.5
+        reasons.append("negated or cancelled")
+    if _COMPLEX.search(text):
+        confidence -= 0.5
+        reasons.append("compound or reflective text")
+    words = len(text.split())
+    if words > FASTPATH_MAX_WORDS:
+        confidence -= 0.1 * (words - FASTPATH_MAX_WORDS)
+        reasons.append(f"{words} words")
+
+    task = _cut(text, [times[0].span()] + [m.span() for m in dates])
+    if not task or not re.search(r"[A-Za-z]", task):
+        return FastPathResult(empty, 0.0, ["no task"])
+    task = task[0].upper() + task[1:]
+    if _TEMPORAL.search(task):
+        confidence -= 0.5
+        reasons.append("unparsed time words")
+    if _DANGLING.search(task):
+        confidence -= 0.4
+        reasons.append("dangling preposition")
+
+    matches = list(_PERSON.finditer(task))
+    if any(m.group("verb").lower() in _WEAK_PERSON_VERBS for m in matches):
+        confidence -= 0.3
+        reasons.append("person only by capitalization")
+    people = [{"name": m.group("name"), "role": "", "details": {}, "notes": []} for m in matches]
+    structured = {
+        "Schedule": [{"time": at.strftime("%H:%M"), "task": task, "event_date": day.isoformat() if day else None}],
+        "Relationships": people,
+        "Mind Space": [],
+    }
+    return FastPathResult(structured, round(max(confidence, 0.0), 2), reasons)
@@ -0,0 +1,352 @@
+# importer.py
+# ─────────────────────────────────────────────────────────────────────────────
+# Bulk import of existing notes into the journal.
+#
+# The file is streamed and split into entries:
+#   .ndjson / .jsonl   one object per line: prompt (or text), optional
+#                      journal_date (or date)
+#   .md / .txt         blank-line separated paragraphs; a line (or heading)
+#                      that is just a date sets the journal date of the
+#                      paragraphs after it
+#
+# Entries are extracted like typed prompts (fast path → cache → agent) on a
+# bounded worker pool, in groups of IMPORT_AGENT_BATCH: a group's cache
+# misses go to the agent as one rate-limited extract_batch request. Results
+# are written in order through batched add_entries. Progress is checkpointed next to the file
+# after every batch, so a re-run resumes where the last one stopped.
+# Entries that fail are appended to <file>.failed.ndjson, itself importable;
+# NDJSON lines that are not entries land there too, verbatim under "line".
+#
+#   python importer.py notes.md
+#   python importer.py export.ndjson --concurrency 8 --rate 4 --date 2023-01-01
+# ─────────────────────────────────────────────────────────────────────────────
+from __future__ import annotations
+
+import argparse
+import datetime as _dt
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterator, List, Tuple
+
+import agent
+from database import add_entries
+from extraction_cache import ExtractionCache
+from storage.dates import parse_date
+
+IMPORT_CONCURRENCY = int(os.getenv("IMPORT_CONCURRENCY", "4"))
+IMPORT_RATE_PER_S = float(os.getenv("IMPORT_RATE_PER_S", "2"))  # agent requests; 0 = unlimited
+IMPORT_AGENT_BATCH = int(os.getenv("IMPORT_AGENT_BATCH", "8"))  # entries per agent request, at most 50
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "50"))
+# uploads from the journal page; kept so an interrupted import can resume
+IMPORT_DIR = Path(os.getenv("IMPORT_DIR", Path(__file__).resolve().parent / ".imports"))
+
+_DIGITS = re.compile(r"\d")
+
+
+@dataclass
+class RawEntry:
+    index: int  # position in the file, the checkpoint unit
+    prompt: str
+    journal_date: _dt.date | None = None
+    error: str | None = None  # the line could not be read; `prompt` holds it as is
+
+
+@dataclass
+class ImportResult:
+    total: int = 0  # entries in the file
+    resumed: int = 0  # skipped, done by an earlier run
+    imported: int = 0
+    failed: int = 0
+    agent_calls: int = 0  # extract_batch requests
+
+
+# ─── splitting ──────────────────────────────────────────────────────────────
+def _date_line(line: str) -> _dt.date | None:
+    """The date a line consists of ("## 2023-04-05", "5 April 2023:"), else None."""
+    text = line.strip().lstrip("#").strip().rstrip(":").strip()
+    if not text or len(text) > 40 or not _DIGITS.search(text):
+        return None
+    return parse_date(text)
+
+
+def _ndjson_fields(line: str) -> Tuple[str, _dt.date | None]:
+    """(prompt, journal_date) of one NDJSON line; ValueError/TypeError if it is not an entry."""
+    obj = json.loads(line)
+    if not isinstance(obj, dict):
+        raise TypeError(f"expected an object, got {type(obj).__name__}")
+    prompt = obj.get("prompt") or obj.get("text") or ""
+    day = obj.get("journal_date") or obj.get("date")
+    if not isinstance(prompt, str):
+        raise TypeError(f"prompt must be a string, got {type(prompt).__name__}")
+    if day is not None and not isinstance(day, str):
+        raise TypeError(f"journal_date must be a string, got {type(day).__name__}")
+    return prompt.strip(), parse_date(day)
+
+
+def _ndjson_entries(path: Path) -> Iterator[RawEntry]:
+    with path.open(encoding="utf-8") as f:
+        index = 0
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                prompt, day = _ndjson_fields(line)
+            except (ValueError, TypeError) as exc:  # keeps its index, fails on its own
+                yield RawEntry(index, line.strip(), error=f"unreadable line: {exc}")
+                index += 1
+                continue
+            if prompt:
+                yield RawEntry(index, prompt, day)
+                index += 1
+
+
+def _text_entries(path: Path) -> Iterator[RawEntry]:
+    with path.open(encoding="utf-8") as f:
+        index, day, para = 0, None, []
+        for line in [*f, ""]:
+            d = _date_line(line)
+            if line.strip() and d is None:
+                para.append(line.strip())
+                continue
+            if para:
+                yield RawEntry(index, " ".join(para), day)
+                index, para = index + 1, []
+            if d is not None:
+                day = d
+
+
+def split_entries(path: Path) -> Iterator[RawEntry]:
+    """Stream the entries of a notes file, in file order."""
+    if path.suffix.lower() in (".ndjson", ".jsonl"):
+        return _ndjson_entries(path)
+    return _text_entries(path)
+
+
+# ─── rate limiting & checkpoint ─────────────────────────────────────────────
+class RateLimiter:
+    """Token bucket shared by the workers: `rate` calls/s, bursts of `burst`."""
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._at) * self.rate)
+                self._at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+def _file_digest(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class Checkpoint:
+    """Entries of `source` already handled, kept in <source>.import.json."""
+
+    def __init__(self, source: Path) -> None:
+        self.path = source.with_name(source.name + ".import.json")
+        self.digest = _file_digest(source)
+        self.done = 0
+        try:
+            state = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            state = {}
+        if state.get("digest") == self.digest:  # same content – resume
+            self.done = state.get("done", 0)
+
+    def save(self, done: int) -> None:
+        self.done = done
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"digest": self.digest, "done": done}))
+        tmp.replace(self.path)
+
+
+def stage_upload(name: str, data: bytes) -> Path:
+    """
+    Save uploaded bytes under IMPORT_DIR. The name carries the content hash,
+    so uploading the same file again picks up its checkpoint.
+    """
+    IMPORT_DIR.mkdir(parents=True, exist_ok=True)
+    path = IMPORT_DIR / f"{hashlib.sha256(data).hexdigest()[:12]}-{Path(name).name}"
+    if not path.exists():
+        path.write_bytes(data)
+    return path
+
+
+# ─── import ─────────────────────────────────────────────────────────────────
+def _prepare(raw: RawEntry, structured: Dict[str, Any], default_date: _dt.date) -> Tuple[str, Dict[str, Any], _dt.date]:
+    """
+    (prompt, structured, journal_date) ready to store. There is nobody to
+    ask, so undated schedule items fall on the entry's journal date.
+    """
+    day = raw.journal_date
+    if day is None:
+        dates = {ev.get("event_date") for ev in structured.get("Schedule", []) if ev.get("event_date")}
+        day = parse_date(dates.pop()) if len(dates) == 1 else None
+    day = day or default_date
+    for ev in structured.get("Schedule", []):
+        if not ev.get("event_date"):
+            ev["event_date"] = day.isoformat()
+    return raw.prompt, structured, day
+
+
+def run_import(
+    path: str | Path,
+    default_date: _dt.date | None = None,
+    concurrency: int = IMPORT_CONCURRENCY,
+    rate: float = IMPORT_RATE_PER_S,
+    batch_size: int = IMPORT_BATCH_SIZE,
+    resume: bool = True,
+    agent_batch: int = IMPORT_AGENT_BATCH,
+    cache: ExtractionCache | None = None,
+    progress: Callable[[ImportResult], None] | None = None,
+) -> ImportResult:
+    """Import every entry of `path`; see the module header."""
+    path = Path(path)
+    default_date = default_date or _dt.date.today()
+    cache = cache or ExtractionCache()
+    limiter = RateLimiter(rate, burst=max(1, concurrency))
+    agent_batch = min(max(1, agent_batch), 50)  # the agent's extract_batch limit
+    checkpoint = Checkpoint(path)
+    if not resume:
+        checkpoint.done = 0
+    failed_path = path.with_name(path.name + ".failed.ndjson")
+    result = ImportResult(resumed=checkpoint.done)
+    lock = threading.Lock()
+
+    def extract(group: List[RawEntry]) -> List[Dict[str, Any] | Exception]:
+        out: List[Dict[str, Any] | Exception | None] = []
+        for raw in group:
+            if raw.error:
+                out.append(ValueError(raw.error))
+                continue
+            day = raw.journal_date or default_date  # "tomorrow" in old notes is relative to the note
+            out.append(agent.lookup(raw.prompt, cache, today=day))
+        misses = [i for i, structured in enumerate(out) if structured is None]
+        if misses:
+            limiter.acquire()
+            try:
+                answers = agent.call_agent_batch([group[i].prompt for i in misses])
+            except Exception as exc:  # the whole request failed
+                answers = [exc] * len(misses)
+            with lock:
+                result.agent_calls += 1
+            for i, answer in zip(misses, answers):
+                if not isinstance(answer, Exception):
+                    cache.put(group[i].prompt, answer)
+                out[i] = answer
+        return out  # type: ignore[return-value]
+
+    batch: List[Tuple[str, Dict[str, Any], _dt.date]] = []
+    failures: List[Dict[str, Any]] = []
+
+    def flush(done: int) -> None:
+        if batch:
+            add_entries(batch)
+            result.imported += len(batch)
+            batch.clear()
+        if failures:
+            with failed_path.open("a", encoding="utf-8") as f:
+                f.writelines(json.dumps(rec) + "\n" for rec in failures)
+            result.failed += len(failures)
+            failures.clear()
+        checkpoint.save(done)
+        if progress:
+            progress(result)
+
+    def settle(group: List[RawEntry], fut: Future) -> None:
+        for raw, structured in zip(group, fut.result()):
+            try:
+                if isinstance(structured, Exception):
+                    raise structured
+                batch.append(_prepare(raw, structured, default_date))
+            except Exception as exc:
+                error = str(exc) or type(exc).__name__
+                if raw.error:  # not an entry; kept verbatim to be fixed by hand
+                    failures.append({"line": raw.prompt, "error": error})
+                else:
+                    day = raw.journal_date.isoformat() if raw.journal_date else None
+                    failures.append({"prompt": raw.prompt, "journal_date": day, "error": error})
+            if len(batch) + len(failures) >= batch_size:
+                flush(raw.index + 1)
+
+    # Results are taken in file order from a bounded window of in-flight
+    # groups, so batches (and the checkpoint) always cover a prefix.
+    window: Deque[Tuple[List[RawEntry], Future]] = deque()
+    group: List[RawEntry] = []
+    last = checkpoint.done
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="import") as pool:
+        for raw in split_entries(path):
+            result.total += 1
+            if raw.index < checkpoint.done:
+                continue
+            group.append(raw)
+            last = raw.index + 1
+            if len(group) >= agent_batch:
+                window.append((group, pool.submit(extract, group)))
+                group = []
+            if len(window) >= 2 * concurrency:
+                settle(*window.popleft())
+        if group:
+            window.append((group, pool.submit(extract, group)))
+        while window:
+            settle(*window.popleft())
+    flush(max(last, checkpoint.done))
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import notes into the journal")
+    parser.add_argument("path", type=Path, help=".md/.txt notes or .ndjson/.jsonl export")
+    parser.add_argument("--date", type=_dt.date.fromisoformat, help="journal date of undated entries (default: today)")
+    parser.add_argument("--concurrency", type=int, default=IMPORT_CONCURRENCY)
+    parser.add_argument("--rate", type=float, default=IMPORT_RATE_PER_S, help="agent requests per second (0 = unlimited)")
+    parser.add_argument("--agent-batch", type=int, default=IMPORT_AGENT_BATCH, help="entries per agent request")
+    parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+    parser.add_argument("--restart", action="store_true", help="ignore the checkpoint and start over")
+    args = parser.parse_args()
+
+    def report(r: ImportResult) -> None:
+        handled = r.resumed + r.imported + r.failed
+        print(f"\r{handled} handled  ({r.imported} imported, {r.failed} failed, {r.agent_calls} agent requests)", end="", flush=True)
+
+    result = run_import(
+        args.path,
+        args.date,
+        args.concurrency,
+        args.rate,
+        args.batch_size,
+        resume=not args.restart,
+        agent_batch=args.agent_batch,
+        progress=report,
+    )
+    print()
+    print(json.dumps(asdict(result)))
+
+
+if __name__ == "__main__":
+    main()
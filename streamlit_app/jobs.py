@@ -0,0 +1,108 @@
+# jobs.py
+# ─────────────────────────────────────────────────────────────────────────────
+# In-process background job queue for ME-Journal. Agent calls run on a
+# worker pool, so the Streamlit script thread never waits on LLM latency
+# and several prompts can be in flight at once. Jobs belong to the browser
+# session that submitted them; the page polls for its finished jobs.
+# ─────────────────────────────────────────────────────────────────────────────
+from __future__ import annotations
+
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List
+
+AGENT_WORKERS = int(os.getenv("AGENT_WORKERS", "4"))
+# Finished jobs nobody collected (closed tabs) are dropped after this long.
+JOB_RETENTION_S = float(os.getenv("JOB_RETENTION_S", "3600"))
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+@dataclass
+class Job:
+    id: str
+    owner: str
+    label: str
+    context: Dict[str, Any] = field(default_factory=dict)  # carried to completion
+    status: str = QUEUED
+    result: Any = None
+    error: str | None = None
+    submitted_at: float = field(default_factory=time.time)
+    finished_at: float | None = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, FAILED)
+
+
+class JobQueue:
+    """Thread pool plus per-owner bookkeeping of submitted jobs."""
+
+    def __init__(self, max_workers: int = AGENT_WORKERS) -> None:
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="agent-job")
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, owner: str, label: str, fn: Callable[..., Any], *args: Any, context: Dict[str, Any] | None = None) -> Job:
+        """Queue `fn(*args)`; its return value becomes the job's result."""
+        job = Job(id=uuid.uuid4().hex, owner=owner, label=label, context=dict(context or {}))
+        with self._lock:
+            self._expire()
+            self._jobs[job.id] = job
+        self._pool.submit(self._run, job, fn, args)
+        return job
+
+    def add_done(self, owner: str, label: str, result: Any, context: Dict[str, Any] | None = None) -> Job:
+        """Record a job whose result is already known (e.g. served from a cache)."""
+        job = Job(
+            id=uuid.uuid4().hex,
+            owner=owner,
+            label=label,
+            context=dict(context or {}),
+            status=DONE,
+            result=result,
+            finished_at=time.time(),
+        )
+        with self._lock:
+            self._jobs[job.id] = job
+        return job
+
+    def _run(self, job: Job, fn: Callable[..., Any], args: tuple) -> None:
+        job.status = RUNNING
+        try:
+            result, error, status = fn(*args), None, DONE
+        except Exception as exc:
+            result, error, status = None, str(exc) or type(exc).__name__, FAILED
+        # readers take finished jobs under the lock; they must never see a
+        # finished status without its finished_at
+        with self._lock:
+            job.result, job.error = result, error
+            job.finished_at = time.time()
+            job.status = status
+
+    def _expire(self) -> None:
+        cutoff = time.time() - JOB_RETENTION_S
+        for job_id in [j.id for j in self._jobs.values() if j.finished and (j.finished_at or cutoff) < cutoff]:
+            del self._jobs[job_id]
+
+    def pending(self, owner: str) -> List[Job]:
+        """Queued or running jobs of `owner`, oldest first."""
+        with self._lock:
+            return [j for j in self._jobs.values() if j.owner == owner and not j.finished]
+
+    def has_finished(self, owner: str) -> bool:
+        with self._lock:
+            return any(j.owner == owner and j.finished for j in self._jobs.values())
+
+    def next_finished(self, owner: str) -> Job | None:
+        """Hand over (and forget) the oldest finished job of `owner`."""
+        with self._lock:
+            for job in self._jobs.values():
+                if job.owner == owner and job.finished:
+                    return self._jobs.pop(job.id)
+        return None
@@ -0,0 +1,59 @@
+# Ask.py
+# ─────────────────────────────────────────────────────────────────────────────
+# Chat with AgentAsk / AgentTalksLikeYou; replies render as their tokens
+# arrive (see chat.py). Each session talks to its own agent run.
+# ─────────────────────────────────────────────────────────────────────────────
+from __future__ import annotations
+
+import streamlit as st
+
+import assets
+import chat
+
+# ─── Page config & CSS injection ───────────────────────────────────────────
+st.set_page_config(
+    page_title="Ask ME",
+    page_icon="💬",
+    layout="wide",
+    initial_sidebar_state="collapsed",
+)
+
+if style := assets.css("style.css"):  # read once per process
+    st.markdown(f"<style>{style}</style>", unsafe_allow_html=True)
+
+
+# ─── Main application ──────────────────────────────────────────────────────
+def main() -> None:
+    chat_agent = st.radio("Agent", chat.CHAT_AGENTS, format_func=lambda a: a.label, horizontal=True, key="chat_agent")
+    history = st.session_state.setdefault(f"chat_{chat_agent.name}", [])
+    for msg in history:
+        with st.chat_message(msg["role"]):
+            st.markdown(msg["content"])
+
+    question = st.chat_input("Ask anything…")
+    if not question:
+        return
+    with st.chat_message("user"):
+        st.markdown(question)
+    run_key = f"chat_run_{chat_agent.name}"
+    if run_key not in st.session_state:
+        try:
+            st.session_state[run_key] = chat_agent.start_run()
+        except Exception as exc:
+            st.error(f"Could not start {chat_agent.label!r}: {exc}")
+            return
+    with st.chat_message("assistant"):
+        reply = chat.stream_reply(st.session_state[run_key], question)
+        try:
+            st.write_stream(reply)
+        except Exception as exc:
+            st.error(f"The agent did not answer: {exc}")
+            return
+        if reply.first_token_ms is not None:
+            st.caption(f"first token after {reply.first_token_ms:,.0f} ms · complete after {reply.total_ms:,.0f} ms")
+    history += [{"role": "user", "content": question}, {"role": "assistant", "content": reply.content}]
+
+
+# ─── Run ───────────────────────────────────────────────────────────────────
+if __name__ == "__main__":
+    main()
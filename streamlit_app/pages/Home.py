@@ -4,34 +4,45 @@
 # ─────────────────────────────────────────────────────────────────────────────
 from __future__ import annotations
 
-import copy
 import datetime as _dt
-import itertools
-import json
+import functools
+import html
 import os
-import base64
-from pathlib import Path
-from typing import Dict, List, Tuple
+import uuid
+from typing import List, Tuple
 
-import dateutil.parser as _dparse
-import requests
 import streamlit as st
 
+import agent
+import assets
+import importer
+import tracing
 from database import (
     add_entry,
-    entries_by_date,
-    entries_with_future_events,
+    backfill_normalized_keys,
+    cache_stats,
+    ensure_indexes,
+    get_profiles,
+    rebuild_profiles,
+    rebuild_schedule_events,
+    start_health_check,
+    watch_changes,
+    day_view,
     purge_schedule_task,
+    purge_schedule_tasks,
     purge_relationship,
     delete_entry,
     search_entries,
 )
+from extraction_cache import ExtractionCache
+from jobs import JobQueue
+from storage.dates import parse_date, parse_time, schedule_fields
+from tracing import traced
+from transport import latency_stats
 
-# ─── Restack agent config (unchanged) ───────────────────────────────────────
-BASE_URL = os.getenv("RESTACK_BASE_URL", "https://res2tsut.clj5khk.gcp.restack.it").rstrip("/")
-AGENT_ID = os.getenv("RESTACK_AGENT_ID", "d7e08832-AgentStructureResult")
-RUN_ID = os.getenv("RESTACK_RUN_ID", "01967657-63b9-7272-9413-c01c93a13c6e")
-RESTACK_ENDPOINT = f"{BASE_URL}/api/agents/AgentStructureResult/{AGENT_ID}/{RUN_ID}"
+SEARCH_PAGE_SIZE = 10
+# timing sidebar for every session; a single one can opt in with ?debug=1
+JOURNAL_DEBUG = os.getenv("JOURNAL_DEBUG", "") == "1"
 
 # ─── Page config & CSS injection ───────────────────────────────────────────
 st.set_page_config(
@@ -41,23 +52,39 @@ st.set_page_config(
     initial_sidebar_state="collapsed",
 )
 
-css_path = Path(__file__).parent / "../style.css"
-if css_path.exists():
-    st.markdown(f"<style>{css_path.read_text()}</style>", unsafe_allow_html=True)
+if style := assets.css("style.css"):  # read once per process
+    st.markdown(f"<style>{style}</style>", unsafe_allow_html=True)
 
 # ─── Utilities ─────────────────────────────────────────────────────────────
-def _call_agent(prompt_text: str) -> dict:
-    """Send prompt to the Restack agent and return its JSON response."""
-    payload = {
-        "eventName": "messages",
-        "eventInput": {"messages": [{"role": "user", "content": prompt_text}]},
-    }
-    resp = requests.put(RESTACK_ENDPOINT, json=payload, timeout=90)
-    resp.raise_for_status()
-    for msg in reversed(resp.json()):
-        if msg.get("role") == "assistant":
-            return json.loads(msg["content"])
-    raise RuntimeError("No assistant message returned")
+@st.cache_resource(show_spinner=False)
+def _init_db() -> None:
+    """
+    Create indexes, backfill keys and profiles, start health pings and the
+    cross-instance cache invalidation – once per process.
+    """
+    ensure_indexes()
+    backfill_normalized_keys()
+    rebuild_profiles(only_if_empty=True)
+    rebuild_schedule_events(only_if_empty=True)
+    start_health_check()
+    watch_changes()
+
+
+@st.cache_resource(show_spinner=False)
+def _job_queue() -> JobQueue:
+    """Agent worker pool shared by every session of this process."""
+    return JobQueue()
+
+
+@st.cache_resource(show_spinner=False)
+def _extraction_cache() -> ExtractionCache:
+    """Agent results by normalized prompt; repeat prompts skip the LLM."""
+    return ExtractionCache()
+
+
+def _session_id() -> str:
+    """Stable id of this browser session; owns its queued agent jobs."""
+    return st.session_state.setdefault("session_id", uuid.uuid4().hex)
 
 
 def _block(html: str) -> None:
@@ -74,16 +101,20 @@ def _ordinal(n: int) -> str:
 
 
 # ─── Renderers ─────────────────────────────────────────────────────────────
-def _render_schedule(items: list[dict], selected_date: _dt.date) -> None:
+# The HTML of each block is cached by a hash of its input data
+# (st.cache_data), so reruns with an unchanged day view reuse it.
+@st.cache_data(max_entries=256, show_spinner=False)
+def _schedule_html(items: list[dict], day: str) -> str:
     groups = {s: [] for s in ("Morning", "Afternoon", "Evening", "Night", "Future")}
 
     for ev in items:
-        ev_date = _parse_date(ev.get("event_date")) or selected_date
-        if ev_date > selected_date:
+        # canonical ISO fields, stored at write time – no parsing here
+        fields = schedule_fields(ev)
+        if (fields["date"] or day) > day:
             groups["Future"].append(ev)
             continue
 
-        hour = _parse_time(ev.get("time", "12:00")).hour
+        hour = int((fields["start"] or "12:00")[:2])
         if   5 <= hour < 12: groups["Morning"].append(ev)
         elif 12 <= hour < 17: groups["Afternoon"].append(ev)
         elif 17 <= hour < 21: groups["Evening"].append(ev)
@@ -99,13 +130,13 @@ def _render_schedule(items: list[dict], selected_date: _dt.date) -> None:
                 label = f"<strong>{ev['time']}</strong>" if ev.get("time") else "—"
                 html.append(f"<li>{label} – {ev['task']}</li>")
         html.append("</ul>")
-    _block("".join(html))
+    return "".join(html)
 
 
-def _render_relationships(items: list[dict]) -> None:
+@st.cache_data(max_entries=256, show_spinner=False)
+def _relationships_html(items: list[dict]) -> str:
     if not items:
-        _block("<h3>Relationships</h3><p><em>No relationship info.</em></p>")
-        return
+        return "<h3>Relationships</h3><p><em>No relationship info.</em></p>"
     html = ["<h3>Relationships</h3>"]
     for r in items:
         html.append(f"<p><strong>{r['name']}</strong> — {r.get('role','—')}<br>")
@@ -114,29 +145,34 @@ def _render_relationships(items: list[dict]) -> None:
         if r.get("notes"):
             html.append("<ul>" + "".join(f"<li>{n}</li>" for n in r["notes"]) + "</ul>")
         html.append("</p>")
-    _block("".join(html))
+    return "".join(html)
 
 
-def _render_mind_space(items: list[dict]) -> None:
+@st.cache_data(max_entries=256, show_spinner=False)
+def _mind_space_html(items: list[dict]) -> str:
     if not items:
-        _block("<h3>Mind Space</h3><p><em>Mind is clear! ✨</em></p>")
-        return
+        return "<h3>Mind Space</h3><p><em>Mind is clear! ✨</em></p>"
     li = "".join(f"<li>{t['thought']}</li>" for t in items)
-    _block(f"<h3>Mind Space</h3><ul>{li}</ul>")
+    return f"<h3>Mind Space</h3><ul>{li}</ul>"
 
 
-# ─── Relationship helpers (logic unchanged) ────────────────────────────────
-def _relationship_key(r: dict) -> str: return r["name"].strip().lower()
+@traced("home.render_schedule")
+def _render_schedule(items: list[dict], selected_date: _dt.date) -> None:
+    _block(_schedule_html(items, selected_date.isoformat()))
+
+
+@traced("home.render_relationships")
+def _render_relationships(items: list[dict]) -> None:
+    _block(_relationships_html(items))
 
 
-def _merge_additive(a: dict, b: dict) -> dict:
-    merged = copy.deepcopy(a)
-    if b.get("role"): merged["role"] = b["role"]
-    merged.setdefault("details", {}).update(b.get("details", {}))
-    merged.setdefault("notes", [])
-    for n in b.get("notes", []):
-        if n not in merged["notes"]: merged["notes"].append(n)
-    return merged
+@traced("home.render_mind_space")
+def _render_mind_space(items: list[dict]) -> None:
+    _block(_mind_space_html(items))
+
+
+# ─── Relationship helpers ──────────────────────────────────────────────────
+def _relationship_key(r: dict) -> str: return r["name"].strip().lower()
 
 
 def _diff_conflicts(a: dict, b: dict) -> Tuple[bool, List[str]]:
@@ -149,14 +185,6 @@ def _diff_conflicts(a: dict, b: dict) -> Tuple[bool, List[str]]:
     return bool(conflicts), conflicts
 
 
-def _dedup_relationships(lst: List[dict]) -> List[dict]:
-    res: Dict[str, dict] = {}
-    for r in lst:
-        k = _relationship_key(r)
-        res[k] = _merge_additive(res[k], r) if k in res else copy.deepcopy(r)
-    return list(res.values())
-
-
 def _rel_label(r: dict) -> str:
     role = r.get("role", "—")
     det = ", ".join(f"{k}:{v}" for k, v in (r.get("details") or {}).items())
@@ -167,48 +195,22 @@ def _rel_label(r: dict) -> str:
 def _schedule_key(s: dict) -> str: return s["task"].strip().lower()
 
 
-def _dedup_schedule(evs: List[dict]) -> List[dict]:
-    d = {_schedule_key(e): e for e in evs}
-    return sorted(d.values(), key=lambda e: (e.get("event_date") or "", e["time"]))
-
-
-def _parse_date(txt: str | None) -> _dt.date | None:
-    if not txt:
-        return None
-    try:
-        return _dparse.parse(txt, dayfirst=True).date()
-    except Exception:
-        return None
-
-
-def _parse_time(txt: str | None) -> _dt.time:
-    try:
-        return _dparse.parse(txt).time()
-    except Exception:
-        return _dt.time(hour=12)
-    
-
-# Encode the image as base64
-def get_base64(file_path):
-    with open(file_path, "rb") as f:
-        data = f.read()
-    return base64.b64encode(data).decode()
+_parse_date = parse_date  # shared with the schedule event store (memoized)
 
 
 # ─── Main application ──────────────────────────────────────────────────────
 def main() -> None:
+    _init_db()
+
     # ── Centered title ──
     # st.markdown(
     #     "<h1 style='text-align:center; margin-bottom:0.25rem;'>ME Journal</h1>",
     #     unsafe_allow_html=True,
     # )
 
-    # Add the logo and center it
-    logo_path = Path(__file__).parent / "../resources/Melogo.png"
-    logo_base64 = get_base64(logo_path)
-    if logo_path.exists():
-        logo_html = f"<img src='data:image/png;base64,{logo_base64}' style='display:block; margin:auto; width: 350px;'>"
-        st.markdown(logo_html, unsafe_allow_html=True)
+    # Add the logo and center it (resized / cached by the asset layer)
+    if (assets.RESOURCES_DIR / "Melogo.png").exists():
+        st.markdown(assets.img_tag("Melogo.png", 350, style="display:block; margin:auto;"), unsafe_allow_html=True)
 
     st.markdown(
         """
@@ -247,22 +249,12 @@ def main() -> None:
 
     st.divider()
 
-    # ── Fetch entries ──
-    entries = entries_by_date(selected_date)
-    if selected_date == today:
-        entries += entries_with_future_events(start=today, days_ahead=60)
-
-    raw_schedule = list(
-        itertools.chain.from_iterable(e["structured"].get("Schedule", []) for e in entries)
-    )
-    raw_rels_all = list(
-        itertools.chain.from_iterable(e["structured"].get("Relationships", []) for e in entries)
-    )
-    schedule_all = _dedup_schedule(raw_schedule)
-    rels_all = _dedup_relationships(raw_rels_all)
-    mind_all = list(
-        itertools.chain.from_iterable(e["structured"].get("Mind Space", []) for e in entries)
-    )
+    # ── Fetch the day (merged server-side; today also shows the next 60 days) ──
+    view = _day_view(selected_date)
+    entries = view["entries"]
+    schedule_all = view["schedule"]
+    rels_all = view["relationships"]
+    mind_all = view["mind_space"]
 
     # ── Delete-confirmation handler (stops early after action/abort) ──
     if st.session_state.get("pending_delete"):
@@ -280,35 +272,78 @@ def main() -> None:
 
     # ── Delete UI (in an expander to keep UI tidy) ────────────────────────
     st.divider()
-    with st.expander("🗑️  Delete items"):
-        _delete_form(selected_date, schedule_all, rels_all, entries)
+    _delete_section(selected_date, schedule_all, rels_all, entries)
 
     st.divider()
 
+    # ── Results of background agent calls ─────────────────────────────────
+    if not st.session_state.get("await_clarify"):
+        _collect_jobs()
+
     # ── Handle pending clarifications (unchanged logic) ───────────────────
     if st.session_state.get("await_clarify"):
         _handle_clarifications(selected_date)  # defined further below
         return  # stop early after clarification UI
 
     # ── Input form ──
-    _input_form(selected_date, rels_all, schedule_all)
+    _input_form(selected_date)
+    _import_section(selected_date)
+    if _job_queue().pending(_session_id()):
+        _job_status()
 
     # ── Search ──
     st.divider()
 
+    _search_section()
+
+
+# Widgets inside a fragment rerun only that fragment: typing a query or
+# picking something to delete leaves the day view above untouched.
+@st.fragment
+@traced("home.search_section")
+def _search_section() -> None:
     st.markdown("<h3 style='text-align:center;'>Guidance (Work in Progress)</h3>", unsafe_allow_html=True)
     q = st.text_input("Talk with ME", placeholder="…", label_visibility="hidden")
     if q:
-        hits = search_entries(q)
-        if not hits:
-            st.info("No matches found.")
-        else:
-            for doc in hits:
-                with st.expander(doc["prompt"][:80] + "…"):
-                    st.json(doc["structured"])
+        _search_results(q)
+
+
+def _search_results(q: str) -> None:
+    """Ranked search hits for `q`, one page at a time."""
+    if st.session_state.get("search_q") != q:
+        st.session_state.update(search_q=q, search_page=0)
+    page = st.session_state["search_page"]
+
+    # fetch one extra hit to know whether a next page exists
+    hits = search_entries(q, limit=SEARCH_PAGE_SIZE + 1, offset=page * SEARCH_PAGE_SIZE)
+    if not hits and page == 0:
+        st.info("No matches found.")
+        return
+    for doc in hits[:SEARCH_PAGE_SIZE]:
+        with st.expander(doc["prompt"][:80] + "…"):
+            st.json(doc["structured"])
+
+    # on_click runs before the (fragment) rerun the click triggers
+    prev_col, _, next_col = st.columns([1, 4, 1])
+    if page > 0:
+        prev_col.button("← Previous", key="search_prev", on_click=st.session_state.update, kwargs={"search_page": page - 1})
+    if len(hits) > SEARCH_PAGE_SIZE:
+        next_col.button("Next →", key="search_next", on_click=st.session_state.update, kwargs={"search_page": page + 1})
 
 
 # ─── Delete-workflow helpers ───────────────────────────────────────────────
+@st.fragment
+@traced("home.delete_section")
+def _delete_section(
+    selected_date: _dt.date,
+    schedule_all: list[dict],
+    rels_all: list[dict],
+    entries: list[dict],
+) -> None:
+    with st.expander("🗑️  Delete items"):
+        _delete_form(selected_date, schedule_all, rels_all, entries)
+
+
 def _delete_form(
     selected_date: _dt.date,
     schedule_all: list[dict],
@@ -402,8 +437,11 @@ def _execute_deletion(req: dict) -> None:
 
 
 # ─── Helper sub-functions (clarification & input form logic) ───────────────
+@traced("home.handle_clarifications")
 def _handle_clarifications(selected_date: _dt.date) -> None:
     """UI for resolving relationship / schedule conflicts."""
+    # the date that was selected when the prompt was submitted
+    selected_date = st.session_state.get("pending_date", selected_date)
     pending = st.session_state["pending_structured"]
     prompt_txt = st.session_state["pending_prompt"]
     rel_conflicts = st.session_state["rel_conflicts"]
@@ -470,10 +508,9 @@ def _handle_clarifications(selected_date: _dt.date) -> None:
         decision = decisions_rel.get(idx)
         if decision == "discard":
             continue
-        if decision == "update":
-            final_rels.append(_merge_additive(rel_conflicts[0]["existing"], rel))
-        else:
-            final_rels.append(rel)
+        # "update" needs nothing more: the profile store merges entries in
+        # order, so this entry's role and details win over the older ones
+        final_rels.append(rel)
 
     # Finalise schedule
     final_sched: List[dict] = []
@@ -486,16 +523,13 @@ def _handle_clarifications(selected_date: _dt.date) -> None:
         decision = decisions_sched.get(idx)
         if decision == "discard":
             continue
-        if decision == "update":
-            purge_schedule_task(_schedule_key(ev))
         final_sched.append(ev)
 
     pending["Relationships"] = final_rels
     pending["Schedule"] = final_sched
 
     jd = _determine_journal_date(pending, selected_date)
-    for ev in pending["Schedule"]:
-        purge_schedule_task(_schedule_key(ev))
+    purge_schedule_tasks(_schedule_key(ev) for ev in pending["Schedule"])
     add_entry(prompt_txt, pending, jd)
 
     # Clear state & refresh
@@ -506,17 +540,19 @@ def _handle_clarifications(selected_date: _dt.date) -> None:
         "rel_conflicts",
         "sched_conflicts",
         "missing_sched",
+        "pending_date",
     ):
         st.session_state.pop(k, None)
     st.success("Saved!")
     st.rerun()
 
 
-def _input_form(selected_date: _dt.date, rels_all: list[dict], schedule_all: list[dict]) -> None:
-    """Prompt input / scheduling form and its logic."""
+@traced("home.input_form")
+def _input_form(selected_date: _dt.date) -> None:
+    """Prompt input form; submissions are queued for the agent, not awaited."""
     st.markdown("<h3 style='text-align:center;'>Memory Input</h3>", unsafe_allow_html=True)
 
-    with st.form("prompt_form"):
+    with st.form("prompt_form", clear_on_submit=True):
         cols = st.columns([8, 2])
         prompt = cols[0].text_input(
             label="Thought prompt",
@@ -533,31 +569,101 @@ def _input_form(selected_date: _dt.date, rels_all: list[dict], schedule_all: lis
         st.warning("Please enter some text first.")
         st.stop()
 
-    with st.spinner("Processing…"):
-        try:
-            structured = _call_agent(prompt)
-        except Exception as exc:
-            st.error(str(exc))
-            st.stop()
+    context = {"prompt": prompt, "selected_date": selected_date}
+    cache = _extraction_cache()
+    known = agent.lookup(prompt, cache)
+    if known is not None:  # fast path or seen before – no agent round trip
+        _job_queue().add_done(_session_id(), prompt[:60], known, context=context)
+        st.rerun()
+    _job_queue().submit(_session_id(), prompt[:60], agent.extract, prompt, cache, context=context)
+
+
+@st.fragment
+@traced("home.import_section")
+def _import_section(selected_date: _dt.date) -> None:
+    """Bulk import of a notes file, run as a background job."""
+    with st.expander("📥  Import notes"):
+        upload = st.file_uploader(
+            "Markdown / text (blank-line separated, date lines set the day) or NDJSON",
+            type=["md", "txt", "ndjson", "jsonl"],
+        )
+        if upload is None or not st.button("Import", key="import_start"):
+            return
+        path = importer.stage_upload(upload.name, upload.getvalue())
+        progress: dict = {}  # filled in by the import thread, shown by _job_status
+        run = functools.partial(
+            importer.run_import, path, selected_date, cache=_extraction_cache(), progress=lambda r: progress.update(vars(r))
+        )
+        context = {"import": str(path), "progress": progress}
+        _job_queue().submit(_session_id(), upload.name, run, context=context)
+        st.rerun()
+
 
-    # Relationship conflict detection & merge
+@st.fragment(run_every=2)
+def _job_status() -> None:
+    """In-flight prompts of this session; reruns the page once one is back."""
+    queue, owner = _job_queue(), _session_id()
+    for job in queue.pending(owner):
+        if "import" in job.context:
+            p = job.context["progress"]
+            done = p.get("resumed", 0) + p.get("imported", 0) + p.get("failed", 0)
+            st.caption(f"⏳ Importing “{job.label}” … {done} entries done")
+            continue
+        st.caption(f"⏳ Processing “{job.label}” …")
+    if queue.has_finished(owner):
+        st.rerun()
+
+
+def _day_view(day: _dt.date) -> dict:
+    """The page for `day`; today also shows the next 60 days."""
+    return day_view(day, days_ahead=60 if day == _dt.date.today() else 0)
+
+
+@traced("home.collect_jobs")
+def _collect_jobs() -> None:
+    """
+    Save the results of finished agent jobs, oldest first, each checked
+    against the schedule of the day it was entered for (the user may have
+    moved on to another day meanwhile). Stops at the first one that needs
+    clarification; the rest wait until it is resolved.
+    """
+    queue, owner = _job_queue(), _session_id()
+    saved = 0
+    while (job := queue.next_finished(owner)) is not None:
+        if job.error:
+            st.error(f"“{job.label}” failed: {job.error}")
+            continue
+        if "import" in job.context:  # already written by the importer
+            saved += job.result.imported
+            if job.result.failed:
+                st.warning(f"{job.result.failed} entries of “{job.label}” failed; see {job.context['import']}.failed.ndjson")
+            continue
+        day = job.context["selected_date"]
+        if _save_or_clarify(job.context["prompt"], job.result, day, _day_view(day)["schedule"]):
+            st.rerun()
+        saved += 1
+    if saved:
+        st.toast(f"Saved {saved} entr{'y' if saved == 1 else 'ies'}!")
+        st.rerun()
+
+
+@traced("home.save_or_clarify")
+def _save_or_clarify(prompt: str, structured: dict, selected_date: _dt.date, schedule_all: list[dict]) -> bool:
+    """
+    Merge an agent result against the journal and save it, or park it for
+    the clarification form. Returns True if clarification is needed.
+    """
+    # Relationship conflict detection. Checked against every profile in the
+    # journal, not just this day's people; the entry itself stores only what
+    # it says – the profile store merges it with the person's history.
     rel_conflicts: list[dict] = []
-    merged_rels: list[dict] = []
-    rel_map = {_relationship_key(r): r for r in rels_all}
+    rel_map = get_profiles(_relationship_key(r) for r in structured["Relationships"])
     for idx, new_rel in enumerate(structured["Relationships"]):
-        key = _relationship_key(new_rel)
-        if key not in rel_map:
-            merged_rels.append(new_rel)
-            continue
-        existing = rel_map[key]
-        has_conflict, _ = _diff_conflicts(existing, new_rel)
-        if not has_conflict:
-            merged_rels.append(_merge_additive(existing, new_rel))
-        else:
+        existing = rel_map.get(_relationship_key(new_rel))
+        if existing is not None and _diff_conflicts(existing, new_rel)[0]:
             rel_conflicts.append(
                 {"new_index": idx, "new": new_rel, "existing": existing}
             )
-            merged_rels.append(new_rel)
 
     # Schedule conflict detection
     sched_conflicts: list[dict] = []
@@ -581,20 +687,17 @@ def _input_form(selected_date: _dt.date, rels_all: list[dict], schedule_all: lis
             await_clarify=True,
             pending_structured=structured,
             pending_prompt=prompt,
+            pending_date=selected_date,
             rel_conflicts=rel_conflicts,
             sched_conflicts=sched_conflicts,
             missing_sched=missing_sched,
         )
-        st.rerun()
-        return
+        return True
 
-    structured["Relationships"] = merged_rels
     jd = _determine_journal_date(structured, selected_date)
-    for ev in structured["Schedule"]:
-        purge_schedule_task(_schedule_key(ev))
+    purge_schedule_tasks(_schedule_key(ev) for ev in structured["Schedule"])
     add_entry(prompt, structured, jd)
-    st.success("Saved!")
-    st.rerun()
+    return False
 
 
 # ─── Helper: pick journal date from schedule or fallback ───────────────────
@@ -607,6 +710,72 @@ def _determine_journal_date(structured: dict, fallback: _dt.date) -> _dt.date:
     return fallback
 
 
+# ─── Timing (opt-in debug sidebar, span export) ────────────────────────────
+def _parse_misses() -> int:
+    """dateutil calls so far – parse_date/parse_time only miss on new strings."""
+    return parse_date.cache_info().misses + parse_time.cache_info().misses
+
+
+def _waterfall_html(tr: tracing.Trace) -> str:
+    """One row per span: name indented by depth, bar placed on the rerun's timeline."""
+    depth = {tr.root.span_id: 0}
+    total = max(tr.root.end_ns - tr.root.start_ns, 1)
+    rows = []
+    for s in tr.spans:
+        d = depth[s.span_id] = depth.get(s.parent_id, -1) + 1
+        left = 100 * (s.start_ns - tr.root.start_ns) / total
+        width = max(100 * (s.end_ns - s.start_ns) / total, 0.5)
+        color = "#d9534f" if "error" in s.attrs else "#4a90d9"
+        tip = html.escape(", ".join(f"{k}={v}" for k, v in s.attrs.items()), quote=True)
+        rows.append(
+            f"<div title='{tip}' style='font-size:0.75rem; margin:2px 0;'>"
+            f"<div style='padding-left:{d * 0.8}rem; white-space:nowrap;'>{html.escape(s.name)} "
+            f"<b>{s.duration_ms:.1f} ms</b></div>"
+            f"<div style='position:relative; height:6px; background:#eee;'>"
+            f"<div style='position:absolute; left:{left:.2f}%; width:{width:.2f}%; height:6px; background:{color};'></div>"
+            f"</div></div>"
+        )
+    return "".join(rows)
+
+
+def _debug_panel(tr: tracing.Trace | None) -> None:
+    with st.sidebar:
+        st.markdown("### ⏱️ Last rerun")
+        if tr is None:
+            st.caption("No trace yet.")
+            return
+        st.caption(f"{tr.duration_ms:.1f} ms · {len(tr.spans)} spans · {tr.root.attrs.get('dates.parse_misses', 0)} date parses")
+        st.markdown(_waterfall_html(tr), unsafe_allow_html=True)
+        recent = st.session_state.get("debug_recent_ms", [])
+        if len(recent) > 1:
+            st.caption("Recent reruns (ms)")
+            st.line_chart(recent, height=120)
+        st.caption("Read cache")
+        st.json(cache_stats(), expanded=False)
+        st.caption("Agent latency")
+        st.json(latency_stats(), expanded=False)
+
+
+def _run() -> None:
+    """main() inside one trace per rerun when the sidebar or the exporter wants it."""
+    debug = JOURNAL_DEBUG or st.query_params.get("debug") == "1"
+    if not (debug or tracing.TRACE_EXPORT_PATH):
+        main()
+        return
+    misses = _parse_misses()
+    try:
+        with tracing.trace("rerun Home", session=_session_id()) as tr:
+            try:
+                main()
+            finally:
+                tr.set("dates.parse_misses", _parse_misses() - misses)
+    finally:  # st.rerun()/st.stop() end the script early; the rerun is still shown
+        if debug:
+            recent = st.session_state.setdefault("debug_recent_ms", [])
+            recent[:] = (recent + [round(tr.duration_ms, 1)])[-tracing.TRACE_KEEP :]
+            _debug_panel(tr)
+
+
 # ─── Run ───────────────────────────────────────────────────────────────────
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    _run()
\ No newline at end of file
@@ -0,0 +1,44 @@
+# storage/__init__.py
+# ─────────────────────────────────────────────────────────────────────────────
+# Backend selection for ME-Journal.
+#
+#   JOURNAL_BACKEND=mongo   (default) MongoDB / Atlas, see storage/mongo.py
+#   JOURNAL_BACKEND=sqlite  embedded SQLite file, see storage/sqlite.py
+# ─────────────────────────────────────────────────────────────────────────────
+from __future__ import annotations
+
+import os
+import threading
+
+from .base import Cursor, JournalStore, merge_relationship, norm_key
+
+JOURNAL_BACKEND = os.getenv("JOURNAL_BACKEND", "mongo")
+
+_store: JournalStore | None = None
+_store_lock = threading.Lock()
+
+
+def make_store(backend: str, **kwargs) -> JournalStore:
+    """Build a store by name; driver imports happen only for the chosen backend."""
+    if backend == "mongo":
+        from .mongo import MongoStore
+
+        return MongoStore(**kwargs)
+    if backend == "sqlite":
+        from .sqlite import SQLiteStore
+
+        return SQLiteStore(**kwargs)
+    raise ValueError(f"Unknown JOURNAL_BACKEND: {backend!r} (expected 'mongo' or 'sqlite')")
+
+
+def get_store() -> JournalStore:
+    """Process-wide store for JOURNAL_BACKEND, built on first use."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = make_store(JOURNAL_BACKEND)
+    return _store
+
+
+__all__ = ["Cursor", "JournalStore", "get_store", "make_store", "merge_relationship", "norm_key"]
@@ -0,0 +1,398 @@
+# base.py
+# ─────────────────────────────────────────────────────────────────────────────
+# Storage interface for ME-Journal plus the document helpers every backend
+# shares (normalized lookup keys, health bookkeeping, full-scan check).
+# ─────────────────────────────────────────────────────────────────────────────
+from __future__ import annotations
+
+import copy
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Iterator, List, Sequence, Tuple
+
+from .dates import event_fields
+
+# Structured sections whose items carry a precomputed normalized key next to
+# the raw value: (section, raw field, key field)
+KEYED_SECTIONS = (
+    ("Schedule", "task", "task_key"),
+    ("Relationships", "name", "name_key"),
+)
+
+
+# Keyset position for paging entries in (created_at, _id) order.
+Cursor = Tuple[datetime, str]
+
+
+@dataclass(frozen=True)
+class Change:
+    """
+    What a write touched, as sent to JournalStore subscribers: ids of
+    changed or removed entries, journal dates of new entries and the event
+    dates they carry (raw and parsed, ISO), and the people whose profile
+    moved. `full` means the scope is unknown and every cached read is
+    suspect.
+    """
+
+    ids: FrozenSet[str] = frozenset()
+    names: FrozenSet[str] = frozenset()
+    days: FrozenSet[str] = frozenset()
+    event_days: FrozenSet[str] = frozenset()
+    full: bool = False
+
+
+# ─── document helpers ───────────────────────────────────────────────────────
+def norm_key(value: str) -> str:
+    """Normalized match key used for tasks and names: stripped, lower-cased."""
+    return value.strip().lower()
+
+
+def norm_keys(keys: Iterable[str]) -> List[str]:
+    """Sorted, de-duplicated normalized keys, blanks dropped."""
+    return sorted({norm_key(k) for k in keys if k and k.strip()})
+
+
+def with_keys(structured: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Copy of `structured` whose Schedule/Relationships items carry their keys,
+    and Schedule items their canonical `date` / `start` (see dates.py).
+    """
+    out = dict(structured)
+    for section, field, key_field in KEYED_SECTIONS:
+        if section in out:
+            out[section] = [
+                {**item, key_field: norm_key(item.get(field) or "")} for item in out[section]
+            ]
+    if "Schedule" in out:
+        out["Schedule"] = [{**ev, **event_fields(ev)} for ev in out["Schedule"]]
+    return out
+
+
+def _load_checkpoint(path: str | None) -> Dict[str, Any]:
+    if not path:
+        return {}
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_checkpoint(path: str | None, state: Dict[str, Any]) -> None:
+    if path:
+        with open(f"{path}.tmp", "w") as f:
+            json.dump(state, f)
+        os.replace(f"{path}.tmp", path)
+
+
+def merge_relationship(a: Dict[str, Any], b: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Additive merge of relationship `b` into `a`: a newer role wins, details
+    are updated key by key and new notes are appended once.
+    """
+    merged = copy.deepcopy(a)
+    if b.get("role"):
+        merged["role"] = b["role"]
+    merged.setdefault("details", {}).update(b.get("details") or {})
+    merged.setdefault("notes", [])
+    for n in b.get("notes") or []:
+        if n not in merged["notes"]:
+            merged["notes"].append(n)
+    return merged
+
+
+def fold_profiles(profiles: Dict[str, Dict[str, Any]], rels: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Merge relationship items (oldest first) into per-person profiles keyed
+    by name_key. Returns only the profiles that `rels` touched.
+    """
+    touched: Dict[str, Dict[str, Any]] = {}
+    for r in rels:
+        key = norm_key(r.get("name") or "")
+        if not key:
+            continue
+        base = touched.get(key) or profiles.get(key)
+        profile = merge_relationship(base, r) if base else copy.deepcopy(r)
+        profile["name_key"] = key
+        touched[key] = profile
+    return touched
+
+
+def next_cursor(docs: List[Dict[str, Any]], limit: int) -> Cursor | None:
+    """Cursor after the last doc of a full page; None once the pages run out."""
+    if not docs or len(docs) < limit:
+        return None
+    return docs[-1]["created_at"], str(docs[-1]["_id"])
+
+
+def entry_change(entry_id: str, journal_date: str | None, structured: Dict[str, Any]) -> Change:
+    """Change describing a new (or rewritten) entry."""
+    event_days = set()
+    for ev in structured.get("Schedule", []):
+        event_days.update(d for d in (ev.get("event_date"), event_fields(ev)["date"]) if d)
+    return Change(
+        ids=frozenset([entry_id]),
+        names=frozenset(norm_keys(r.get("name") or "" for r in structured.get("Relationships", []))),
+        days=frozenset([journal_date] if journal_date else []),
+        event_days=frozenset(event_days),
+    )
+
+
+def merge_changes(changes: Iterable[Change]) -> Change:
+    """One Change covering everything `changes` touched (a batch write)."""
+    changes = list(changes)
+    return Change(
+        ids=frozenset().union(*(c.ids for c in changes)),
+        names=frozenset().union(*(c.names for c in changes)),
+        days=frozenset().union(*(c.days for c in changes)),
+        event_days=frozenset().union(*(c.event_days for c in changes)),
+        full=any(c.full for c in changes),
+    )
+
+
+# ─── interface ──────────────────────────────────────────────────────────────
+class JournalStore(ABC):
+    """
+    Everything database.py exposes, implemented once per storage engine.
+    Entries are returned as plain dicts shaped like the MongoDB documents:
+    _id, prompt, structured, created_at (datetime), journal_date (ISO str).
+    """
+
+    name = "base"
+
+    def __init__(self) -> None:
+        self._health: Dict[str, Any] = {"ok": None, "latency_ms": None, "checked_at": None, "error": None}
+        self._health_thread: threading.Thread | None = None
+        self._health_lock = threading.Lock()
+        self._listeners: List[Callable[[Change], None]] = []
+
+    # ── setup & diagnostics ──
+    @abstractmethod
+    def ensure_indexes(self) -> List[str]:
+        """Create the indexes the helpers rely on (idempotent). Returns their names."""
+
+    # Bump when with_keys() starts deriving a new field, so finished
+    # backfills run once more.
+    BACKFILL_VERSION = 2
+
+    def backfill_normalized_keys(self, batch_size: int = 500, checkpoint: str | None = None) -> int:
+        """
+        Rewrite entries stored before their lookup keys / canonical schedule
+        fields were, `batch_size` at a time in (created_at, _id) order.
+
+        With `checkpoint` (a file path) the cursor of every finished batch is
+        saved there, so an interrupted run resumes where it stopped and a
+        completed one is not repeated. Returns the number of entries rewritten.
+        """
+        state = _load_checkpoint(checkpoint)
+        if state.get("version") != self.BACKFILL_VERSION:
+            state = {"version": self.BACKFILL_VERSION, "after": None, "done": False}
+        if state["done"]:
+            return 0
+        after: Cursor | None = None
+        if state["after"]:
+            after = (datetime.fromisoformat(state["after"][0]), state["after"][1])
+        rewritten = 0
+        while True:
+            docs, after = self.entries_page(after, batch_size, ["structured"])
+            stale = {}
+            for doc in docs:
+                fixed = with_keys(doc["structured"])
+                if fixed != doc["structured"]:
+                    stale[str(doc["_id"])] = fixed
+            if stale:
+                rewritten += self._rewrite_structured(stale)
+            state.update(after=[after[0].isoformat(), after[1]] if after else None, done=after is None)
+            _save_checkpoint(checkpoint, state)
+            if after is None:
+                return rewritten
+
+    def _rewrite_structured(self, updates: Dict[str, Dict[str, Any]]) -> int:
+        """Replace `structured` of existing entries {id: structured}; returns how many changed."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def explain_plans(self, sample_date: date | None = None) -> Dict[str, List[str]]:
+        """Returns {helper name: steps of the plan the engine picked}."""
+
+    @abstractmethod
+    def is_full_scan(self, step: str) -> bool:
+        """True if a plan step from explain_plans() reads the whole table."""
+
+    def assert_no_full_scan(self, sample_date: date | None = None) -> None:
+        """Raise RuntimeError if any public helper would scan the whole collection."""
+        offenders = [
+            name
+            for name, steps in self.explain_plans(sample_date).items()
+            if any(self.is_full_scan(s) for s in steps)
+        ]
+        if offenders:
+            raise RuntimeError(f"{self.name}: full scan in query plan of: {', '.join(offenders)}")
+
+    @abstractmethod
+    def _ping(self) -> None:
+        """One cheap round trip to the engine; raises on failure."""
+
+    def ping(self) -> Dict[str, Any]:
+        """Run one round trip and record the outcome in health()."""
+        started = time.perf_counter()
+        try:
+            self._ping()
+        except Exception as exc:
+            self._health.update(ok=False, latency_ms=None, error=str(exc))
+        else:
+            self._health.update(ok=True, latency_ms=round((time.perf_counter() - started) * 1000, 1), error=None)
+        self._health["checked_at"] = datetime.utcnow()
+        return dict(self._health)
+
+    def health(self) -> Dict[str, Any]:
+        """Latest background health-check result (ok is None until the first ping)."""
+        return dict(self._health)
+
+    def start_health_check(self, interval_s: float = 30.0) -> None:
+        """Ping every `interval_s` seconds on a daemon thread (idempotent)."""
+        with self._health_lock:
+            if self._health_thread is not None and self._health_thread.is_alive():
+                return
+
+            def _loop() -> None:
+                while True:
+                    self.ping()
+                    time.sleep(interval_s)
+
+            self._health_thread = threading.Thread(target=_loop, name=f"{self.name}-health", daemon=True)
+            self._health_thread.start()
+
+    # ── change notifications ──
+    def subscribe(self, listener: Callable[[Change], None]) -> None:
+        """Call `listener` with a Change after every committed write."""
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def _emit(self, change: Change) -> None:
+        for listener in list(self._listeners):
+            listener(change)
+
+    def watch_changes(self) -> bool:
+        """
+        Also relay writes made by other processes to subscribers. Returns
+        False if the engine cannot observe them.
+        """
+        return False
+
+    # ── writes ──
+    @abstractmethod
+    def add_entry(self, prompt: str, structured: Dict[str, Any], journal_date: date | None = None) -> str:
+        """Insert one entry; returns its id as a string."""
+
+    @abstractmethod
+    def add_entries(
+        self, entries: Sequence[Tuple[str, Dict[str, Any], date | None]], created_at: Sequence[datetime] | None = None
+    ) -> List[str]:
+        """
+        Insert many (prompt, structured, journal_date) entries in one batched
+        write, in order; returns their ids. Subscribers get a single Change.
+        `created_at` (naive UTC, one per entry) keeps restored entries'
+        original creation times; the default is now.
+        """
+
+    @abstractmethod
+    def purge_schedule_tasks(self, task_keys: Iterable[str]) -> Dict[str, int]:
+        """Remove Schedule items by task key. Returns {normalized key: items removed}."""
+
+    @abstractmethod
+    def purge_relationships(self, name_keys: Iterable[str]) -> Dict[str, int]:
+        """Remove Relationship items by name key. Returns {normalized key: items removed}."""
+
+    def purge_schedule_task(self, task_key: str) -> int:
+        return self.purge_schedule_tasks([task_key]).get(norm_key(task_key), 0)
+
+    def purge_relationship(self, name_key: str) -> int:
+        return self.purge_relationships([name_key]).get(norm_key(name_key), 0)
+
+    @abstractmethod
+    def delete_entry(self, entry_id: str) -> bool:
+        """Delete a whole entry by id; False if it did not exist."""
+
+    # ── relationship profiles ──
+    @abstractmethod
+    def get_profiles(self, name_keys: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Materialized profiles for the given people: {name_key: profile}."""
+
+    @abstractmethod
+    def rebuild_profiles(self, only_if_empty: bool = False) -> int:
+        """Recompute every profile from the full history; returns how many exist."""
+
+    # ── schedule events ──
+    @abstractmethod
+    def events_between(self, start: date, end: date) -> List[Dict[str, Any]]:
+        """
+        Schedule events whose parsed date is in [start, end], one per task_key
+        (the most recently written wins), sorted by date then start time.
+        """
+
+    @abstractmethod
+    def rebuild_schedule_events(self, only_if_empty: bool = False) -> int:
+        """Re-derive the event store from every entry; returns how many events exist."""
+
+    # ── reads ──
+    @abstractmethod
+    def entries_by_date(self, target: date, projection: Sequence[str] | None = None) -> List[Dict[str, Any]]:
+        """
+        Entries journaled on `target`, oldest first. `projection` lists the
+        fields to load ("prompt", "journal_date", "structured" or
+        "structured.<Section>"); _id and created_at are always included.
+        """
+
+    @abstractmethod
+    def day_view(self, target: date, days_ahead: int = 0) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Everything the journal page shows for `target`, merged by the engine
+        in one round trip. With days_ahead > 0 entries holding an event in
+        [target, target + days_ahead] and those upcoming events join in.
+
+        entries        _id, prompt, journal_date, created_at – each entry once
+        schedule       that day's items plus upcoming events, one per task
+                       (upcoming and newer win), by canonical date then start
+        relationships  stored profiles of everyone mentioned, first mention first
+        mind_space     thoughts of every entry, oldest entry first
+        """
+
+    @abstractmethod
+    def entries_with_future_events(self, start: date, days_ahead: int = 60) -> List[Dict[str, Any]]:
+        """Entries with a Schedule event in [start, start + days_ahead]."""
+
+    @abstractmethod
+    def entries_page(
+        self, after: Cursor | None = None, limit: int = 100, projection: Sequence[str] | None = None
+    ) -> Tuple[List[Dict[str, Any]], Cursor | None]:
+        """
+        One keyset page of entries in (created_at, _id) order, starting after
+        `after`. Returns (docs, cursor for the next page or None).
+        """
+
+    def iter_entries(self, projection: Sequence[str] | None = None, batch_size: int = 500) -> Iterator[Dict[str, Any]]:
+        """Stream every entry, oldest first, holding at most one page in memory."""
+        after: Cursor | None = None
+        while True:
+            docs, after = self.entries_page(after, batch_size, projection)
+            yield from docs
+            if after is None:
+                return
+
+    def all_entries(self, projection: Sequence[str] | None = None) -> List[Dict[str, Any]]:
+        """Every entry, oldest first (prefer iter_entries for large journals)."""
+        return list(self.iter_entries(projection))
+
+    @abstractmethod
+    def latest_entry(self) -> Dict[str, Any] | None:
+        """Most recently created entry, if any."""
+
+    @abstractmethod
+    def search_entries(self, q: str, limit: int = 10, offset: int = 0) -> List[Dict[str, Any]]:
+        """Ranked full-text hits (best first) carrying a `score`."""
@@ -0,0 +1,137 @@
+# cache.py
+# ─────────────────────────────────────────────────────────────────────────────
+# Read-through cache for the day-view helpers (day_view, entries_by_date,
+# entries_with_future_events, events_between).
+#
+# Results are keyed by date / date range, bounded (LRU) and expire after a
+# TTL. Writes invalidate precisely through the Change notifications the
+# stores emit: a cached result is dropped only if it holds a changed entry
+# or profile, or if a new entry's journal date / event date falls inside
+# its key.
+# ─────────────────────────────────────────────────────────────────────────────
+from __future__ import annotations
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, FrozenSet, List, Tuple, Union
+
+from .base import Change
+
+Result = Union[List[Dict[str, Any]], Dict[str, List[Dict[str, Any]]]]
+
+
+@dataclass
+class _Slot:
+    value: Any
+    expires: float
+    ids: FrozenSet[str]
+    names: FrozenSet[str]
+    day: str | None = None  # entries journaled on this day…
+    span: Tuple[str, str] | None = None  # …and/or events dated in [start, end]
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+
+
+def _deps(value: Result) -> Tuple[FrozenSet[str], FrozenSet[str]]:
+    """
+    (entry ids, profile name keys) a result depends on. Events carry
+    entry_id, profiles name_key, entries _id; a day_view holds such lists.
+    """
+    docs = value if isinstance(value, list) else [d for part in value.values() for d in part]
+    ids, names = set(), set()
+    for d in docs:
+        if "entry_id" in d:
+            ids.add(str(d["entry_id"]))
+        elif "name_key" in d:
+            names.add(d["name_key"])
+        elif "_id" in d:
+            ids.add(str(d["_id"]))
+    return frozenset(ids), frozenset(names)
+
+
+class ReadCache:
+    """Thread-safe LRU + TTL cache of read results, invalidated by Change."""
+
+    def __init__(self, max_entries: int = 256, ttl_s: float = 300.0) -> None:
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.stats = CacheStats()
+        self._slots: "OrderedDict[Tuple, _Slot]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped by every invalidation; a miss computed across a write is
+        # not stored, so a slow read can never cache pre-write data.
+        self._generation = 0
+
+    def get_or_load(
+        self,
+        key: Tuple,
+        load: Callable[[], Result],
+        *,
+        day: str | None = None,
+        span: Tuple[str, str] | None = None,
+    ) -> Result:
+        now = time.monotonic()
+        with self._lock:
+            slot = self._slots.get(key)
+            if slot is not None and slot.expires > now:
+                self._slots.move_to_end(key)
+                self.stats.hits += 1
+                return copy.deepcopy(slot.value)
+            if slot is not None:
+                del self._slots[key]
+                self.stats.evictions += 1
+            self.stats.misses += 1
+            generation = self._generation
+
+        value = load()
+        with self._lock:
+            if generation == self._generation:
+                self._slots[key] = _Slot(copy.deepcopy(value), now + self.ttl_s, *_deps(value), day, span)
+                self._slots.move_to_end(key)
+                while len(self._slots) > self.max_entries:
+                    self._slots.popitem(last=False)
+                    self.stats.evictions += 1
+        return value
+
+    def _stale(self, slot: _Slot, change: Change) -> bool:
+        if change.full or slot.ids & change.ids or slot.names & change.names:
+            return True
+        if slot.day is not None and slot.day in change.days:
+            return True
+        if slot.span is not None:
+            start, end = slot.span
+            return any(start <= d <= end for d in change.event_days)
+        return False
+
+    def invalidate(self, change: Change) -> None:
+        """Drop every cached result `change` can affect."""
+        with self._lock:
+            self._generation += 1
+            stale = [k for k, slot in self._slots.items() if self._stale(slot, change)]
+            for k in stale:
+                del self._slots[k]
+            self.stats.invalidations += len(stale)
+
+    def clear(self) -> None:
+        self.invalidate(Change(full=True))
+
+    def snapshot(self) -> Dict[str, int]:
+        """Counters plus current size, for dashboards and the CLI."""
+        with self._lock:
+            s = self.stats
+            return {
+                "hits": s.hits,
+                "misses": s.misses,
+                "evictions": s.evictions,
+                "invalidations": s.invalidations,
+                "size": len(self._slots),
+            }
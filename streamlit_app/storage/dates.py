@@ -0,0 +1,60 @@
+# dates.py
+# ─────────────────────────────────────────────────────────────────────────────
+# Lenient date/time parsing for schedule items written by the LLM.
+#
+# Items are parsed once, at write time, into canonical `date` (YYYY-MM-DD)
+# and `start` (HH:MM) fields; readers use schedule_fields(), which only
+# falls back to the (memoized) parsers for documents written before that.
+# ─────────────────────────────────────────────────────────────────────────────
+from __future__ import annotations
+
+import datetime as _dt
+from functools import lru_cache
+
+import dateutil.parser as _dparse
+
+
+@lru_cache(maxsize=4096)
+def parse_date(txt: str | None) -> _dt.date | None:
+    """
+    ISO dates first (dateutil's dayfirst would swap 2025-01-05 into May 1st),
+    then anything dateutil understands, day before month.
+    """
+    if not txt:
+        return None
+    try:
+        return _dt.date.fromisoformat(txt.strip())
+    except ValueError:
+        pass
+    try:
+        return _dparse.parse(txt, dayfirst=True).date()
+    except (ValueError, OverflowError):
+        return None
+
+
+@lru_cache(maxsize=4096)
+def parse_time(txt: str | None) -> _dt.time | None:
+    """"15:00", "3 pm", "09:30:00" … → time, or None if unparseable."""
+    if not txt:
+        return None
+    try:
+        return _dparse.parse(txt).time()
+    except (ValueError, OverflowError):
+        return None
+
+
+def event_fields(ev: dict) -> dict:
+    """Parsed `date` (YYYY-MM-DD) and `start` (HH:MM) of a schedule item, None if unknown."""
+    d = parse_date(ev.get("event_date"))
+    t = parse_time(ev.get("time"))
+    return {
+        "date": d.isoformat() if d else None,
+        "start": t.strftime("%H:%M") if t else None,
+    }
+
+
+def schedule_fields(ev: dict) -> dict:
+    """Canonical `date` / `start` of a schedule item, parsed only for legacy items."""
+    if "date" in ev and "start" in ev:
+        return {"date": ev["date"], "start": ev["start"]}
+    return event_fields(ev)
@@ -0,0 +1,602 @@
+# sqlite.py
+# ─────────────────────────────────────────────────────────────────────────────
+# Embedded SQLite backend for ME-Journal: no server, no network.
+#
+# • entries            one row per entry, `structured` kept as a JSON column
+# • schedule_events    one row per Schedule item with parsed date/start and
+#                      task_key – indexed purges and range scans
+# • relationship_items (entry, name_key)            – indexed purges
+# • profiles           merged relationship profile per person (name_key)
+# • entries_fts        FTS5 index ranked with bm25()
+#
+# The side tables are derived from `structured` and rewritten in the same
+# transaction as the entry, so they can never drift from it.
+# ─────────────────────────────────────────────────────────────────────────────
+from __future__ import annotations
+
+import json
+import os
+import re
+import secrets
+import sqlite3
+import threading
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+from .base import (
+    Change,
+    Cursor,
+    JournalStore,
+    entry_change,
+    fold_profiles,
+    merge_changes,
+    next_cursor,
+    norm_keys,
+    with_keys,
+)
+from .dates import schedule_fields
+
+SQLITE_PATH = os.getenv("JOURNAL_SQLITE_PATH", str(Path(__file__).resolve().parent.parent / "me_journal.sqlite3"))
+
+# bm25() column weights, same relevance order as the MongoDB text index:
+# prompt, thoughts, names, notes, tasks
+_FTS_WEIGHTS = (3.0, 3.0, 2.0, 1.0, 2.0)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    seq          INTEGER PRIMARY KEY,
+    id           TEXT NOT NULL UNIQUE,
+    prompt       TEXT NOT NULL,
+    structured   TEXT NOT NULL CHECK (json_valid(structured)),
+    created_at   TEXT NOT NULL,
+    journal_date TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS schedule_events (
+    entry_seq  INTEGER NOT NULL,
+    task       TEXT NOT NULL,
+    task_key   TEXT NOT NULL,
+    time       TEXT,
+    event_date TEXT,
+    date       TEXT,
+    start      TEXT,
+    created_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS relationship_items (
+    entry_seq INTEGER NOT NULL,
+    name_key  TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS profiles (
+    name_key   TEXT PRIMARY KEY,
+    profile    TEXT NOT NULL CHECK (json_valid(profile)),
+    updated_at TEXT NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(
+    prompt, thoughts, names, notes, tasks, tokenize = 'porter unicode61'
+);
+"""
+
+# (name, definition) – see ensure_indexes / explain_plans
+_INDEXES = (
+    ("entries_journal_date_created_at", "entries(journal_date, created_at)"),
+    ("entries_created_at_id", "entries(created_at, id)"),
+    ("schedule_events_entry", "schedule_events(entry_seq)"),
+    ("schedule_events_task_key", "schedule_events(task_key)"),
+    ("schedule_events_date_start", "schedule_events(date, start)"),
+    ("relationship_items_entry", "relationship_items(entry_seq)"),
+    ("relationship_items_name_key", "relationship_items(name_key)"),
+)
+
+_ENTRY_COLS = "e.seq, e.id, e.prompt, e.structured, e.created_at, e.journal_date"
+
+_SQL = {
+    "entries_by_date": "SELECT {cols} FROM entries e WHERE e.journal_date = ? ORDER BY e.created_at",
+    "entries_with_future_events": (
+        f"SELECT {_ENTRY_COLS}, MIN(s.date) AS first_event "
+        "FROM schedule_events s JOIN entries e ON e.seq = s.entry_seq "
+        "WHERE s.date BETWEEN ? AND ? GROUP BY e.seq ORDER BY first_event"
+    ),
+    "purge_schedule_task": "SELECT DISTINCT entry_seq FROM schedule_events WHERE task_key IN ({marks})",
+    "purge_relationship": "SELECT DISTINCT entry_seq FROM relationship_items WHERE name_key IN ({marks})",
+    "get_profiles": "SELECT name_key, profile FROM profiles WHERE name_key IN ({marks})",
+    "profile_sources": (
+        "SELECT e.structured FROM relationship_items r JOIN entries e ON e.seq = r.entry_seq "
+        "WHERE r.name_key IN ({marks}) GROUP BY e.seq ORDER BY e.created_at"
+    ),
+    "delete_entry": "SELECT seq FROM entries WHERE id = ?",
+    "events_between": (
+        "SELECT task, task_key, time, event_date, date, start, entry_id FROM ("
+        "SELECT s.*, e.id AS entry_id, "
+        "ROW_NUMBER() OVER (PARTITION BY s.task_key ORDER BY s.created_at DESC) AS newest "
+        "FROM schedule_events s JOIN entries e ON e.seq = s.entry_seq WHERE s.date BETWEEN :start AND :end"
+        ") WHERE newest = 1 ORDER BY date, start"
+    ),
+    "first_page": "SELECT {cols} FROM entries e ORDER BY e.created_at, e.id LIMIT ?",
+    "entries_page": (
+        "SELECT {cols} FROM entries e WHERE (e.created_at, e.id) > (?, ?) ORDER BY e.created_at, e.id LIMIT ?"
+    ),
+    "latest_entry": f"SELECT {_ENTRY_COLS} FROM entries e ORDER BY e.created_at DESC, e.id DESC LIMIT 1",
+    "search_entries": (
+        f"SELECT {_ENTRY_COLS}, -bm25(entries_fts, {', '.join(map(str, _FTS_WEIGHTS))}) AS score "
+        "FROM entries_fts JOIN entries e ON e.seq = entries_fts.rowid "
+        "WHERE entries_fts MATCH ? ORDER BY score DESC, e.created_at DESC LIMIT ? OFFSET ?"
+    ),
+}
+
+# day_view(): seqs of the picked entries – journaled on :day, plus (when
+# :ahead) any with an event in [:day, :end] – shared by the section queries.
+_DAY_PICKED = (
+    "WITH picked AS ("
+    "SELECT seq FROM entries WHERE journal_date = :day "
+    "UNION "
+    "SELECT entry_seq FROM schedule_events WHERE :ahead AND date BETWEEN :day AND :end) "
+)
+_PICKED_ENTRIES = "picked JOIN entries e ON e.seq = picked.seq"
+
+_DAY_VIEW = {
+    "entries": _DAY_PICKED + f"SELECT e.id, e.prompt, e.journal_date, e.created_at FROM {_PICKED_ENTRIES} ORDER BY e.created_at, e.seq",
+    # That day's items (rank 0, by age) and the upcoming events (rank 1),
+    # newest / upcoming winning per task_key.
+    "schedule": (
+        _DAY_PICKED + ", upcoming AS (" + _SQL["events_between"] + "), items AS ("
+        "SELECT json_extract(j.value, '$.task_key') AS task_key, j.value AS item, 0 AS rank, e.created_at, e.seq, j.key AS pos "
+        f"FROM {_PICKED_ENTRIES}, json_each(e.structured, '$.Schedule') j WHERE e.journal_date = :day "
+        "UNION ALL "
+        "SELECT task_key, json_object('task', task, 'task_key', task_key, 'time', time, 'event_date', event_date, "
+        "'date', date, 'start', start, 'entry_id', entry_id), 1, '', 0, 0 FROM upcoming WHERE :ahead) "
+        "SELECT item FROM ("
+        "SELECT item, json_extract(item, '$.date') AS date, json_extract(item, '$.start') AS start, "
+        "ROW_NUMBER() OVER (PARTITION BY task_key ORDER BY rank DESC, created_at DESC, seq DESC, pos DESC) AS newest "
+        "FROM items) WHERE newest = 1 ORDER BY date, start"
+    ),
+    "relationships": (
+        _DAY_PICKED + ", firsts AS ("
+        "SELECT json_extract(j.value, '$.name_key') AS name_key, "
+        "MIN(printf('%s#%012d#%06d', e.created_at, e.seq, j.key)) AS first "
+        f"FROM {_PICKED_ENTRIES}, json_each(e.structured, '$.Relationships') j GROUP BY 1) "
+        "SELECT p.profile FROM firsts JOIN profiles p ON p.name_key = firsts.name_key ORDER BY firsts.first"
+    ),
+    "mind_space": (
+        _DAY_PICKED + f"SELECT j.value AS item FROM {_PICKED_ENTRIES}, json_each(e.structured, '$.\"Mind Space\"') j "
+        "ORDER BY e.created_at, e.seq, j.key"
+    ),
+}
+
+# CTEs of the day_view queries: scanning them reads already index-filtered rows.
+_DERIVED_TABLES = ("picked", "upcoming", "items", "firsts")
+
+_KEY_TABLES = {"Schedule": ("schedule_events", "task_key"), "Relationships": ("relationship_items", "name_key")}
+
+
+def _fts_query(q: str) -> str:
+    """Free text → FTS5 query matching any of its words (like MongoDB $text)."""
+    return " OR ".join(f'"{w}"' for w in re.findall(r"\w+", q.lower()))
+
+
+def _fts_columns(prompt: str, structured: Dict[str, Any]) -> Tuple[str, str, str, str, str]:
+    rels = structured.get("Relationships", [])
+    return (
+        prompt,
+        " ".join(t.get("thought", "") for t in structured.get("Mind Space", [])),
+        " ".join(r.get("name", "") for r in rels),
+        " ".join(n for r in rels for n in r.get("notes") or []),
+        " ".join(ev.get("task", "") for ev in structured.get("Schedule", [])),
+    )
+
+
+def _events(structured: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """schedule_events rows (minus entry/created_at) for an entry's Schedule."""
+    return [
+        {"task": ev.get("task", ""), "task_key": ev["task_key"], "time": ev.get("time"), "event_date": ev.get("event_date"), **schedule_fields(ev)}
+        for ev in structured.get("Schedule", [])
+    ]
+
+
+def _columns(projection: Sequence[str] | None) -> str:
+    """
+    SELECT list for a field projection. "structured.<Section>" is pulled out
+    of the JSON column with json_extract so the rest is never decoded.
+    """
+    if projection is None:
+        return _ENTRY_COLS
+    cols = ["e.seq", "e.id", "e.created_at"]
+    for field in projection:
+        if field in ("prompt", "structured", "journal_date"):
+            cols.append(f"e.{field}")
+        elif field.startswith("structured.") and re.fullmatch(r"[\w ]+", field[11:]):
+            cols.append(f"json_extract(e.structured, '$.\"{field[11:]}\"') AS \"{field}\"")
+        elif field not in ("_id", "created_at"):
+            raise ValueError(f"unsupported projection field: {field!r}")
+    return ", ".join(dict.fromkeys(cols))
+
+
+def _day_args(target: date, days_ahead: int) -> Dict[str, Any]:
+    end = target + timedelta(days=max(days_ahead, 0))
+    return {"day": target.isoformat(), "start": target.isoformat(), "end": end.isoformat(), "ahead": int(days_ahead > 0)}
+
+
+def _row_to_doc(row: sqlite3.Row) -> Dict[str, Any]:
+    keys = row.keys()
+    doc: Dict[str, Any] = {"_id": row["id"]}
+    if "prompt" in keys:
+        doc["prompt"] = row["prompt"]
+    if "structured" in keys:
+        doc["structured"] = json.loads(row["structured"])
+    for k in keys:
+        if k.startswith("structured.") and row[k] is not None:
+            doc.setdefault("structured", {})[k[11:]] = json.loads(row[k])
+    doc["created_at"] = datetime.fromisoformat(row["created_at"])
+    if "journal_date" in keys:
+        doc["journal_date"] = row["journal_date"]
+    if "score" in keys:
+        doc["score"] = row["score"]
+    return doc
+
+
+class SQLiteStore(JournalStore):
+    """Journal entries in a local SQLite file (or ":memory:")."""
+
+    name = "sqlite"
+
+    def __init__(self, path: str = SQLITE_PATH) -> None:
+        super().__init__()
+        self.path = path
+        # One connection shared by all Streamlit sessions; the lock serialises
+        # access and WAL keeps readers from blocking on the writer.
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._watch_thread: threading.Thread | None = None
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode = WAL")
+            self._conn.executescript(_SCHEMA)
+
+    def _ping(self) -> None:
+        with self._lock:
+            self._conn.execute("SELECT 1").fetchone()
+
+    def _query(self, sql: str, params: Iterable[Any] | Dict[str, Any] = ()) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(sql, params if isinstance(params, dict) else tuple(params)).fetchall()
+
+    # ─── setup & diagnostics ─────────────────────────────────────────────
+    def ensure_indexes(self) -> List[str]:
+        with self._lock, self._conn:
+            for name, definition in _INDEXES:
+                self._conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {definition}")
+            self._conn.execute("ANALYZE")
+        return [name for name, _ in _INDEXES]
+
+    def explain_plans(self, sample_date: date | None = None) -> Dict[str, List[str]]:
+        d = sample_date or datetime.utcnow().date()
+        params = {
+            "entries_by_date": (d.isoformat(),),
+            "entries_with_future_events": (d.isoformat(), (d + timedelta(days=60)).isoformat()),
+            "purge_schedule_task": ("probe",),
+            "purge_relationship": ("probe",),
+            "delete_entry": ("probe",),
+            "entries_page": ("", "", 100),
+            "latest_entry": (),
+            "search_entries": ('"probe"', 10, 0),
+            "get_profiles": ("probe",),
+            "events_between": {"start": d.isoformat(), "end": (d + timedelta(days=60)).isoformat()},
+        }
+        plans = {
+            name: [row["detail"] for row in self._query(f"EXPLAIN QUERY PLAN {_SQL[name].format(marks='?', cols=_ENTRY_COLS)}", args)]
+            for name, args in params.items()
+        }
+        day_args = _day_args(d, 60)
+        plans["day_view"] = [
+            row["detail"] for sql in _DAY_VIEW.values() for row in self._query(f"EXPLAIN QUERY PLAN {sql}", day_args)
+        ]
+        return plans
+
+    def is_full_scan(self, step: str) -> bool:
+        # "SCAN entries" is a table scan; "SCAN entries USING INDEX …" walks an
+        # index in order, virtual-table scans are FTS lookups / json_each and
+        # "SCAN (subquery-N)" or a CTE name reads an already filtered result.
+        return (
+            step.startswith("SCAN ")
+            and not step.startswith("SCAN (")
+            and step.split()[1] not in _DERIVED_TABLES
+            and " USING " not in step
+            and "VIRTUAL TABLE" not in step
+        )
+
+    def watch_changes(self, interval_s: float = 1.0) -> bool:
+        """
+        Poll PRAGMA data_version, which moves only when another connection
+        (another app process on the same file) commits; such writes are
+        reported as a full Change since their scope is unknown.
+        """
+        if self.path == ":memory:":
+            return False
+        if self._watch_thread is not None and self._watch_thread.is_alive():
+            return True
+
+        def _loop() -> None:
+            seen = None
+            while True:
+                with self._lock:
+                    (version,) = self._conn.execute("PRAGMA data_version").fetchone()
+                if seen is not None and version != seen:
+                    self._emit(Change(full=True))
+                seen = version
+                time.sleep(interval_s)
+
+        self._watch_thread = threading.Thread(target=_loop, name="sqlite-watch", daemon=True)
+        self._watch_thread.start()
+        return True
+
+    # ─── index maintenance ───────────────────────────────────────────────
+    def _index_entry(self, seq: int, prompt: str, structured: Dict[str, Any], created_at: str) -> None:
+        self._insert_events(seq, structured, created_at)
+        self._conn.executemany(
+            "INSERT INTO relationship_items(entry_seq, name_key) VALUES (?, ?)",
+            [(seq, r["name_key"]) for r in structured.get("Relationships", [])],
+        )
+        self._conn.execute(
+            "INSERT INTO entries_fts(rowid, prompt, thoughts, names, notes, tasks) VALUES (?, ?, ?, ?, ?, ?)",
+            (seq, *_fts_columns(prompt, structured)),
+        )
+
+    def _insert_events(self, seq: int, structured: Dict[str, Any], created_at: str) -> None:
+        self._conn.executemany(
+            "INSERT INTO schedule_events(entry_seq, task, task_key, time, event_date, date, start, created_at) "
+            "VALUES (:seq, :task, :task_key, :time, :event_date, :date, :start, :created_at)",
+            [{"seq": seq, "created_at": created_at, **ev} for ev in _events(structured)],
+        )
+
+    def _unindex_entry(self, seq: int) -> None:
+        self._conn.execute("DELETE FROM schedule_events WHERE entry_seq = ?", (seq,))
+        self._conn.execute("DELETE FROM relationship_items WHERE entry_seq = ?", (seq,))
+        self._conn.execute("DELETE FROM entries_fts WHERE rowid = ?", (seq,))
+
+    # ─── writes ──────────────────────────────────────────────────────────
+    def add_entry(self, prompt: str, structured: Dict[str, Any], journal_date: date | None = None) -> str:
+        jd = journal_date or datetime.utcnow().date()
+        structured = with_keys(structured)
+        entry_id = secrets.token_hex(12)
+        created_at = datetime.utcnow().isoformat(timespec="microseconds")
+        with self._lock, self._conn:
+            cur = self._conn.execute(
+                "INSERT INTO entries(id, prompt, structured, created_at, journal_date) VALUES (?, ?, ?, ?, ?)",
+                (entry_id, prompt, json.dumps(structured), created_at, jd.isoformat()),
+            )
+            self._index_entry(cur.lastrowid, prompt, structured, created_at)
+            self._merge_profiles(structured.get("Relationships", []))
+        self._emit(entry_change(entry_id, jd.isoformat(), structured))
+        return entry_id
+
+    def add_entries(
+        self, entries: Sequence[Tuple[str, Dict[str, Any], date | None]], created_at: Sequence[datetime] | None = None
+    ) -> List[str]:
+        if not entries:
+            return []
+        now = datetime.utcnow()
+        rows = []
+        for i, (prompt, structured, journal_date) in enumerate(entries):
+            jd = (journal_date or now.date()).isoformat()
+            # distinct, increasing timestamps keep the batch in (created_at, id) order
+            at = created_at[i] if created_at else now + timedelta(microseconds=i)
+            rows.append((secrets.token_hex(12), prompt, with_keys(structured), at.isoformat(timespec="microseconds"), jd))
+        with self._lock, self._conn:
+            first = self._conn.execute("SELECT COALESCE(MAX(seq), 0) + 1 FROM entries").fetchone()[0]
+            self._conn.executemany(
+                "INSERT INTO entries(seq, id, prompt, structured, created_at, journal_date) VALUES (?, ?, ?, ?, ?, ?)",
+                [(first + i, eid, prompt, json.dumps(st), created_at, jd) for i, (eid, prompt, st, created_at, jd) in enumerate(rows)],
+            )
+            for i, (_, prompt, st, created_at, _) in enumerate(rows):
+                self._index_entry(first + i, prompt, st, created_at)
+            self._merge_profiles([r for row in rows for r in row[2].get("Relationships", [])])
+        self._emit(merge_changes(entry_change(eid, jd, st) for eid, _, st, _, jd in rows))
+        return [row[0] for row in rows]
+
+    def _rewrite_structured(self, updates: Dict[str, Dict[str, Any]]) -> int:
+        """Rewrite the JSON and reindex the derived rows of each entry, in one transaction."""
+        names = set()
+        rewritten = 0
+        with self._lock, self._conn:
+            for entry_id, structured in updates.items():
+                row = self._conn.execute("SELECT seq, prompt, created_at FROM entries WHERE id = ?", (entry_id,)).fetchone()
+                if row is None:
+                    continue
+                names.update(r["name_key"] for r in self._conn.execute(
+                    "SELECT DISTINCT name_key FROM relationship_items WHERE entry_seq = ?", (row["seq"],)
+                ))
+                self._conn.execute("UPDATE entries SET structured = ? WHERE seq = ?", (json.dumps(structured), row["seq"]))
+                keyed = with_keys(structured)  # the derived rows need keys even if the JSON lacks them
+                self._unindex_entry(row["seq"])
+                self._index_entry(row["seq"], row["prompt"], keyed, row["created_at"])
+                names.update(r["name_key"] for r in keyed.get("Relationships", []))
+                rewritten += 1
+            self._recompute_profiles(sorted(names))
+        self._emit(Change(ids=frozenset(updates), names=frozenset(names)))
+        return rewritten
+
+    def _purge_items(self, section: str, sql_name: str, keys: Iterable[str]) -> Dict[str, int]:
+        """
+        Find the affected entries through the key index, drop the matching
+        items from their JSON and refresh their derived rows – one
+        transaction, touching only entries that actually change.
+        """
+        norm = norm_keys(keys)
+        if not norm:
+            return {}
+
+        key_field = _KEY_TABLES[section][1]
+        wanted = set(norm)
+        counts: Dict[str, int] = {}
+        touched = set()
+        with self._lock, self._conn:
+            marks = ", ".join("?" * len(norm))
+            seqs = [r["entry_seq"] for r in self._conn.execute(_SQL[sql_name].format(marks=marks), norm)]
+            for seq in seqs:
+                row = self._conn.execute("SELECT id, prompt, structured, created_at FROM entries WHERE seq = ?", (seq,)).fetchone()
+                touched.add(row["id"])
+                structured = json.loads(row["structured"])
+                kept = []
+                for item in structured.get(section, []):
+                    if item.get(key_field) in wanted:
+                        counts[item[key_field]] = counts.get(item[key_field], 0) + 1
+                    else:
+                        kept.append(item)
+                structured[section] = kept
+                self._conn.execute("UPDATE entries SET structured = ? WHERE seq = ?", (json.dumps(structured), seq))
+                self._unindex_entry(seq)
+                self._index_entry(seq, row["prompt"], structured, row["created_at"])
+            if section == "Relationships" and counts:
+                self._conn.execute(f"DELETE FROM profiles WHERE name_key IN ({marks})", norm)
+        if touched:
+            names = frozenset(counts) if section == "Relationships" else frozenset()
+            self._emit(Change(ids=frozenset(touched), names=names))
+        return counts
+
+    def purge_schedule_tasks(self, task_keys: Iterable[str]) -> Dict[str, int]:
+        return self._purge_items("Schedule", "purge_schedule_task", task_keys)
+
+    def purge_relationships(self, name_keys: Iterable[str]) -> Dict[str, int]:
+        return self._purge_items("Relationships", "purge_relationship", name_keys)
+
+    def delete_entry(self, entry_id: str) -> bool:
+        with self._lock, self._conn:
+            row = self._conn.execute(_SQL["delete_entry"], (entry_id,)).fetchone()
+            if row is None:
+                return False
+            keys = [
+                r["name_key"]
+                for r in self._conn.execute("SELECT DISTINCT name_key FROM relationship_items WHERE entry_seq = ?", (row["seq"],))
+            ]
+            self._unindex_entry(row["seq"])
+            self._conn.execute("DELETE FROM entries WHERE seq = ?", (row["seq"],))
+            self._recompute_profiles(keys)
+        self._emit(Change(ids=frozenset([entry_id]), names=frozenset(keys)))
+        return True
+
+    # ─── relationship profiles ───────────────────────────────────────────
+    def _save_profiles(self, profiles: Dict[str, Dict[str, Any]]) -> None:
+        now = datetime.utcnow().isoformat(timespec="microseconds")
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO profiles(name_key, profile, updated_at) VALUES (?, ?, ?)",
+            [(key, json.dumps(p), now) for key, p in profiles.items()],
+        )
+
+    def _load_profiles(self, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        if not keys:
+            return {}
+        sql = _SQL["get_profiles"].format(marks=", ".join("?" * len(keys)))
+        return {r["name_key"]: json.loads(r["profile"]) for r in self._conn.execute(sql, keys)}
+
+    def _merge_profiles(self, rels: List[Dict[str, Any]]) -> None:
+        """Fold a new entry's relationships into the stored profiles (caller holds the transaction)."""
+        if rels:
+            existing = self._load_profiles(norm_keys(r.get("name") or "" for r in rels))
+            self._save_profiles(fold_profiles(existing, rels))
+
+    def _recompute_profiles(self, keys: List[str]) -> None:
+        """Rebuild the given people from the entries that still mention them."""
+        if not keys:
+            return
+        wanted = set(keys)
+        sql = _SQL["profile_sources"].format(marks=", ".join("?" * len(keys)))
+        rels = (
+            r
+            for row in self._conn.execute(sql, keys).fetchall()
+            for r in json.loads(row["structured"]).get("Relationships", [])
+            if r.get("name_key") in wanted
+        )
+        rebuilt = fold_profiles({}, rels)
+        self._save_profiles(rebuilt)
+        gone = [k for k in keys if k not in rebuilt]
+        if gone:
+            self._conn.execute(f"DELETE FROM profiles WHERE name_key IN ({', '.join('?' * len(gone))})", gone)
+
+    def get_profiles(self, name_keys: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return self._load_profiles(norm_keys(name_keys))
+
+    def rebuild_profiles(self, only_if_empty: bool = False) -> int:
+        with self._lock, self._conn:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM profiles").fetchone()
+            if only_if_empty and count:
+                return count
+            # Stream the Relationships arrays only, in history order.
+            rels = (
+                r
+                for row in self._conn.execute(
+                    "SELECT json_extract(structured, '$.Relationships') AS rels FROM entries ORDER BY created_at, id"
+                )
+                if row["rels"]
+                for r in json.loads(row["rels"])
+            )
+            rebuilt = fold_profiles({}, rels)
+            self._conn.execute("DELETE FROM profiles")
+            self._save_profiles(rebuilt)
+        return len(rebuilt)
+
+    # ─── reads ───────────────────────────────────────────────────────────
+    def entries_by_date(self, target: date, projection: Sequence[str] | None = None) -> List[Dict[str, Any]]:
+        sql = _SQL["entries_by_date"].format(cols=_columns(projection))
+        return [_row_to_doc(r) for r in self._query(sql, (target.isoformat(),))]
+
+    def day_view(self, target: date, days_ahead: int = 0) -> Dict[str, List[Dict[str, Any]]]:
+        args = _day_args(target, days_ahead)
+        with self._lock:
+            rows = {name: self._conn.execute(sql, args).fetchall() for name, sql in _DAY_VIEW.items()}
+        return {
+            "entries": [
+                {"_id": r["id"], "prompt": r["prompt"], "journal_date": r["journal_date"], "created_at": datetime.fromisoformat(r["created_at"])}
+                for r in rows["entries"]
+            ],
+            "schedule": [json.loads(r["item"]) for r in rows["schedule"]],
+            "relationships": [json.loads(r["profile"]) for r in rows["relationships"]],
+            "mind_space": [json.loads(r["item"]) for r in rows["mind_space"]],
+        }
+
+    def entries_with_future_events(self, start: date, days_ahead: int = 60) -> List[Dict[str, Any]]:
+        end = start + timedelta(days=days_ahead)
+        rows = self._query(_SQL["entries_with_future_events"], (start.isoformat(), end.isoformat()))
+        return [_row_to_doc(r) for r in rows]
+
+    def events_between(self, start: date, end: date) -> List[Dict[str, Any]]:
+        rows = self._query(_SQL["events_between"], {"start": start.isoformat(), "end": end.isoformat()})
+        return [dict(r) for r in rows]
+
+    def rebuild_schedule_events(self, only_if_empty: bool = False) -> int:
+        with self._lock, self._conn:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM schedule_events").fetchone()
+            if only_if_empty and count:
+                return count
+            self._conn.execute("DELETE FROM schedule_events")
+            for row in self._conn.execute("SELECT seq, structured, created_at FROM entries").fetchall():
+                self._insert_events(row["seq"], json.loads(row["structured"]), row["created_at"])
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM schedule_events").fetchone()
+        self._emit(Change(full=True))
+        return count
+
+    def entries_page(
+        self, after: Cursor | None = None, limit: int = 100, projection: Sequence[str] | None = None
+    ) -> Tuple[List[Dict[str, Any]], Cursor | None]:
+        cols = _columns(projection)
+        if after is None:
+            rows = self._query(_SQL["first_page"].format(cols=cols), (limit,))
+        else:
+            created_at, last_id = after
+            rows = self._query(
+                _SQL["entries_page"].format(cols=cols),
+                (created_at.isoformat(timespec="microseconds"), last_id, limit),
+            )
+        docs = [_row_to_doc(r) for r in rows]
+        return docs, next_cursor(docs, limit)
+
+    def latest_entry(self) -> Dict[str, Any] | None:
+        rows = self._query(_SQL["latest_entry"])
+        return _row_to_doc(rows[0]) if rows else None
+
+    def search_entries(self, q: str, limit: int = 10, offset: int = 0) -> List[Dict[str, Any]]:
+        """FTS5 search ranked by weighted bm25 (newest first on ties)."""
+        match = _fts_query(q)
+        if not match:
+            return []
+        return [_row_to_doc(r) for r in self._query(_SQL["search_entries"], (match, limit, offset))]
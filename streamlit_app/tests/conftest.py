@@ -0,0 +1,81 @@
+# conftest.py
+# ─────────────────────────────────────────────────────────────────────────────
+# `store`: an empty scratch store per test, once per backend. SQLite runs
+# everywhere. MongoDB runs against MONGODB_URI when set (a scratch database
+# is created and dropped), otherwise in-process against mongomock, so the
+# Mongo code paths run offline too. What mongomock cannot emulate is listed
+# in MONGOMOCK_GAPS; tests call `needs(...)` before using it and skip there.
+# ─────────────────────────────────────────────────────────────────────────────
+from __future__ import annotations
+
+import os
+from typing import Callable, Iterator
+
+import pytest
+
+from storage import JournalStore, make_store
+
+MONGO_TEST_DB = "me_journal_conformance"
+
+# Server features the Mongo backend uses that mongomock lacks.
+MONGOMOCK_GAPS = {
+    "$text": "$text search (search_entries)",
+    "$unionWith": "$unionWith (day_view with days_ahead)",
+    "explain": "query plans (assert_no_full_scan)",
+}
+
+
+def _mongo_server_store() -> JournalStore:
+    from pymongo.errors import PyMongoError
+
+    store = make_store("mongo", db_name=MONGO_TEST_DB)
+    try:
+        store.client.admin.command("ping")
+    except PyMongoError as exc:
+        pytest.skip(f"MongoDB unreachable: {exc}")
+    store.client.drop_database(MONGO_TEST_DB)
+    return store
+
+
+def _mongomock_store(monkeypatch: pytest.MonkeyPatch) -> JournalStore:
+    mongomock = pytest.importorskip("mongomock")
+    from mongomock.collection import BulkOperationBuilder
+
+    # pymongo 4.11+ passes `sort` to bulk replace/update ops; mongomock 4.3 does not take it
+    for name in ("add_replace", "add_update"):
+        original = getattr(BulkOperationBuilder, name)
+
+        def without_sort(self, *args, _original=original, sort=None, **kwargs):
+            return _original(self, *args, **kwargs)
+
+        monkeypatch.setattr(BulkOperationBuilder, name, without_sort)
+    store = make_store("mongo", uri="mongodb://mongomock", db_name=MONGO_TEST_DB)
+    store._client = mongomock.MongoClient()
+    return store
+
+
+@pytest.fixture(params=["sqlite", "mongo"])
+def store(request: pytest.FixtureRequest, tmp_path, monkeypatch) -> Iterator[JournalStore]:
+    if request.param == "sqlite":
+        s = make_store("sqlite", path=str(tmp_path / "journal.sqlite3"))
+        s.ensure_indexes()
+        yield s
+        return
+    s = _mongo_server_store() if os.getenv("MONGODB_URI") else _mongomock_store(monkeypatch)
+    s.ensure_indexes()
+    try:
+        yield s
+    finally:
+        s.client.drop_database(MONGO_TEST_DB)
+
+
+@pytest.fixture
+def needs(store: JournalStore) -> Callable[[str], None]:
+    """needs("$text"): skip the rest of the test where the store only emulates that feature."""
+    emulated = store.name == "mongo" and type(store.client).__module__.startswith("mongomock")
+
+    def check(feature: str) -> None:
+        if emulated:
+            pytest.skip(f"mongomock cannot emulate {MONGOMOCK_GAPS[feature]}")
+
+    return check
@@ -0,0 +1,45 @@
+# test_assets.py
+# ─────────────────────────────────────────────────────────────────────────────
+# Which bytes an image variant is served as (assets.py).
+# ─────────────────────────────────────────────────────────────────────────────
+from __future__ import annotations
+
+import io
+
+import pytest
+
+import assets
+
+Image = pytest.importorskip("PIL.Image")
+
+
+@pytest.fixture
+def resources(tmp_path, monkeypatch):
+    monkeypatch.setattr(assets, "RESOURCES_DIR", tmp_path)
+    assets._variant.cache_clear()
+    yield tmp_path
+    assets._variant.cache_clear()
+
+
+def _noise(path, fmt: str, **save) -> bytes:
+    out = io.BytesIO()
+    Image.effect_noise((400, 200), 100).convert("RGB").save(out, fmt, **save)
+    path.write_bytes(out.getvalue())
+    return out.getvalue()
+
+
+def test_full_width_is_the_original(resources):
+    data = _noise(resources / "a.png", "PNG")
+    assert assets._variant("a.png", None) == (data, "image/png", 400)
+    assert assets._variant("a.png", 800) == (data, "image/png", 400)
+
+
+def test_smaller_width_is_webp_when_smaller(resources):
+    data = _noise(resources / "a.png", "PNG")
+    webp, mime, width = assets._variant("a.png", 100)
+    assert (mime, width) == ("image/webp", 100) and len(webp) < len(data)
+
+
+def test_original_kept_when_webp_is_larger(resources):
+    data = _noise(resources / "a.jpg", "JPEG", quality=5)  # noise WebP-encodes to far more than this
+    assert assets._variant("a.jpg", 399) == (data, "image/jpeg", 400)
@@ -0,0 +1,249 @@
+# test_backends.py
+# ─────────────────────────────────────────────────────────────────────────────
+# Conformance suite every storage backend must pass (see conftest.py for the
+# backends it runs against). Timings live in benchmarks/backends.py.
+# ─────────────────────────────────────────────────────────────────────────────
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta
+from typing import Dict, Tuple
+
+import pytest
+
+from storage import JournalStore
+
+DAY = date(2025, 1, 15)
+EMPTY = {"Schedule": [], "Relationships": [], "Mind Space": []}
+
+
+def _iso(days: int) -> str:
+    return (DAY + timedelta(days=days)).isoformat()
+
+
+@pytest.fixture
+def seeded(store: JournalStore) -> Tuple[JournalStore, str, str]:
+    """Two entries on DAY (a: gym with Alice, b: dentist, gym later, Bob) and one the day before."""
+    a = store.add_entry(
+        "Gym with Alice tomorrow, feeling great",
+        {
+            "Schedule": [{"time": "07:00", "task": " Gym ", "event_date": _iso(1)}],
+            "Relationships": [{"name": "Alice", "role": "friend", "notes": ["likes climbing"]}],
+            "Mind Space": [{"thought": "feeling great about training"}],
+        },
+        DAY,
+    )
+    b = store.add_entry(
+        "Dentist appointment, call bob",
+        {
+            "Schedule": [
+                {"time": "10:00", "task": "gym", "event_date": _iso(90)},
+                {"time": "15:00", "task": "Dentist", "event_date": _iso(5)},
+            ],
+            "Relationships": [{"name": " alice ", "role": "friend"}, {"name": "Bob", "role": "brother"}],
+            "Mind Space": [],
+        },
+        DAY,
+    )
+    store.add_entry("Quiet day", EMPTY, DAY - timedelta(days=1))
+    return store, a, b
+
+
+def _ids(docs) -> list:
+    return [str(d["_id"]) for d in docs]
+
+
+# ─── reads ──────────────────────────────────────────────────────────────────
+def test_events_between(seeded):
+    store, _, _ = seeded
+    events = store.events_between(DAY, DAY + timedelta(days=60))
+    assert [(e["task_key"], e["date"]) for e in events] == [("gym", _iso(1)), ("dentist", _iso(5))]
+    assert events[0]["start"] == "07:00"
+
+
+def test_day_view(seeded, needs):
+    store, a, b = seeded
+    today = store.day_view(DAY)
+    assert sorted(_ids(today["entries"])) == sorted([a, b])
+    assert all(e["journal_date"] == DAY.isoformat() for e in today["entries"])
+    assert {p["name_key"] for p in today["relationships"]} == {"alice", "bob"}
+    needs("$unionWith")
+    view = store.day_view(DAY, 60)
+    assert sorted(_ids(view["entries"])) == sorted([a, b])
+    # one item per task, the upcoming one winning
+    assert [(ev["task_key"], ev["event_date"]) for ev in view["schedule"]] == [("gym", _iso(1)), ("dentist", _iso(5))]
+    assert {p["name_key"] for p in view["relationships"]} >= {"alice"}
+    assert len(view["mind_space"]) >= 1
+
+
+def test_entry_reads(seeded):
+    store, a, b = seeded
+    by_date = store.entries_by_date(DAY)
+    assert _ids(by_date) == [a, b]
+    assert by_date[0]["journal_date"] == DAY.isoformat() and "Schedule" in by_date[0]["structured"]
+    assert set(_ids(store.entries_with_future_events(DAY, 60))) == {a, b}
+    assert not store.entries_with_future_events(DAY + timedelta(days=10), 30)
+    assert len(store.all_entries()) == 3
+    assert store.latest_entry()["prompt"] == "Quiet day"
+
+
+def test_paging_and_projection(seeded):
+    store, a, b = seeded
+    page, after = store.entries_page(limit=2)
+    rest, end = store.entries_page(after, limit=2)
+    assert _ids(page + rest)[:2] == [a, b] and after and end is None and len(rest) == 1
+    assert _ids(store.iter_entries(batch_size=1))[:2] == [a, b]
+    slim = store.entries_by_date(DAY, projection=["structured.Schedule"])[0]
+    assert "prompt" not in slim and set(slim["structured"]) == {"Schedule"}
+
+
+def test_profiles_merge_every_mention(seeded):
+    store, _, _ = seeded
+    profiles = store.get_profiles(["ALICE", "bob", "nobody"])
+    assert set(profiles) == {"alice", "bob"}
+    assert profiles["alice"]["notes"] == ["likes climbing"]
+
+
+def test_search(seeded, needs):
+    store, a, b = seeded
+    needs("$text")
+    assert _ids(store.search_entries("climbing")) == [a]  # relationship notes
+    hits = store.search_entries("dentist")  # prompts and tasks
+    assert hits and str(hits[0]["_id"]) == b and "score" in hits[0]
+    assert store.search_entries("dentist", limit=1, offset=1) == []
+
+
+# ─── writes ─────────────────────────────────────────────────────────────────
+def test_purge_schedule_tasks(seeded, needs):
+    store, _, _ = seeded
+    assert store.purge_schedule_task("GYM") == 2
+    assert all(ev["task_key"] != "gym" for e in store.all_entries() for ev in e["structured"]["Schedule"])
+    assert all(e["task_key"] != "gym" for e in store.events_between(DAY, DAY + timedelta(days=365)))
+    assert store.purge_schedule_tasks(["dentist", "nothing"]) == {"dentist": 1}
+    needs("$text")
+    hits = store.search_entries("dentist")  # the prompt still matches; the task is gone
+    assert hits and all(not h["structured"]["Schedule"] for h in hits)
+
+
+def test_purge_counts_items(store):
+    twice = {**EMPTY, "Schedule": [{"task": "Yoga", "event_date": _iso(2)}, {"task": "yoga ", "event_date": _iso(9)}]}
+    store.add_entry("Yoga twice", twice, DAY)
+    store.add_entry("Yoga once", {**EMPTY, "Schedule": twice["Schedule"][:1]}, DAY)
+    assert store.purge_schedule_tasks(["yoga"]) == {"yoga": 3}
+    assert store.events_between(DAY, DAY + timedelta(days=30)) == []
+
+
+def test_purge_counts_duplicates_in_one_entry(store):
+    people = [{"name": "Ben", "role": "friend"}, {"name": "ben ", "notes": ["x"]}]
+    store.add_entry("Ben and ben", {**EMPTY, "Relationships": people}, DAY)
+    assert store.purge_relationship("BEN") == 2
+    assert store.entries_by_date(DAY)[0]["structured"]["Relationships"] == []
+    assert "ben" not in store.get_profiles(["ben"])
+
+
+def test_purge_relationships(seeded):
+    store, _, _ = seeded
+    assert store.purge_relationship("Alice") == 2
+    assert "alice" not in store.get_profiles(["alice"])
+    assert store.purge_relationships(["bob"]) == {"bob": 1}
+
+
+def test_delete_entry(seeded, needs):
+    store, a, _ = seeded
+    assert store.delete_entry(a) and not store.delete_entry(a)
+    assert store.delete_entry("not-an-id") is False
+    window = (DAY, DAY + timedelta(days=365))
+    before = store.events_between(*window)
+    assert store.rebuild_schedule_events() == len(before) == 2  # b's gym and dentist
+    assert store.events_between(*window) == before  # the incremental event store was already right
+    needs("$text")
+    assert store.search_entries("climbing") == []
+
+
+def test_delete_recomputes_profiles(store):
+    c = store.add_entry("Carol", {**EMPTY, "Relationships": [{"name": "Carol", "role": "aunt", "notes": ["n1"]}]}, DAY)
+    store.add_entry("Carol again", {**EMPTY, "Relationships": [{"name": "carol", "notes": ["n2"]}]}, DAY)
+    store.delete_entry(c)
+    assert store.get_profiles(["carol"])["carol"].get("notes") == ["n2"]
+    assert store.rebuild_profiles() == 1 and store.get_profiles(["carol"])["carol"]["notes"] == ["n2"]
+
+
+def test_writes_notify_subscribers(store):
+    seen = []
+    store.subscribe(seen.append)
+    d = store.add_entry("Notify", {**EMPTY, "Schedule": [{"task": "Call", "event_date": _iso(3)}]}, DAY)
+    store.delete_entry(d)
+    assert len(seen) == 2
+    assert DAY.isoformat() in seen[0].days and _iso(3) in seen[0].event_days
+    assert seen[1].ids == {d}
+
+
+def test_add_entries(store):
+    batch_day = DAY + timedelta(days=150)
+    seen = []
+    store.subscribe(seen.append)
+    ids = store.add_entries([
+        (
+            f"Batch {i}",
+            {
+                "Schedule": [{"time": "08:00", "task": f"Batch task {i}", "event_date": batch_day.isoformat()}],
+                "Relationships": [{"name": "Carol", "role": "friend", "notes": [f"b{i}"]}],
+                "Mind Space": [],
+            },
+            batch_day,
+        )
+        for i in range(3)
+    ])
+    assert _ids(store.entries_by_date(batch_day)) == ids and len(set(ids)) == 3
+    assert len(store.events_between(batch_day, batch_day)) == 3
+    assert store.get_profiles(["carol"])["carol"]["notes"] == ["b0", "b1", "b2"]
+    assert len(seen) == 1 and seen[0].ids == set(ids)
+
+
+def test_add_entries_keeps_given_created_at(store):
+    day = DAY + timedelta(days=160)
+    stamps = [datetime(2020, 1, 2, 3, 4, 5, 600000), datetime(2020, 1, 1)]
+    store.add_entries([(f"Restored {i}", EMPTY, day) for i in range(2)], stamps)
+    assert [(e["prompt"], e["created_at"]) for e in store.entries_by_date(day)] == [
+        ("Restored 1", stamps[1]),
+        ("Restored 0", stamps[0]),
+    ]
+
+
+# ─── canonical schedule fields and the backfill ────────────────────────────
+LATER = DAY + timedelta(days=200)
+MIXED: Dict = {
+    "Schedule": [
+        {"time": "10:00", "task": "Later", "event_date": LATER.isoformat()},
+        {"time": "9 am", "task": "Earlier", "event_date": LATER.strftime("%d %b %Y")},
+    ],
+    "Relationships": [{"name": "Dora", "role": "friend"}],
+    "Mind Space": [],
+}
+
+
+def test_schedule_items_carry_canonical_date_and_start(store):
+    store.add_entry("Mixed formats", MIXED, LATER)
+    stored = store.entries_by_date(LATER)[0]["structured"]["Schedule"]
+    assert [(ev["date"], ev["start"]) for ev in stored] == [(LATER.isoformat(), "10:00"), (LATER.isoformat(), "09:00")]
+    assert [ev["task_key"] for ev in store.day_view(LATER)["schedule"]] == ["earlier", "later"]
+
+
+def test_backfill_rewrites_legacy_entries(store, tmp_path, needs):
+    m = store.add_entry("Mixed formats", MIXED, LATER)
+    stored = store.entries_by_date(LATER)[0]["structured"]
+    store._rewrite_structured({m: MIXED})  # as written before keys and canonical fields existed
+    checkpoint = str(tmp_path / "backfill.json")
+    assert store.backfill_normalized_keys(batch_size=2, checkpoint=checkpoint) == 1
+    assert store.entries_by_date(LATER)[0]["structured"] == stored
+    assert store.backfill_normalized_keys(batch_size=2, checkpoint=checkpoint) == 0
+    # derived rows follow the rewritten entry
+    assert [e["task_key"] for e in store.events_between(LATER, LATER)] == ["earlier", "later"]
+    assert store.get_profiles(["dora"])["dora"]["role"] == "friend"
+    needs("$text")
+    assert _ids(store.search_entries("earlier")) == [m]
+
+
+def test_no_helper_plans_a_full_scan(seeded, needs):
+    store, _, _ = seeded
+    needs("explain")
+    store.assert_no_full_scan(DAY)
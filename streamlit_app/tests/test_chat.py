@@ -0,0 +1,84 @@
+# test_chat.py
+# ─────────────────────────────────────────────────────────────────────────────
+# Agent runs per conversation and one reply at a time per run (chat.py),
+# against a fake transport and without the websocket.
+# ─────────────────────────────────────────────────────────────────────────────
+from __future__ import annotations
+
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import chat
+
+
+class FakeTransport:
+    """Answers each event after `delay` seconds, noting how many were in flight per run."""
+
+    def __init__(self, delay: float = 0.05) -> None:
+        self.delay = delay
+        self.in_flight: dict = {}
+        self.peak: dict = {}
+        self.posts: list = []
+        self._lock = threading.Lock()
+
+    def post(self, url, **kwargs):
+        self.posts.append(url)
+        return SimpleNamespace(json=lambda: {"agentId": f"a{len(self.posts)}", "runId": f"r{len(self.posts)}"})
+
+    def put(self, url, json=None, **kwargs):
+        with self._lock:
+            self.in_flight[url] = self.in_flight.get(url, 0) + 1
+            self.peak[url] = max(self.peak.get(url, 0), self.in_flight[url])
+        time.sleep(self.delay)
+        with self._lock:
+            self.in_flight[url] -= 1
+        text = json["eventInput"]["messages"][0]["content"]
+        return SimpleNamespace(json=lambda: [{"role": "assistant", "content": f"re: {text}"}])
+
+
+@pytest.fixture
+def transport(monkeypatch) -> FakeTransport:
+    fake = FakeTransport()
+    monkeypatch.setattr(chat, "get_transport", lambda: fake)
+    monkeypatch.setattr(chat, "ws_connect", None)
+    return fake
+
+
+def _reply_all(runs, texts):
+    replies = [chat.stream_reply(run, text) for run, text in zip(runs, texts)]
+    threads = [threading.Thread(target=lambda r=r: list(r)) for r in replies]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return [r.content for r in replies]
+
+
+def test_each_conversation_starts_its_own_run(transport):
+    agent = chat.ChatAgent("Ask", "AgentAsk")
+    first, second = agent.start_run(), agent.start_run()
+    assert first != second and first.run_id == "r1"
+    assert transport.posts == [f"{chat.BASE_URL}/api/agents/AgentAsk"] * 2
+
+
+def test_pinned_run_is_used_as_is(transport):
+    agent = chat.ChatAgent("Ask", "AgentAsk", "agent-1", "run-1")
+    assert agent.start_run() == chat.AgentRun("AgentAsk", "agent-1", "run-1")
+    assert transport.posts == []
+
+
+def test_one_reply_at_a_time_per_run(transport):
+    shared = chat.AgentRun("AgentAsk", "a", "shared")
+    assert _reply_all([shared, shared, shared], ["one", "two", "three"]) == ["re: one", "re: two", "re: three"]
+    assert transport.peak[shared.endpoint] == 1
+
+
+def test_separate_runs_reply_concurrently(transport):
+    runs = [chat.AgentRun("AgentAsk", "a", f"run-{i}") for i in range(2)]
+    transport.delay = 0.3
+    started = time.perf_counter()
+    _reply_all(runs, ["one", "two"])
+    assert time.perf_counter() - started < 0.55
@@ -0,0 +1,54 @@
+# test_extraction_cache.py
+# ─────────────────────────────────────────────────────────────────────────────
+# What the extraction cache keys on, and that its version follows the agent's
+# extraction contract when agent_chat ships alongside the app.
+# ─────────────────────────────────────────────────────────────────────────────
+from __future__ import annotations
+
+import ast
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+from extraction_cache import EXTRACTION_CACHE_VERSION, EXTRACTION_SCHEMA, ExtractionCache
+
+AGENT_CHAT = Path(__file__).resolve().parents[2] / "agent_chat" / "src"
+
+
+def _cache(tmp_path: Path, **kwargs) -> ExtractionCache:
+    return ExtractionCache(path=str(tmp_path / "cache.sqlite3"), **kwargs)
+
+
+def test_key_covers_version_schema_and_model(tmp_path):
+    base = _cache(tmp_path).key("Call Alice at 3pm")
+    assert _cache(tmp_path).key("  call alice   at 3PM ") == base
+    assert _cache(tmp_path, version=EXTRACTION_CACHE_VERSION + "x").key("Call Alice at 3pm") != base
+    assert _cache(tmp_path, schema="other_result").key("Call Alice at 3pm") != base
+    assert _cache(tmp_path, model="other-model").key("Call Alice at 3pm") != base
+
+
+def test_round_trip(tmp_path):
+    cache = _cache(tmp_path)
+    cache.put("Call Alice at 3pm", {"Schedule": [{"time": "15:00", "task": "Call Alice"}]})
+    assert _cache(tmp_path).get("call alice at 3pm") == {"Schedule": [{"time": "15:00", "task": "Call Alice"}]}
+    assert _cache(tmp_path, version="0").get("Call Alice at 3pm") is None
+
+
+def test_version_and_schema_match_the_agent():
+    if not AGENT_CHAT.is_dir():
+        pytest.skip("agent_chat not alongside the app")
+    pytest.importorskip("pydantic")
+    spec = importlib.util.spec_from_file_location("agent_structured_output", AGENT_CHAT / "structured_output.py")
+    structured_output = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(structured_output)
+    assert EXTRACTION_CACHE_VERSION == structured_output.EXTRACTION_VERSION
+
+    tree = ast.parse((AGENT_CHAT / "agents" / "agent_structure_result.py").read_text())
+    schemas = [
+        node.value.value
+        for node in tree.body
+        if isinstance(node, ast.Assign) and any(getattr(t, "id", "") == "RESPONSE_SCHEMA" for t in node.targets)
+    ]
+    assert schemas == [EXTRACTION_SCHEMA]
+    assert EXTRACTION_SCHEMA in structured_output.RESPONSE_SCHEMAS
@@ -0,0 +1,66 @@
+# test_fastpath.py
+# ─────────────────────────────────────────────────────────────────────────────
+# Which prompts the rule-based extractor may answer on its own (fastpath.py).
+# ─────────────────────────────────────────────────────────────────────────────
+from __future__ import annotations
+
+import datetime as _dt
+
+import pytest
+
+from fastpath import extract
+
+TODAY = _dt.date(2025, 1, 15)  # a Wednesday
+
+
+@pytest.mark.parametrize(
+    "prompt, time, task, event_date",
+    [
+        ("dentist tomorrow 10:00", "10:00", "Dentist", "2025-01-16"),
+        ("Call Bob at 5pm tomorrow", "17:00", "Call Bob", "2025-01-16"),
+        ("meet Bob on Friday at noon", "12:00", "Meet Bob", "2025-01-17"),
+    ],
+)
+def test_simple_commands_are_confident(prompt, time, task, event_date):
+    result = extract(prompt, TODAY)
+    assert result.confident, result.reasons
+    assert result.structured["Schedule"] == [{"time": time, "task": task, "event_date": event_date}]
+
+
+@pytest.mark.parametrize(
+    "prompt",
+    [
+        "Don't call Alice at 3pm",
+        "Do not call Bob tomorrow at 5pm",
+        "Cancel dentist at 3pm",
+        "cancelled the gym tomorrow at 7pm",
+        "Skip gym at 7pm",
+        "No longer meeting Bob at 5pm tomorrow",
+        "Dentist at 3pm, not tomorrow",
+    ],
+)
+def test_negated_or_cancelled_commands_go_to_the_agent(prompt):
+    result = extract(prompt, TODAY)
+    assert not result.confident
+    assert "negated or cancelled" in result.reasons
+
+
+def test_undated_command_is_left_for_the_date_clarification():
+    result = extract("At 3 pm call Alice", TODAY)
+    assert result.structured["Schedule"] == [{"time": "15:00", "task": "Call Alice", "event_date": None}]
+    assert "no explicit date" in result.reasons
+
+
+@pytest.mark.parametrize(
+    "prompt, reason",
+    [
+        ("Yoga every Monday at 7pm", "unparsed time words"),
+        ("Moved dentist to 4pm tomorrow", "dangling preposition"),
+        ("Visit Paris tomorrow at 9am", "person only by capitalization"),
+        ("I felt tired today, call mum at 5pm and then gym at 7pm", "several times"),
+    ],
+)
+def test_uncertain_prompts_go_to_the_agent(prompt, reason):
+    result = extract(prompt, TODAY)
+    assert not result.confident
+    assert reason in result.reasons
@@ -0,0 +1,62 @@
+# test_importer.py
+# ─────────────────────────────────────────────────────────────────────────────
+# NDJSON imports with unreadable lines (importer.py), with the agent and the
+# store replaced by recorders.
+# ─────────────────────────────────────────────────────────────────────────────
+from __future__ import annotations
+
+import datetime as _dt
+import json
+
+import pytest
+
+import importer
+
+LINES = [
+    '{"prompt": "first", "journal_date": "2024-03-01"}',
+    '{"prompt": "broken",',
+    '{"prompt": "dated by number", "journal_date": 20240301}',
+    '["not", "an", "object"]',
+    '{"text": "last"}',
+]
+
+
+@pytest.fixture
+def stored(monkeypatch) -> list:
+    rows: list = []
+    monkeypatch.setattr(importer, "add_entries", rows.extend)
+    monkeypatch.setattr(importer.agent, "lookup", lambda prompt, cache, today=None: {"Schedule": []})
+    return rows
+
+
+def _write(tmp_path, lines):
+    path = tmp_path / "export.ndjson"
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return path
+
+
+def test_unreadable_lines_keep_their_index(tmp_path):
+    entries = list(importer.split_entries(_write(tmp_path, LINES)))
+    assert [e.index for e in entries] == [0, 1, 2, 3, 4]
+    assert [bool(e.error) for e in entries] == [False, True, True, True, False]
+    assert entries[2].prompt == LINES[2]
+
+
+def test_unreadable_lines_are_recorded_as_failures(tmp_path, stored):
+    path = _write(tmp_path, LINES)
+    result = importer.run_import(path, _dt.date(2024, 1, 1), cache=object(), batch_size=2)
+
+    assert (result.total, result.imported, result.failed) == (5, 2, 3)
+    assert [prompt for prompt, _, _ in stored] == ["first", "last"]
+    failed = [json.loads(line) for line in path.with_name(path.name + ".failed.ndjson").read_text().splitlines()]
+    assert [f["line"] for f in failed] == LINES[1:4]
+    assert all(f["error"].startswith("unreadable line") for f in failed)
+
+
+def test_resume_skips_the_same_lines(tmp_path, stored):
+    path = _write(tmp_path, LINES)
+    importer.Checkpoint(path).save(2)  # "first" and the broken line were handled
+    result = importer.run_import(path, _dt.date(2024, 1, 1), cache=object())
+
+    assert (result.resumed, result.imported, result.failed) == (2, 1, 2)
+    assert [prompt for prompt, _, _ in stored] == ["last"]
@@ -0,0 +1,116 @@
+# test_transport.py
+# ─────────────────────────────────────────────────────────────────────────────
+# Retry and circuit-breaker rules of transport.Transport, against a scripted
+# adapter mounted on its session (no network).
+# ─────────────────────────────────────────────────────────────────────────────
+from __future__ import annotations
+
+from typing import List
+
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+from urllib3.exceptions import MaxRetryError, NewConnectionError
+
+from transport import CircuitOpenError, Transport
+
+URL = "http://agent.test/api/agents/AgentStructureResult/a/r"
+
+
+class Scripted(BaseAdapter):
+    """Answers each request with the next status code, or raises the next exception."""
+
+    def __init__(self, outcomes: List[object]) -> None:
+        super().__init__()
+        self.outcomes = list(outcomes)
+        self.sent = 0
+
+    def send(self, request, **kwargs):
+        self.sent += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        resp = requests.Response()
+        resp.status_code, resp.request, resp.url = outcome, request, request.url
+        return resp
+
+    def close(self) -> None:
+        pass
+
+
+def _refused() -> requests.ConnectionError:
+    reason = NewConnectionError(None, "Connection refused")
+    return requests.ConnectionError(MaxRetryError(None, URL, reason))
+
+
+def _transport(outcomes: List[object], retries: int = 3) -> tuple:
+    t = Transport(retries=retries)
+    t._backoff = lambda attempt, resp: 0
+    adapter = Scripted(outcomes)
+    t.session.mount("http://", adapter)
+    return t, adapter
+
+
+@pytest.mark.parametrize("status", [502, 504])
+def test_event_put_is_not_repeated_after_a_gateway_error(status):
+    t, adapter = _transport([status, 200])
+    with pytest.raises(requests.HTTPError):
+        t.put(URL, json={}, idempotent=False)
+    assert adapter.sent == 1
+
+
+@pytest.mark.parametrize("outcome", [429, 503, _refused(), requests.ConnectTimeout("connect timed out")])
+def test_event_put_is_repeated_when_it_cannot_have_arrived(outcome):
+    t, adapter = _transport([outcome, 200])
+    assert t.put(URL, json={}, idempotent=False).status_code == 200
+    assert adapter.sent == 2
+
+
+@pytest.mark.parametrize(
+    "outcome", [requests.ReadTimeout("read timed out"), requests.ConnectionError("Connection aborted")]
+)
+def test_event_put_is_not_repeated_once_sent(outcome):
+    t, adapter = _transport([outcome, 200])
+    with pytest.raises(type(outcome)):
+        t.put(URL, json={}, idempotent=False)
+    assert adapter.sent == 1
+
+
+def test_idempotent_calls_repeat_gateway_errors():
+    t, adapter = _transport([502, 504, 200])
+    assert t.put(URL, json={}).status_code == 200
+    assert adapter.sent == 3
+
+
+def test_breaker_counts_one_failure_per_call():
+    t, adapter = _transport([503] * 8, retries=3)
+    breaker, _ = t._for(URL)
+    breaker.failures = 2
+    with pytest.raises(requests.HTTPError):
+        t.put(URL, json={})
+    assert adapter.sent == 4 and breaker.state == "closed"
+    with pytest.raises(requests.HTTPError):
+        t.put(URL, json={})
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        t.put(URL, json={})
+    assert adapter.sent == 8
+
+
+def test_half_open_trial_keeps_its_retries():
+    t, adapter = _transport([503, 200])
+    breaker, _ = t._for(URL)
+    breaker.failures, breaker.reset_s = 1, 0
+    breaker.record(ok=False)
+    assert t.put(URL, json={}).status_code == 200
+    assert adapter.sent == 2 and breaker.state == "closed"
+
+
+def test_client_errors_do_not_trip_the_breaker():
+    t, _ = _transport([404, 404])
+    breaker, _ = t._for(URL)
+    breaker.failures = 1
+    for _ in range(2):
+        with pytest.raises(requests.HTTPError):
+            t.put(URL, json={})
+    assert breaker.state == "closed"
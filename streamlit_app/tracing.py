@@ -0,0 +1,205 @@
+# tracing.py
+# ─────────────────────────────────────────────────────────────────────────────
+# Lightweight spans for finding where a rerun's time goes.
+#
+#   with trace("rerun Home") as t:  root of one trace (a page rerun)
+#       with span("db.day_view"):   nested timing, parent taken from context
+#   @traced()                       span around every call of a function
+#
+# Spans are only recorded inside a trace, so instrumented code costs one
+# context-variable lookup otherwise. With TRACE_EXPORT_PATH set, spans
+# outside a trace (e.g. agent calls on the job threads) start their own, and
+# every finished trace is appended to that file as one OTLP/JSON
+# ExportTraceServiceRequest per line – the format of the OpenTelemetry
+# collector's file exporter, readable by its otlpjsonfile receiver.
+# The last TRACE_KEEP traces stay in memory for the debug panel.
+# ─────────────────────────────────────────────────────────────────────────────
+from __future__ import annotations
+
+import functools
+import json
+import os
+import secrets
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Iterator, List, Tuple, TypeVar
+
+TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH", "")
+TRACE_KEEP = int(os.getenv("TRACE_KEEP", "20"))
+SERVICE_NAME = os.getenv("TRACE_SERVICE_NAME", "me-journal")
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: str | None
+    start_ns: int  # unix time
+    end_ns: int = 0
+    attrs: Dict[str, Any] = field(default_factory=dict)
+    thread: str = field(default_factory=lambda: threading.current_thread().name)
+    _t0: int = field(default_factory=time.perf_counter_ns, repr=False)
+
+    def set(self, key: str, value: Any) -> None:
+        self.attrs[key] = value
+
+    def _finish(self) -> None:
+        self.end_ns = self.start_ns + time.perf_counter_ns() - self._t0
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+
+class _NoSpan:
+    """Stand-in yielded when nothing records; accepts and drops attributes."""
+
+    def set(self, key: str, value: Any) -> None:
+        pass
+
+
+_NO_SPAN = _NoSpan()
+
+
+@dataclass
+class Trace:
+    root: Span
+    spans: List[Span] = field(default_factory=list)  # root first, in start order
+
+    @property
+    def duration_ms(self) -> float:
+        return self.root.duration_ms
+
+    def set(self, key: str, value: Any) -> None:
+        self.root.set(key, value)
+
+
+_active: ContextVar[Tuple[Trace, Span] | None] = ContextVar("tracing_active", default=None)
+_recent: Deque[Trace] = deque(maxlen=TRACE_KEEP)
+_export_lock = threading.Lock()
+
+
+@contextmanager
+def _enter(tr: Trace, s: Span) -> Iterator[Span]:
+    tr.spans.append(s)
+    token = _active.set((tr, s))
+    try:
+        yield s
+    except Exception as exc:
+        s.set("error", f"{type(exc).__name__}: {exc}")
+        raise
+    finally:
+        s._finish()
+        _active.reset(token)
+
+
+@contextmanager
+def trace(name: str, **attrs: Any) -> Iterator[Trace]:
+    """A new trace rooted at span `name`; kept for the debug panel and exported."""
+    tr = Trace(Span(name, secrets.token_hex(16), secrets.token_hex(8), None, time.time_ns(), attrs=attrs))
+    try:
+        with _enter(tr, tr.root):
+            yield tr
+    finally:
+        _recent.append(tr)
+        if TRACE_EXPORT_PATH:
+            _export(tr)
+
+
+@contextmanager
+def span(name: str, **attrs: Any) -> Iterator[Span | _NoSpan]:
+    """Child of the current span; a new trace only if exporting, else a no-op."""
+    active = _active.get()
+    if active is None:
+        if not TRACE_EXPORT_PATH:
+            yield _NO_SPAN
+            return
+        with trace(name, **attrs) as tr:
+            yield tr.root
+        return
+    tr, parent = active
+    with _enter(tr, Span(name, tr.root.trace_id, secrets.token_hex(8), parent.span_id, time.time_ns(), attrs=attrs)) as s:
+        yield s
+
+
+def traced(name: str | None = None) -> Callable[[F], F]:
+    """Decorator: run the function inside span(name or its qualified name)."""
+
+    def wrap(fn: F) -> F:
+        label = name or f"{fn.__module__}.{fn.__qualname__}"
+
+        @functools.wraps(fn)
+        def inner(*args: Any, **kwargs: Any) -> Any:
+            if _active.get() is None and not TRACE_EXPORT_PATH:
+                return fn(*args, **kwargs)
+            with span(label):
+                return fn(*args, **kwargs)
+
+        return inner  # type: ignore[return-value]
+
+    return wrap
+
+
+def recent_traces() -> List[Trace]:
+    """Finished traces of this process, oldest first."""
+    return list(_recent)
+
+
+def last_trace(name: str | None = None) -> Trace | None:
+    return next((t for t in reversed(_recent) if name is None or t.root.name == name), None)
+
+
+# ─── OTLP/JSON export ───────────────────────────────────────────────────────
+def _value(v: Any) -> Dict[str, Any]:
+    if isinstance(v, bool):
+        return {"boolValue": v}
+    if isinstance(v, int):
+        return {"intValue": str(v)}
+    if isinstance(v, float):
+        return {"doubleValue": v}
+    return {"stringValue": str(v)}
+
+
+def _otlp_span(s: Span) -> Dict[str, Any]:
+    attrs = {**s.attrs, "thread.name": s.thread}
+    out = {
+        "traceId": s.trace_id,
+        "spanId": s.span_id,
+        "name": s.name,
+        "kind": 1,  # SPAN_KIND_INTERNAL
+        "startTimeUnixNano": str(s.start_ns),
+        "endTimeUnixNano": str(s.end_ns),
+        "attributes": [{"key": k, "value": _value(v)} for k, v in attrs.items() if k != "error"],
+        "status": {"code": 2, "message": s.attrs["error"]} if "error" in s.attrs else {},
+    }
+    if s.parent_id:
+        out["parentSpanId"] = s.parent_id
+    return out
+
+
+def to_otlp(tr: Trace) -> Dict[str, Any]:
+    """The trace as an OTLP/JSON ExportTraceServiceRequest."""
+    return {
+        "resourceSpans": [
+            {
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+                "scopeSpans": [{"scope": {"name": "me-journal.tracing"}, "spans": [_otlp_span(s) for s in tr.spans]}],
+            }
+        ]
+    }
+
+
+def _export(tr: Trace) -> None:
+    line = json.dumps(to_otlp(tr), default=str) + "\n"
+    try:
+        with _export_lock, open(TRACE_EXPORT_PATH, "a", encoding="utf-8") as f:
+            f.write(line)
+    except OSError:
+        pass  # diagnostics must never break the page
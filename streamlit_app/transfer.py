@@ -0,0 +1,275 @@
+# transfer.py
+# ─────────────────────────────────────────────────────────────────────────────
+# Streaming export / import of the whole journal – backups, analytics and
+# moving data between environments (e.g. MongoDB → SQLite).
+#
+#   ndjson    one entry per line, lossless (a .gz suffix compresses it)
+#   parquet   a directory of four Parquet files – entries, schedule,
+#             relationships, mind_space – one row per entry / item, items
+#             linked by entry_id (needs pyarrow)
+#
+# Both directions hold one batch in memory: export pages through
+# iter_entries, import writes through batched add_entries keeping the
+# original created_at. Imports checkpoint like importer.py, so an
+# interrupted restore resumes instead of duplicating entries.
+#
+#   python transfer.py export backup.ndjson.gz
+#   python transfer.py export analytics/ --format parquet
+#   python transfer.py import backup.ndjson.gz
+# ─────────────────────────────────────────────────────────────────────────────
+from __future__ import annotations
+
+import argparse
+import datetime as _dt
+import gzip
+import json
+import os
+from pathlib import Path
+from typing import IO, Any, Callable, Dict, Iterator, List, Tuple
+
+from database import add_entries, iter_entries
+from importer import Checkpoint
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional – only the parquet format needs it
+    pa = pq = None
+
+TRANSFER_BATCH_SIZE = int(os.getenv("TRANSFER_BATCH_SIZE", "1000"))
+
+# flattened item tables: file stem → (section, columns, derived keys);
+# derived keys are recomputed on import, anything else goes to `extra`
+SECTIONS = {
+    "schedule": ("Schedule", ("task", "time", "event_date", "date", "start"), ("task_key", "date", "start")),
+    "relationships": ("Relationships", ("name", "role"), ("name_key",)),
+    "mind_space": ("Mind Space", ("thought",), ()),
+}
+
+Entry = Tuple[Tuple[str, Dict[str, Any], _dt.date | None], _dt.datetime]
+
+
+def _format(path: Path, fmt: str | None) -> str:
+    if fmt:
+        return fmt
+    return "ndjson" if {".ndjson", ".jsonl"} & set(path.suffixes) else "parquet"
+
+
+def _open_text(path: Path, mode: str) -> IO[str]:
+    if path.suffix == ".gz":
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return path.open(mode, encoding="utf-8")
+
+
+def _record(doc: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": str(doc["_id"]),
+        "created_at": doc["created_at"].isoformat(),
+        "journal_date": doc.get("journal_date"),
+        "prompt": doc.get("prompt", ""),
+        "structured": doc.get("structured", {}),
+    }
+
+
+def _entry(rec: Dict[str, Any]) -> Entry:
+    day = _dt.date.fromisoformat(rec["journal_date"]) if rec.get("journal_date") else None
+    return (rec["prompt"], rec["structured"], day), _dt.datetime.fromisoformat(rec["created_at"])
+
+
+# ─── NDJSON ─────────────────────────────────────────────────────────────────
+def export_ndjson(path: Path, batch_size: int = TRANSFER_BATCH_SIZE) -> int:
+    n = 0
+    with _open_text(path, "w") as f:
+        for doc in iter_entries(batch_size=batch_size):
+            f.write(json.dumps(_record(doc), ensure_ascii=False, default=str) + "\n")
+            n += 1
+    return n
+
+
+def read_ndjson(path: Path) -> Iterator[Entry]:
+    with _open_text(path, "r") as f:
+        for line in f:
+            if line.strip():
+                yield _entry(json.loads(line))
+
+
+# ─── Parquet ────────────────────────────────────────────────────────────────
+def _require_pyarrow() -> None:
+    if pa is None:
+        raise RuntimeError("the parquet format needs pyarrow (pip install pyarrow)")
+
+
+def _schemas() -> Dict[str, Any]:
+    _require_pyarrow()
+    entries = pa.schema(
+        [
+            ("id", pa.string()),
+            ("created_at", pa.timestamp("us")),
+            ("journal_date", pa.string()),
+            ("prompt", pa.string()),
+            ("extra", pa.string()),  # other top-level structured keys, JSON
+        ]
+    )
+    schemas = {"entries": entries}
+    for stem, (_, columns, _) in SECTIONS.items():
+        fields = [("entry_id", pa.string())] + [(c, pa.string()) for c in columns] + [("extra", pa.string())]
+        schemas[stem] = pa.schema(fields)
+    return schemas
+
+
+def _flatten(doc: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+    """Rows of every table for one entry."""
+    rec = _record(doc)
+    structured = dict(rec["structured"])
+    rows: Dict[str, List[Dict[str, Any]]] = {}
+    for stem, (section, columns, derived) in SECTIONS.items():
+        rows[stem] = []
+        for item in structured.pop(section, None) or []:
+            row: Dict[str, Any] = {"entry_id": rec["id"]}
+            extra = {}
+            for k, v in item.items():
+                if k in columns and (v is None or isinstance(v, str)):
+                    row[k] = v
+                elif k not in derived:
+                    extra[k] = v
+            row["extra"] = json.dumps(extra, ensure_ascii=False, default=str) if extra else None
+            rows[stem].append(row)
+    rows["entries"] = [
+        {
+            "id": rec["id"],
+            "created_at": doc["created_at"],
+            "journal_date": rec["journal_date"],
+            "prompt": rec["prompt"],
+            "extra": json.dumps(structured, ensure_ascii=False, default=str) if structured else None,
+        }
+    ]
+    return rows
+
+
+def export_parquet(path: Path, batch_size: int = TRANSFER_BATCH_SIZE) -> int:
+    schemas = _schemas()
+    path.mkdir(parents=True, exist_ok=True)
+    writers = {t: pq.ParquetWriter(path / f"{t}.parquet", s, compression="zstd") for t, s in schemas.items()}
+    buffers: Dict[str, List[Dict[str, Any]]] = {t: [] for t in schemas}
+
+    def flush() -> None:
+        for t, rows in buffers.items():
+            if rows:
+                writers[t].write_table(pa.Table.from_pylist(rows, schemas[t]))
+                rows.clear()
+
+    n = 0
+    try:
+        for doc in iter_entries(batch_size=batch_size):
+            for t, rows in _flatten(doc).items():
+                buffers[t].extend(rows)
+            n += 1
+            if n % batch_size == 0:
+                flush()
+        flush()
+    finally:
+        for w in writers.values():
+            w.close()
+    return n
+
+
+def _rows(file: Path, batch_size: int) -> Iterator[Dict[str, Any]]:
+    for batch in pq.ParquetFile(file).iter_batches(batch_size):
+        yield from batch.to_pylist()
+
+
+def _unflatten(row: Dict[str, Any], columns: Tuple[str, ...], derived: Tuple[str, ...]) -> Dict[str, Any]:
+    item = {c: row[c] for c in columns if c not in derived and row.get(c) is not None}
+    if row.get("extra"):
+        item.update(json.loads(row["extra"]))
+    return item
+
+
+def read_parquet(path: Path, batch_size: int = TRANSFER_BATCH_SIZE) -> Iterator[Entry]:
+    """
+    Reassemble entries from the four files. Item rows are stored in entry
+    order, so each table is merged in with a single forward pass.
+    """
+    _require_pyarrow()
+    items = {stem: _rows(path / f"{stem}.parquet", batch_size) for stem in SECTIONS}
+    pending = {stem: next(rows, None) for stem, rows in items.items()}
+    for row in _rows(path / "entries.parquet", batch_size):
+        structured = json.loads(row["extra"]) if row["extra"] else {}
+        for stem, (section, columns, derived) in SECTIONS.items():
+            structured[section] = []
+            while pending[stem] is not None and pending[stem]["entry_id"] == row["id"]:
+                structured[section].append(_unflatten(pending[stem], columns, derived))
+                pending[stem] = next(items[stem], None)
+        day = _dt.date.fromisoformat(row["journal_date"]) if row["journal_date"] else None
+        yield (row["prompt"], structured, day), row["created_at"]
+
+
+# ─── commands ───────────────────────────────────────────────────────────────
+def export_journal(path: str | Path, fmt: str | None = None, batch_size: int = TRANSFER_BATCH_SIZE) -> int:
+    """Write every entry, oldest first, to `path`; returns the count."""
+    path = Path(path)
+    if _format(path, fmt) == "parquet":
+        return export_parquet(path, batch_size)
+    return export_ndjson(path, batch_size)
+
+
+def import_journal(
+    path: str | Path,
+    fmt: str | None = None,
+    batch_size: int = TRANSFER_BATCH_SIZE,
+    resume: bool = True,
+    progress: Callable[[int], None] | None = None,
+) -> int:
+    """Add the entries of an export to the journal; returns how many were added."""
+    path = Path(path)
+    if _format(path, fmt) == "parquet":
+        entries, checkpoint = read_parquet(path, batch_size), Checkpoint(path / "entries.parquet")
+    else:
+        entries, checkpoint = read_ndjson(path), Checkpoint(path)
+    if not resume:
+        checkpoint.done = 0
+
+    done, added = checkpoint.done, 0
+    batch: List[Entry] = []
+
+    def flush() -> None:
+        nonlocal added
+        if batch:
+            add_entries([e for e, _ in batch], [at for _, at in batch])
+            added += len(batch)
+            batch.clear()
+        checkpoint.save(done)
+        if progress:
+            progress(done)
+
+    for i, entry in enumerate(entries):
+        if i < checkpoint.done:
+            continue
+        batch.append(entry)
+        done = i + 1
+        if len(batch) >= batch_size:
+            flush()
+    flush()
+    return added
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export / import the whole journal")
+    parser.add_argument("command", choices=["export", "import"])
+    parser.add_argument("path", type=Path, help="file for ndjson (.ndjson, .jsonl, optionally .gz), directory for parquet")
+    parser.add_argument("--format", choices=["ndjson", "parquet"], help="default: from the path")
+    parser.add_argument("--batch-size", type=int, default=TRANSFER_BATCH_SIZE)
+    parser.add_argument("--restart", action="store_true", help="import: ignore the checkpoint and start over")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        print(f"exported {export_journal(args.path, args.format, args.batch_size)} entries")
+        return
+    added = import_journal(
+        args.path, args.format, args.batch_size, resume=not args.restart, progress=lambda n: print(f"\r{n} entries", end="", flush=True)
+    )
+    print(f"\nimported {added} entries")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+# transport.py
+# ─────────────────────────────────────────────────────────────────────────────
+# Shared HTTP transport for talking to Restack agents.
+#
+# • one pooled keep-alive requests.Session per process
+# • (connect, read) timeouts from the environment
+# • jittered exponential retry on failures that are safe to repeat; a call
+#   that is not idempotent (an agent event) is repeated only when the agent
+#   cannot have received it
+# • a circuit breaker per endpoint, so a dead agent fails fast; a call counts
+#   once, however many attempts it took
+# • latency histograms per endpoint (see latency_stats)
+# • a tracing span per attempt (see tracing.py)
+# ─────────────────────────────────────────────────────────────────────────────
+from __future__ import annotations
+
+import bisect
+import os
+import random
+import threading
+import time
+from typing import Any, Dict, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ConnectTimeoutError
+
+from tracing import span
+
+RESTACK_POOL_SIZE = int(os.getenv("RESTACK_POOL_SIZE", "10"))
+RESTACK_CONNECT_TIMEOUT_S = float(os.getenv("RESTACK_CONNECT_TIMEOUT_S", "5"))
+RESTACK_READ_TIMEOUT_S = float(os.getenv("RESTACK_READ_TIMEOUT_S", "90"))
+RESTACK_RETRIES = int(os.getenv("RESTACK_RETRIES", "3"))
+RESTACK_BACKOFF_S = float(os.getenv("RESTACK_BACKOFF_S", "0.5"))
+RESTACK_BACKOFF_MAX_S = float(os.getenv("RESTACK_BACKOFF_MAX_S", "8"))
+RESTACK_BREAKER_FAILURES = int(os.getenv("RESTACK_BREAKER_FAILURES", "5"))
+RESTACK_BREAKER_RESET_S = float(os.getenv("RESTACK_BREAKER_RESET_S", "30"))
+
+# Statuses that mean "not processed, try again later". A gateway's 502/504
+# may come after the upstream got the request, so only the rest are safe to
+# repeat for calls that are not idempotent.
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+UNPROCESSED_STATUSES = frozenset({429, 503})
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+# Upper bounds (ms) of the latency histogram buckets; the last is open-ended.
+LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000, float("inf"))
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised without a network call while an endpoint's breaker is open."""
+
+
+# ─── circuit breaker ────────────────────────────────────────────────────────
+class CircuitBreaker:
+    """
+    closed → open after `failures` consecutive failures; after `reset_s` one
+    trial call is let through (half-open) and its outcome decides the state.
+    """
+
+    def __init__(self, failures: int = RESTACK_BREAKER_FAILURES, reset_s: float = RESTACK_BREAKER_RESET_S) -> None:
+        self.failures = failures
+        self.reset_s = reset_s
+        self._streak = 0
+        self._opened_at: float | None = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        return "half-open" if time.monotonic() - self._opened_at >= self.reset_s else "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._trial:
+                self._trial = True
+                return True
+            return False
+
+    def record(self, ok: bool) -> None:
+        with self._lock:
+            self._trial = False
+            if ok:
+                self._streak, self._opened_at = 0, None
+                return
+            self._streak += 1
+            if self._opened_at is not None or self._streak >= self.failures:
+                self._opened_at = time.monotonic()
+
+
+# ─── latency histogram ──────────────────────────────────────────────────────
+class LatencyHistogram:
+    def __init__(self) -> None:
+        self.counts = [0] * len(LATENCY_BUCKETS_MS)
+        self.total_ms = 0.0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def observe(self, ms: float, ok: bool = True) -> None:
+        with self._lock:
+            self.counts[bisect.bisect_left(LATENCY_BUCKETS_MS, ms)] += 1
+            self.total_ms += ms
+            self.errors += not ok
+
+    def quantile(self, q: float) -> float | None:
+        """Upper bound of the bucket holding the q-quantile."""
+        n = sum(self.counts)
+        if not n:
+            return None
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS_MS, self.counts):
+            seen += count
+            if seen >= q * n:
+                return bound
+        return LATENCY_BUCKETS_MS[-1]
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            n = sum(self.counts)
+            return {
+                "count": n,
+                "errors": self.errors,
+                "mean_ms": round(self.total_ms / n, 1) if n else None,
+                "p50_ms": self.quantile(0.5),
+                "p95_ms": self.quantile(0.95),
+                "buckets": {("+inf" if b == float("inf") else f"<={b:g}"): c for b, c in zip(LATENCY_BUCKETS_MS, self.counts)},
+            }
+
+
+# ─── transport ──────────────────────────────────────────────────────────────
+class Transport:
+    """Pooled session + retry + breaker + histograms, shared by every caller."""
+
+    def __init__(
+        self,
+        pool_size: int = RESTACK_POOL_SIZE,
+        timeout: Tuple[float, float] = (RESTACK_CONNECT_TIMEOUT_S, RESTACK_READ_TIMEOUT_S),
+        retries: int = RESTACK_RETRIES,
+    ) -> None:
+        self.timeout = timeout
+        self.retries = retries
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def _for(self, endpoint: str) -> Tuple[CircuitBreaker, LatencyHistogram]:
+        with self._lock:
+            if endpoint not in self._breakers:
+                self._breakers[endpoint] = CircuitBreaker()
+                self._histograms[endpoint] = LatencyHistogram()
+            return self._breakers[endpoint], self._histograms[endpoint]
+
+    def _backoff(self, attempt: int, resp: requests.Response | None) -> float:
+        """Full-jitter exponential delay, or the server's Retry-After if given."""
+        retry_after = resp.headers.get("Retry-After") if resp is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), RESTACK_BACKOFF_MAX_S)
+        return random.uniform(0, min(RESTACK_BACKOFF_MAX_S, RESTACK_BACKOFF_S * 2**attempt))
+
+    def request(
+        self, method: str, url: str, *, endpoint: str | None = None, idempotent: bool | None = None, **kwargs: Any
+    ) -> requests.Response:
+        """
+        Send one request; raises requests exceptions (HTTPError for non-2xx
+        after retries) or CircuitOpenError. `endpoint` names the breaker and
+        histogram bucket, defaulting to the URL. `idempotent` defaults to the
+        method's HTTP semantics; pass False for a PUT that must not run twice.
+        """
+        endpoint = endpoint or url
+        breaker, histogram = self._for(endpoint)
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+        kwargs.setdefault("timeout", self.timeout)
+        if not breaker.allow():
+            raise CircuitOpenError(f"{endpoint}: circuit open after repeated failures")
+        ok = False
+        try:
+            resp = self._attempts(method, url, endpoint, histogram, idempotent, kwargs)
+            ok = True
+        finally:
+            breaker.record(ok)
+        resp.raise_for_status()  # 4xx: the caller's problem, not the endpoint's
+        return resp
+
+    def _attempts(
+        self, method: str, url: str, endpoint: str, histogram: LatencyHistogram, idempotent: bool, kwargs: Dict[str, Any]
+    ) -> requests.Response:
+        """The response once it is not a failure, or the last error once retrying is not allowed."""
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            resp: requests.Response | None = None
+            error = None
+            with span(f"http {method.upper()}", endpoint=endpoint, attempt=attempt) as s:
+                try:
+                    resp = self.session.request(method, url, **kwargs)
+                    if resp.status_code in RETRY_STATUSES or resp.status_code >= 500:
+                        resp.raise_for_status()
+                except (requests.HTTPError, requests.ConnectionError, requests.Timeout) as exc:
+                    error = exc
+                    s.set("error", f"{type(exc).__name__}: {exc}")
+                if resp is not None:
+                    s.set("http.status_code", resp.status_code)
+            histogram.observe((time.perf_counter() - started) * 1000, ok=error is None)
+            if error is None:
+                return resp
+            if attempt >= self.retries or not self._repeatable(error, resp, idempotent):
+                raise error
+            time.sleep(self._backoff(attempt, resp))
+            attempt += 1
+
+    @staticmethod
+    def _repeatable(error: Exception, resp: requests.Response | None, idempotent: bool) -> bool:
+        """
+        Idempotent calls repeat failed connections and "try later" statuses.
+        Other calls only repeat what the server cannot have processed: a
+        connection that was never made, or a 429/503. A read timeout may have
+        reached the agent, so it is never retried.
+        """
+        if resp is not None:
+            return resp.status_code in (RETRY_STATUSES if idempotent else UNPROCESSED_STATUSES)
+        if idempotent:
+            return isinstance(error, requests.ConnectionError)
+        reason = getattr(error.args[0], "reason", None) if error.args else None
+        return isinstance(error, requests.ConnectTimeout) or isinstance(reason, ConnectTimeoutError)
+
+    def put(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("PUT", url, **kwargs)
+
+    def post(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def latency_stats(self) -> Dict[str, Dict[str, Any]]:
+        """{endpoint: histogram snapshot plus breaker state}."""
+        with self._lock:
+            items = list(self._histograms.items())
+        return {name: {**h.snapshot(), "breaker": self._breakers[name].state} for name, h in items}
+
+
+_transport: Transport | None = None
+_transport_lock = threading.Lock()
+
+
+def get_transport() -> Transport:
+    """Process-wide transport, created on first use."""
+    global _transport
+    if _transport is None:
+        with _transport_lock:
+            if _transport is None:
+                _transport = Transport()
+    return _transport
+
+
+def latency_stats() -> Dict[str, Dict[str, Any]]:
+    return get_transport().latency_stats()